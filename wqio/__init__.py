@@ -1,4 +1,5 @@
 from wqio import bootstrap  # noqa
+from wqio import trend  # noqa
 from wqio import utils  # noqa
 from wqio.datacollections import DataCollection  # noqa
 from wqio.datasets import download  # noqa
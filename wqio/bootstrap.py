@@ -1,11 +1,17 @@
+import contextlib
+import inspect
 import logging
+import os
+import statistics
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 import numpy
 import scipy.stats as stats
 from probscale.algo import _estimate_from_fit
 
-from wqio import utils
+from wqio import ros, utils
 
 _logger = logging.getLogger(__name__)
 
@@ -13,141 +19,1584 @@ fitestimate = namedtuple(
     "BootstrappedFitEstimate", ["xhat", "yhat", "lower", "upper", "xlog", "ylog"]
 )
 
-__all__ = ["BCA", "percentile", "fit"]
+pairedestimate = namedtuple(
+    "BootstrappedPairedEstimate",
+    ["difference", "difference_CI", "ratio", "ratio_CI", "removal", "removal_CI"],
+)
+
+__all__ = [
+    "BCA",
+    "percentile",
+    "studentized",
+    "double",
+    "fit",
+    "paired",
+    "spawn",
+    "ResamplePlan",
+    "register_kernel",
+    "get_kernel",
+    "logmean",
+    "geomean",
+    "percentile_stat",
+    "trimmed_mean_stat",
+    "order_statistic_CI",
+    "t_CI",
+    "cox_CI",
+    "analytic_CI",
+    "confidence_interval",
+    "jackknife",
+]
+
+# ways to estimate confidence intervals (see `confidence_interval`)
+CI_METHODS = ("BCA", "percentile", "analytic", "cox", "studentized", "double")
+
+# ways to draw the bootstrap index (see `_make_boot_index`)
+SAMPLING_METHODS = ("iid", "balanced", "antithetic")
+
+# number of resampled datasets passed at once to statistics that need
+# to be applied one row at a time
+_FALLBACK_CHUNKSIZE = 1000
+
+# max number of bootstrapped estimates held at once when computing the
+# confidence band of a fit (unless a memory budget is given)
+_BAND_BLOCKSIZE = 2**22
+
+# fewest complete batches of the adaptive mode before its standard
+# errors are trusted to stop the resampling (see `_adaptive_boot_stats`)
+_MIN_ADAPTIVE_BATCHES = 5
+
+# max number of values gathered at once when computing the leave-one-out
+# estimates of statistics that don't have a closed-form update
+_JACKKNIFE_BLOCKSIZE = 2**22
+
+# max number of values gathered at once by the nested resampling of the
+# studentized and double bootstraps (unless a memory budget is given)
+_NESTED_BLOCKSIZE = 2**22
+
+
+def _acceleration(data):
+    """Compute the acceleration statistic.
+
+    Parameters
+    ----------
+    data : array-like
+        Sequence of values whose acceleration will be computed.
+
+    Returns
+    -------
+    acc : float
+        The acceleration statistic.
+
+    """
+
+    # intermediate values
+    sumcube_resids = ((data - data.mean()) ** 3).sum()
+
+    # dodge the ZeroDivision error
+    sumsqr_resids = max(((data - data.mean()) ** 2).sum(), 1e-12)
+
+    # compute and return the acceleration
+    return sumcube_resids / (6 * sumsqr_resids**1.5)
+
+
+def _jackknife_acceleration(loo):
+    """Compute the acceleration statistic from the leave-one-out
+    estimates of a statistic (see :func:`jackknife`)."""
+
+    resids = loo.mean() - loo
+    sumcube_resids = (resids**3).sum()
+    sumsqr_resids = max((resids**2).sum(), 1e-12)
+    return sumcube_resids / (6 * sumsqr_resids**1.5)
+
+
+def _get_acceleration(data, statfxn, acceleration):
+    """The acceleration of ``statfxn`` computed with the ``acceleration``
+    method ("auto", "skew", or "jackknife")."""
+
+    if acceleration == "auto":
+        acceleration = "skew" if statfxn is numpy.mean else "jackknife"
+
+    if acceleration == "skew":
+        return _acceleration(data)
+    elif acceleration == "jackknife":
+        return _jackknife_acceleration(jackknife(data, statfxn))
+    raise ValueError(f"`acceleration` must be 'auto', 'skew', or 'jackknife', not {acceleration!r}")
+
+
+def _median(x, axis=None):
+    """Median computed with ``numpy.partition`` (i.e., without a full
+    sort of each resampled dataset)."""
+
+    x = numpy.asarray(x)
+    if axis is None:
+        x, axis = x.ravel(), 0
+
+    n = x.shape[axis]
+    k = n // 2
+    if n % 2:
+        return numpy.take(numpy.partition(x, k, axis=axis), k, axis=axis)
+
+    part = numpy.partition(x, [k - 1, k], axis=axis)
+    return numpy.mean(numpy.take(part, [k - 1, k], axis=axis), axis=axis)
+
+
+def logmean(x, axis=None):
+    """Arithmetic mean of the natural logs of ``x``."""
+    return numpy.mean(numpy.log(x), axis=axis)
+
+
+def geomean(x, axis=None):
+    """Geometric mean of ``x``."""
+    return numpy.exp(logmean(x, axis=axis))
+
+
+def percentile_stat(q):
+    """
+    Create a vectorized statistic that computes the ``q``-th
+    percentile (0 - 100) of a dataset.
+
+    Examples
+    --------
+    >>> import numpy
+    >>> from wqio import bootstrap
+    >>> data = numpy.random.lognormal(size=37)
+    >>> CI = bootstrap.BCA(data, bootstrap.percentile_stat(35), niter=1000)
+
+    """
+
+    def pctl(x, axis=None):
+        return numpy.percentile(x, q, axis=axis)
+
+    pctl.q = q
+    return pctl
+
+
+def trimmed_mean_stat(proportion):
+    """
+    Create a vectorized statistic that computes the mean after
+    trimming ``proportion`` (0 - 0.5) of the values from each end of a
+    dataset. See ``scipy.stats.trim_mean``.
+
+    """
+
+    def trimmed_mean(x, axis=None):
+        if axis is None:
+            x, axis = numpy.ravel(x), 0
+        return stats.trim_mean(x, proportion, axis=axis)
+
+    return trimmed_mean
+
+
+# vectorized versions of statistics that don't accept an `axis`
+# argument (or that can be computed more cheaply)
+_KERNELS = {
+    numpy.median: _median,
+    stats.gmean: geomean,
+    statistics.mean: numpy.mean,
+    statistics.fmean: numpy.mean,
+    statistics.median: _median,
+    statistics.geometric_mean: geomean,
+    statistics.pstdev: numpy.std,
+    statistics.stdev: partial(numpy.std, ddof=1),
+    statistics.pvariance: numpy.var,
+    statistics.variance: partial(numpy.var, ddof=1),
+}
+
+
+def register_kernel(statfxn, kernel):
+    """
+    Register a vectorized kernel to be used in place of a statistic
+    when bootstrapping.
+
+    Parameters
+    ----------
+    statfxn : callable
+        The statistic as it is passed to :func:`BCA`, etc.
+    kernel : callable
+        Function with the call signature ``kernel(values, axis=...)``
+        that returns the same results as ``statfxn`` along ``axis``.
+
+    """
+
+    _KERNELS[statfxn] = kernel
+
+
+def _accepts_axis(statfxn):
+    try:
+        params = inspect.signature(statfxn).parameters.values()
+    except (TypeError, ValueError):
+        return False
+
+    return any(p.name == "axis" or p.kind == p.VAR_KEYWORD for p in params)
+
+
+def _apply_in_chunks(statfxn):
+    """Wrap a statistic that only works on 1-D data so that it can be
+    applied to the last axis of a 2-D array, a chunk of rows at a
+    time."""
+
+    def kernel(values, axis=-1):
+        values = numpy.moveaxis(numpy.asarray(values), axis, -1)
+        if values.ndim == 1:
+            return statfxn(values)
+
+        chunks = [
+            numpy.apply_along_axis(statfxn, -1, values[start : start + _FALLBACK_CHUNKSIZE])
+            for start in range(0, values.shape[0], _FALLBACK_CHUNKSIZE)
+        ]
+        return numpy.concatenate(chunks)
+
+    return kernel
+
+
+def get_kernel(statfxn):
+    """
+    Look up the vectorized version of a statistic.
+
+    Parameters
+    ----------
+    statfxn : callable
+        A reducing function that returns a single value when passed
+        a 1-D array.
+
+    Returns
+    -------
+    kernel : callable
+        The registered kernel of ``statfxn`` (see
+        :func:`register_kernel`), ``statfxn`` itself if it accepts an
+        ``axis`` argument, or else a wrapper that applies it to each
+        resampled dataset in chunks.
+
+    """
+
+    try:
+        return _KERNELS[statfxn]
+    except (KeyError, TypeError):
+        pass
+
+    if _accepts_axis(statfxn):
+        return statfxn
+    return _apply_in_chunks(statfxn)
+
+
+def _loo_mean(x):
+    """Leave-one-out means of ``x``."""
+    return (x.sum() - x) / (x.shape[0] - 1)
+
+
+def _loo_logmean(x):
+    return _loo_mean(numpy.log(x))
+
+
+def _loo_geomean(x):
+    return numpy.exp(_loo_logmean(x))
+
+
+def _loo_percentile(x, q):
+    """Leave-one-out ``q``-th percentiles (linear interpolation, as
+    ``numpy.percentile``) of ``x`` from a single sort."""
+
+    n = x.shape[0]
+    order = numpy.argsort(x, kind="stable")
+    ranked = x[order]
+    rank = numpy.empty(n, dtype=int)
+    rank[order] = numpy.arange(n)
+
+    # position of the percentile among the n - 1 remaining values
+    h = (n - 2) * q / 100.0
+    lo = int(numpy.floor(h))
+    hi = min(lo + 1, n - 2)
+
+    # the k-th smallest remaining value is the k-th smallest value
+    # unless the removed one ranks at or below k
+    lower = numpy.where(rank > lo, ranked[lo], ranked[min(lo + 1, n - 1)])
+    upper = numpy.where(rank > hi, ranked[hi], ranked[min(hi + 1, n - 1)])
+    return lower + (h - lo) * (upper - lower)
+
+
+def _loo_generic(x, statfxn):
+    """Leave-one-out estimates of any statistic, evaluated a block of
+    left-out values at a time with the statistic's kernel."""
+
+    kernel = get_kernel(statfxn)
+    n = x.shape[0]
+    cols = numpy.arange(n - 1)
+    blocksize = max(1, _JACKKNIFE_BLOCKSIZE // max(n - 1, 1))
+
+    loo = []
+    for start in range(0, n, blocksize):
+        dropped = numpy.arange(start, min(start + blocksize, n))
+        index = cols + (cols >= dropped[:, None])
+        loo.append(numpy.asarray(kernel(x[index], axis=-1)))
+    return numpy.concatenate(loo)
+
+
+# closed-form leave-one-out updates
+_LOO = {
+    numpy.mean: _loo_mean,
+    statistics.mean: _loo_mean,
+    statistics.fmean: _loo_mean,
+    logmean: _loo_logmean,
+    geomean: _loo_geomean,
+    stats.gmean: _loo_geomean,
+    numpy.median: partial(_loo_percentile, q=50),
+    _median: partial(_loo_percentile, q=50),
+    statistics.median: partial(_loo_percentile, q=50),
+}
+
+
+def jackknife(data, statfxn):
+    """
+    Leave-one-out (jackknife) estimates of a statistic.
+
+    Parameters
+    ----------
+    data : array-like
+        Input sequence of at least two values.
+    statfxn : callable
+        A reducing function that returns a single value when passed
+        ``data``.
+
+    Returns
+    -------
+    loo : numpy array
+        The i-th element is ``statfxn`` evaluated on ``data`` without
+        its i-th value. Means, log-means, geometric means, medians, and
+        percentiles (see :func:`percentile_stat`) are updated in closed
+        form. Other statistics are evaluated on blocks of the
+        leave-one-out datasets with :func:`get_kernel`.
+
+    Examples
+    --------
+    >>> import numpy
+    >>> from wqio import bootstrap
+    >>> bootstrap.jackknife(numpy.array([1.0, 2.0, 4.0, 8.0]), numpy.median)
+    array([4., 4., 2., 2.])
+
+    """
+
+    data = numpy.asarray(data, dtype=float)
+    if data.shape[0] < 2:
+        raise ValueError("`data` must have at least two values")
+
+    try:
+        loo = _LOO[statfxn]
+    except (KeyError, TypeError):
+        loo = None
+
+    if loo is not None:
+        return loo(data)
+    elif hasattr(statfxn, "q"):
+        return _loo_percentile(data, statfxn.q)
+    return _loo_generic(data, statfxn)
+
+
+def _get_rng(random_state):
+    """Convert ``random_state`` to a ``numpy.random.Generator``.
+
+    ``None`` is passed through so that the global ``numpy.random``
+    state is used.
+
+    """
+
+    if random_state is None or isinstance(random_state, numpy.random.Generator):
+        return random_state
+    return numpy.random.default_rng(random_state)
+
+
+def spawn(random_state, n):
+    """
+    Derive independent random streams for ``n`` groups or workers.
+
+    Parameters
+    ----------
+    random_state : int, numpy.random.SeedSequence, or numpy.random.Generator
+        The parent seed of the streams.
+    n : int
+        Number of streams to derive.
+
+    Returns
+    -------
+    streams : list of numpy.random.SeedSequence
+        Children of the ``random_state``'s seed sequence that can be
+        passed as the ``random_state`` of :func:`BCA`,
+        :func:`percentile`, or :func:`fit`. Unlike
+        ``SeedSequence.spawn``, the i-th stream only depends on
+        ``random_state`` and ``i``, so the same streams are derived no
+        matter how many times this is called or in which order the
+        streams are consumed.
+
+    Examples
+    --------
+    >>> import numpy
+    >>> from wqio import bootstrap
+    >>> data = [numpy.arange(1.0, 15.0), numpy.arange(2.0, 30.0)]
+    >>> streams = bootstrap.spawn(42, len(data))
+    >>> CIs = [
+    ...     bootstrap.BCA(x, numpy.mean, niter=1000, random_state=rs)
+    ...     for x, rs in zip(data, streams)
+    ... ]
+
+    """
+
+    if isinstance(random_state, numpy.random.Generator):
+        seq = random_state.bit_generator.seed_seq
+    elif isinstance(random_state, numpy.random.SeedSequence):
+        seq = random_state
+    else:
+        seq = numpy.random.SeedSequence(random_state)
+
+    return [
+        numpy.random.SeedSequence(
+            seq.entropy, spawn_key=seq.spawn_key + (i,), pool_size=seq.pool_size
+        )
+        for i in range(n)
+    ]
+
+
+def _make_boot_index(elements, niter, dtype=int, rng=None, sampling="iid", order=None):
+    """Generate an array of bootstrap sample sets
+
+    Parameters
+    ----------
+    elements : int
+        The number of rows in the original dataset.
+    niter : int
+        Number of iteration for the bootstrapping.
+    dtype : numpy dtype, optional (default = int)
+        Integer type of the index.
+    rng : numpy.random.Generator, optional
+        Source of the random numbers. When not provided, the global
+        ``numpy.random`` state is used.
+    sampling : str, optional (default = "iid")
+        How the index is drawn:
+
+          - "iid": each value is drawn independently and uniformly.
+          - "balanced": each row of the dataset appears exactly
+            ``niter`` times across the whole index.
+          - "antithetic": half of the rows are drawn independently and
+            each is paired with a row that takes the opposite ranks
+            (i.e., rank ``r`` becomes ``elements - 1 - r``).
+    order : numpy array, optional
+        The positions of the dataset's values from smallest to largest
+        (e.g., from ``numpy.argsort``) used to convert the ranks of
+        antithetic sampling into indices. When not provided, the
+        dataset is assumed to be sorted.
+
+    Returns
+    -------
+    index : numpy array
+        A collection of random *indices* that can be used to randomly
+        sample a dataset ``niter`` times.
+
+    """
+
+    if sampling == "balanced":
+        pool = numpy.tile(numpy.arange(elements, dtype=dtype), niter)
+        pool = numpy.random.permutation(pool) if rng is None else rng.permutation(pool)
+        return pool.reshape(niter, elements)
+
+    elif sampling == "antithetic":
+        half = _make_boot_index(elements, niter - niter // 2, dtype=dtype, rng=rng)
+        ranks = numpy.concatenate([half, (elements - 1 - half).astype(dtype)])[:niter]
+        return ranks if order is None else order[ranks].astype(dtype)
+
+    elif sampling != "iid":
+        raise ValueError(f"`sampling` must be one of {SAMPLING_METHODS}, not {sampling!r}")
+
+    if rng is None:
+        return numpy.random.randint(low=0, high=elements, size=(niter, elements), dtype=dtype)
+    return rng.integers(low=0, high=elements, size=(niter, elements), dtype=dtype)
+
+
+def _sampling_order(values, sampling):
+    """The order in which antithetic sampling ranks ``values``."""
+
+    if sampling == "antithetic":
+        return numpy.argsort(values, kind="stable")
+    return None
+
+
+def _index_dtype(elements):
+    """The narrowest unsigned integer type that can index ``elements``
+    values."""
+
+    for dtype in (numpy.uint16, numpy.uint32):
+        if elements - 1 <= numpy.iinfo(dtype).max:
+            return numpy.dtype(dtype)
+    return numpy.dtype(numpy.uint64)
+
+
+def _iter_boot_index(
+    elements, niter, maxbytes=None, itemsize=8, rng=None, sampling="iid", order=None
+):
+    """Generate the bootstrap index in blocks of rows.
+
+    Parameters
+    ----------
+    elements : int
+        The number of rows in the original dataset.
+    niter : int
+        Total number of iteration for the bootstrapping.
+    maxbytes : int, optional
+        Memory budget (in bytes) for a block of the index and the
+        resampled data. When not provided, a single ``niter x elements``
+        block (see ``_make_boot_index``) is generated. Otherwise the
+        index uses the narrowest possible integer type and each block
+        has as many rows as fit within the budget (at least one).
+    itemsize : int, optional (default = 8)
+        Size (in bytes) of the elements of the data being resampled.
+    rng : numpy.random.Generator, optional
+        Source of the random numbers (see ``_make_boot_index``).
+    sampling : str, optional (default = "iid")
+        How the index is drawn (see ``_make_boot_index``). Each block is
+        balanced or antithetic on its own, so the whole index is too.
+    order : numpy array, optional
+        Sort order of the data for antithetic sampling (see
+        ``_make_boot_index``).
+
+    Yields
+    ------
+    index : numpy array
+        Blocks of the bootstrap index. Together they have ``niter``
+        rows.
+
+    """
+
+    if maxbytes is None:
+        yield _make_boot_index(elements, niter, rng=rng, sampling=sampling, order=order)
+        return
+
+    dtype = _index_dtype(elements)
+    rowbytes = max(elements, 1) * (dtype.itemsize + itemsize)
+    blocksize = int(max(1, min(niter, maxbytes // rowbytes)))
+    for start in range(0, niter, blocksize):
+        yield _make_boot_index(
+            elements,
+            min(blocksize, niter - start),
+            dtype=dtype,
+            rng=rng,
+            sampling=sampling,
+            order=order,
+        )
+
+
+def _ros_boot_stats(data, censored, statfxns, index, ros_opts=None):
+    """Evaluate statistics on resampled censored datasets that are each
+    imputed with ROS.
+
+    Parameters
+    ----------
+    data : numpy array
+        Raw results. Censored values should be set to the detection
+        limit.
+    censored : numpy array of bool
+        Censorship status of each value in ``data``.
+    statfxns : list of callable
+        Reducing functions (see :func:`get_kernel`).
+    index : numpy array
+        Bootstrap index (see ``_make_boot_index``).
+    ros_opts : dict, optional
+        Keyword arguments passed to ``wqio.ros.ROS_batched``.
+
+    Returns
+    -------
+    boot_stats : list of numpy arrays
+        The statistics of each imputed, resampled dataset.
+
+    """
+
+    imputed = ros.ROS_batched(data[index], censored[index], **(ros_opts or {}))
+
+    # rows where ROS dropped some of the results are padded with NaN,
+    # so the rows are evaluated in blocks of equal numbers of values
+    n_values = (~numpy.isnan(imputed)).sum(axis=1)
+    kernels = [get_kernel(statfxn) for statfxn in statfxns]
+    boot_stats = [numpy.empty(index.shape[0], dtype=float) for _ in statfxns]
+    for n in numpy.unique(n_values):
+        rows = n_values == n
+        for bs, kernel in zip(boot_stats, kernels):
+            bs[rows] = kernel(imputed[rows, :n], axis=-1)
+
+    return boot_stats
+
+
+def _block_stats(data, index, statfxns, censored=None, ros_opts=None):
+    """Evaluate statistics on a block of resampled datasets, gathering
+    the resampled data only once.
+
+    Returns
+    -------
+    boot_stats : list of numpy arrays
+        One array for each function in ``statfxns``.
+
+    """
+
+    if censored is not None:
+        return _ros_boot_stats(data, censored, statfxns, index, ros_opts=ros_opts)
+
+    resampled = data[index]
+    return [get_kernel(statfxn)(resampled, axis=-1) for statfxn in statfxns]
+
+
+def _boot_stats(
+    data, statfxn, niter, censored=None, ros_opts=None, maxbytes=None, rng=None, sampling="iid"
+):
+    """Evaluate a statistic on ``niter`` resampled datasets.
+
+    Parameters
+    ----------
+    data : numpy array
+    statfxn : callable
+        A reducing function (see :func:`get_kernel`).
+    niter : int
+        Number of resampled datasets.
+    censored : numpy array of bool, optional
+        Censorship status of each value in ``data`` (see
+        ``_ros_boot_stats``).
+    ros_opts : dict, optional
+        Keyword arguments passed to ``wqio.ros.ROS_batched``.
+    maxbytes : int, optional
+        Memory budget of the resampled blocks (see
+        ``_iter_boot_index``).
+    rng : numpy.random.Generator, optional
+        Source of the random numbers (see ``_make_boot_index``).
+    sampling : str, optional (default = "iid")
+        How the index is drawn (see ``_make_boot_index``).
+
+    Returns
+    -------
+    boot_stats : numpy array
+        The statistic of each resampled dataset.
+
+    """
+
+    boot_stats = []
+    blocks = _iter_boot_index(
+        data.shape[0],
+        niter,
+        maxbytes,
+        itemsize=data.itemsize,
+        rng=rng,
+        sampling=sampling,
+        order=_sampling_order(data, sampling),
+    )
+    for index in blocks:
+        boot_stats.extend(_block_stats(data, index, [statfxn], censored, ros_opts))
+
+    return numpy.concatenate(boot_stats)
+
+
+def _run_boot(worker, niter, rng=None, n_jobs=None, executor=None):
+    """Run the bootstrap iterations, optionally spread across workers.
+
+    Parameters
+    ----------
+    worker : callable
+        Called as ``worker(niter=..., rng=...)`` and returns an array
+        whose first axis has ``niter`` elements. Must be picklable when
+        run in worker processes.
+    niter : int
+        Total number of iterations.
+    rng : numpy.random.Generator, optional
+        Source of the random numbers. When not provided, the global
+        ``numpy.random`` state is used.
+    n_jobs : int, optional
+        Number of parts into which the iterations are split. Each part
+        draws from its own stream seeded from ``rng``, so the results
+        depend on ``rng`` and ``n_jobs``, but not on where the parts
+        are run. Use -1 for the number of CPUs.
+    executor : concurrent.futures.Executor, optional
+        Executor used to run the parts. When not provided (and
+        ``n_jobs`` is), a ``ProcessPoolExecutor`` with ``n_jobs``
+        workers is used.
+
+    Returns
+    -------
+    results : numpy array
+        The results of each part concatenated in order.
+
+    """
+
+    if n_jobs is None and executor is None:
+        return worker(niter=niter, rng=rng)
+
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+
+    # entropy for the per-part streams comes from the parent stream
+    maxseed = numpy.iinfo(numpy.int64).max
+    if rng is None:
+        entropy = numpy.random.randint(maxseed, dtype=numpy.int64)
+    else:
+        entropy = rng.integers(maxseed, dtype=numpy.int64)
+
+    counts = numpy.diff(numpy.linspace(0, niter, n_jobs + 1).astype(int))
+    jobs = [
+        dict(niter=int(n), rng=numpy.random.default_rng(seed))
+        for n, seed in zip(counts, spawn(int(entropy), n_jobs))
+        if n > 0
+    ]
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(worker, **job) for job in jobs]
+            results = [f.result() for f in futures]
+    else:
+        futures = [executor.submit(worker, **job) for job in jobs]
+        results = [f.result() for f in futures]
+
+    return numpy.concatenate(results)
+
+
+def _bca_interval(a_hat, primary_result, boot_stats, alpha, fallback, log=True, warn=False):
+    """Compute the BCA confidence interval from bootstrapped statistics.
+
+    Parameters
+    ----------
+    a_hat : float
+        The acceleration of the statistic.
+    primary_result : float
+        The statistic of ``data``.
+    boot_stats : numpy array
+        The statistic of each resampled dataset.
+    alpha : float
+        The desired confidence interval subtracted from 1.
+    fallback : callable
+        Called without any arguments to compute the percentile
+        confidence interval when the BCA results don't make sense.
+
+    Returns
+    -------
+    CI : numpy array
+
+    """
+
+    boot_result = boot_stats.mean()
+
+    new_alpha = _bca_alphas(primary_result, boot_stats, a_hat, alpha)
+    if new_alpha is None:
+        utils.log_or_warn(
+            "All results below primary_result",
+            warning=UserWarning if warn else None,
+            logger=_logger.debug if log else None,
+        )
+
+    else:
+        # confidence intervals from the new alphas
+        CI = numpy.percentile(boot_stats, new_alpha)
+
+        # fall back to the standard percentile method if the results
+        # don't make any sense
+        if boot_result < CI[0] or CI[1] < boot_result:
+            utils.log_or_warn(
+                "Secondary result outside of CI",
+                warning=UserWarning if warn else None,
+                logger=_logger.debug if log else None,
+            )
+            CI = fallback()
+
+    return CI
+
+
+def _bca_alphas(primary_result, boot_stats, a_hat, alpha):
+    """The bias-corrected and accelerated percentiles (0 - 100) of the
+    bootstrapped statistics that bound the confidence interval, or None
+    if all of the results are below ``primary_result``."""
+
+    niter = boot_stats.shape[0]
+
+    # number of results below the premlinary estimate
+    NumBelow = numpy.sum(boot_stats < primary_result)
+    if NumBelow == 0:
+        NumBelow = 0.00001
+
+    if NumBelow == niter:
+        return None
+
+    # z-stats on the % of `NumBelow` and the confidence limits
+    z0 = stats.norm.ppf(NumBelow / niter)
+    z = stats.norm.ppf([0.5 * alpha, 1 - (0.5 * alpha)])
+
+    # refine the confidence limits (alphas)
+    zTotal = z0 + (z0 + z) / (1 - a_hat * (z0 + z))
+    return stats.norm.cdf(zTotal) * 100.0
+
+
+def _percentile_interval(boot_stats, alpha):
+    """The `alpha/2` and `1-alpha/2` percentiles of ``boot_stats``."""
+
+    return numpy.percentile(boot_stats, [alpha * 50, 100 - (alpha * 50)], axis=0)
+
+
+def _adaptive_executor(n_jobs, executor):
+    """Context manager of the executor shared by all of the batches of
+    ``_adaptive_boot_stats``, so that a parallel run doesn't start a
+    new process pool for each batch (see ``_run_boot``)."""
+
+    if n_jobs is None or executor is not None:
+        return contextlib.nullcontext(executor)
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    return ProcessPoolExecutor(max_workers=n_jobs)
+
+
+def _adaptive_boot_stats(sampler, niter, batchsize, tolerance, positions):
+    """Resample in batches until the confidence interval converges.
+
+    Parameters
+    ----------
+    sampler : callable
+        ``sampler(n)`` returns the statistics of ``n`` new resampled
+        datasets.
+    niter : int
+        Maximum number of iterations.
+    batchsize : int
+        Number of iterations in each batch.
+    tolerance : float
+        The resampling stops once the Monte-Carlo standard errors of
+        both endpoints of the interval are at or below this value,
+        after at least ``_MIN_ADAPTIVE_BATCHES`` complete batches.
+    positions : callable
+        ``positions(boot_stats)`` returns the percentiles (0 - 100) of
+        the statistics that are the endpoints of the interval.
+
+    Returns
+    -------
+    boot_stats : numpy array
+        The statistics of all of the resampled datasets.
+    stderr : numpy array
+        Standard errors of the endpoints estimated from the spread of
+        the endpoints of each (complete) batch, or NaN if there are
+        fewer than two complete batches.
+
+    """
+
+    batches = []
+    stderr = numpy.array([numpy.nan, numpy.nan])
+    while sum(b.shape[0] for b in batches) < niter:
+        done = sum(b.shape[0] for b in batches)
+        batches.append(sampler(min(batchsize, niter - done)))
+        full = [b for b in batches if b.shape[0] == batchsize]
+        if len(full) >= 2:
+            pctls = positions(numpy.concatenate(batches))
+            endpoints = numpy.array([numpy.percentile(b, pctls) for b in full])
+            stderr = endpoints.std(axis=0, ddof=1) / numpy.sqrt(len(full))
+            if len(full) >= _MIN_ADAPTIVE_BATCHES and (stderr <= tolerance).all():
+                break
+
+    return numpy.concatenate(batches), stderr
+
+
+def BCA(
+    data,
+    statfxn,
+    niter=10000,
+    alpha=0.05,
+    log=True,
+    warn=False,
+    censored=None,
+    ros_opts=None,
+    maxbytes=None,
+    random_state=None,
+    n_jobs=None,
+    executor=None,
+    plan=None,
+    tolerance=None,
+    batchsize=1000,
+    full_output=False,
+    acceleration="auto",
+    sampling="iid",
+):
+    """
+    Estimates confidence intervals around a statistic using the
+    Bias-Corrected and Accelerated method.
+
+    Parameters
+    ----------
+    data : array-like
+        Input sequence of values
+    statfxn : callable
+        A reducing function that returns a single value when passed
+        ``data``. It is vectorized across the resampled datasets with
+        :func:`get_kernel`, so it does not need to accept an ``axis``
+        argument.
+    niter : int, optional (default = 10000)
+        The number of iterations for which the data will be resampled
+        and the statistic recomputed.
+    alpha : float, optional (default = 0.05)
+        The desired confidence interval subtracted from 1. For example,
+        if you want the 95% CI, use ``alpha = 0.05``.
+    censored : array-like of bool, optional
+        Censorship status of each value in ``data``. When provided,
+        ``data`` are treated as raw results (censored values at their
+        detection limits) and every resampled dataset is imputed with
+        ROS before the statistic is computed, so the uncertainty of the
+        imputation is included in the confidence interval.
+    ros_opts : dict, optional
+        Keyword arguments passed to ``wqio.ros.ROS_batched`` and
+        ``wqio.ros.ros_array`` when ``censored`` is provided.
+    maxbytes : int, optional
+        When provided, the data are resampled in blocks whose index and
+        resampled values take up no more than ``maxbytes`` bytes, and
+        only the statistics of each block are kept. Otherwise, the full
+        ``niter x len(data)`` index is generated at once.
+    random_state : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+        Seed or generator used to resample the data. When not provided,
+        the global ``numpy.random`` state is used. See :func:`spawn` to
+        derive independent streams for many datasets.
+    n_jobs : int, optional
+        When provided, the iterations are split into ``n_jobs`` parts
+        that are run in parallel, each with its own random stream
+        derived from ``random_state``. Use -1 for the number of CPUs.
+        The statistics of all of the parts are combined before the
+        bias and acceleration are computed.
+    executor : concurrent.futures.Executor, optional
+        Executor that runs the parts. Defaults to a
+        ``ProcessPoolExecutor`` with ``n_jobs`` workers, in which case
+        ``statfxn`` must be picklable (i.e., not a lambda).
+    plan : ResamplePlan, optional
+        A pre-generated bootstrap index to use instead of resampling
+        the data. When provided, ``niter``, ``maxbytes``,
+        ``random_state``, ``n_jobs``, ``executor``, and ``tolerance``
+        are ignored.
+    tolerance : float, optional
+        When provided, the data are resampled in batches of
+        ``batchsize`` iterations until the Monte-Carlo standard errors
+        of both ends of the confidence interval (estimated from the
+        spread of the intervals of each batch, so at least five batches
+        are used) are no greater than ``tolerance``, or until ``niter``
+        iterations have been used.
+    batchsize : int, optional (default = 1000)
+        Number of iterations per batch when ``tolerance`` is provided.
+    full_output : bool, optional (default = False)
+        When True, the number of iterations that were actually used is
+        returned along with the confidence interval.
+    acceleration : str, optional (default = "auto")
+        How the acceleration is computed. "skew" uses the skewness of
+        ``data``, which is only exact for the mean. "jackknife" uses
+        the leave-one-out estimates of the statistic itself (see
+        :func:`jackknife`), which is appropriate for any statistic
+        (e.g., medians and percentiles). "auto" uses the skewness for
+        ``numpy.mean`` and the jackknife otherwise.
+    sampling : str, optional (default = "iid")
+        How the resampled datasets are drawn. "iid" draws every value
+        independently. "balanced" draws them so that each value of
+        ``data`` appears exactly ``niter`` times overall. "antithetic"
+        pairs each resampled dataset with one that takes the values of
+        the opposite ranks. Both reduce the Monte-Carlo noise of the
+        interval for a given ``niter``.
+
+    Returns
+    -------
+    CI : numpy array
+        Confidence intervals around the statistic.
+    niter : int
+        Number of iterations used (only if ``full_output`` is True).
+
+    Examples
+    --------
+    >>> import numpy
+    >>> import wqio
+    >>> numpy.random.seed(0)
+    >>> # generate fake data and bootstrap it
+    >>> data = numpy.random.normal(loc=2, scale=1.75, size=37)
+    >>> wqio.bootstrap.BCA(data, numpy.mean, niter=1000, alpha=0.05)
+    array([1.89528037, 3.16395883])
+
+    """
+
+    raw_data = data = numpy.asarray(data)
+    rng = _get_rng(random_state)
+
+    if plan is not None:
+        CI = plan.BCA(
+            data,
+            [statfxn],
+            alpha=alpha,
+            log=log,
+            warn=warn,
+            censored=censored,
+            ros_opts=ros_opts,
+            acceleration=acceleration,
+        )[0]
+        return (CI, plan.niter) if full_output else CI
+
+    if censored is not None:
+        censored = numpy.asarray(censored, dtype=bool)
+        data = ros.ros_array(data, censored, **(ros_opts or {}))
+
+    worker = partial(
+        _boot_stats,
+        raw_data,
+        statfxn,
+        censored=censored,
+        ros_opts=ros_opts,
+        maxbytes=maxbytes,
+        sampling=sampling,
+    )
+    primary_result = statfxn(data)
+    a_hat = _get_acceleration(data, statfxn, acceleration)
+
+    if tolerance is None:
+        boot_stats = _run_boot(worker, niter, rng=rng, n_jobs=n_jobs, executor=executor)
+
+        def fallback():
+            return percentile(
+                raw_data,
+                statfxn,
+                niter,
+                alpha=alpha,
+                censored=censored,
+                ros_opts=ros_opts,
+                maxbytes=maxbytes,
+                random_state=rng,
+                n_jobs=n_jobs,
+                executor=executor,
+                sampling=sampling,
+            )
+
+    else:
+
+        def positions(boot_stats):
+            new_alpha = _bca_alphas(primary_result, boot_stats, a_hat, alpha)
+            return [alpha * 50, 100 - (alpha * 50)] if new_alpha is None else new_alpha
+
+        with _adaptive_executor(n_jobs, executor) as pool:
+            boot_stats = _adaptive_boot_stats(
+                partial(_run_boot, worker, rng=rng, n_jobs=n_jobs, executor=pool),
+                niter,
+                batchsize,
+                tolerance,
+                positions,
+            )[0]
+        fallback = partial(_percentile_interval, boot_stats, alpha)
+
+    CI = _bca_interval(a_hat, primary_result, boot_stats, alpha, fallback, log=log, warn=warn)
+    _logger.debug(f"BCA used {boot_stats.shape[0]} iterations")
+    return (CI, boot_stats.shape[0]) if full_output else CI
+
+
+def percentile(
+    data,
+    statfxn,
+    niter=10000,
+    alpha=0.05,
+    censored=None,
+    ros_opts=None,
+    maxbytes=None,
+    random_state=None,
+    n_jobs=None,
+    executor=None,
+    plan=None,
+    tolerance=None,
+    batchsize=1000,
+    full_output=False,
+    sampling="iid",
+):
+    """
+    Estimates confidence intervals around a statistic using the
+    percentile method.
+
+    Parameters
+    ----------
+    data : array-like
+        Input sequence of values
+    statfxn : callable
+        A reducing function that returns a single value when passed
+        ``data``.
+    niter : int, optional (default = 10000)
+        The number of iterations for which the data will be resampled
+        and the statistic recomputed.
+    alpha : float, optional (default = 0.05)
+        The desired confidence interval subtracted from 1. For example,
+        if you want the 95% CI, use ``alpha = 0.05``.
+    censored : array-like of bool, optional
+        Censorship status of each value in ``data``. When provided,
+        every resampled dataset is imputed with ROS before the statistic
+        is computed. See :func:`BCA`.
+    ros_opts : dict, optional
+        Keyword arguments passed to ``wqio.ros.ROS_batched`` when
+        ``censored`` is provided.
+    maxbytes : int, optional
+        Memory budget of the blocks of resampled data. See :func:`BCA`.
+    random_state : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+        Seed or generator used to resample the data. See :func:`BCA`.
+    n_jobs : int, optional
+        Number of parts run in parallel. See :func:`BCA`.
+    executor : concurrent.futures.Executor, optional
+        Executor that runs the parts. See :func:`BCA`.
+    plan : ResamplePlan, optional
+        A pre-generated bootstrap index. See :func:`BCA`.
+    tolerance : float, optional
+        Stop resampling once the confidence interval has converged to
+        this tolerance. See :func:`BCA`.
+    batchsize : int, optional (default = 1000)
+        Number of iterations per batch when ``tolerance`` is provided.
+    full_output : bool, optional (default = False)
+        When True, the number of iterations that were actually used is
+        returned along with the confidence interval.
+    sampling : str, optional (default = "iid")
+        How the resampled datasets are drawn. See :func:`BCA`.
+
+    Returns
+    -------
+    CI : numpy array
+        Confidence intervals around the statistic.
+    niter : int
+        Number of iterations used (only if ``full_output`` is True).
+
+    Examples
+    --------
+    >>> import numpy
+    >>> import wqio
+    >>> numpy.random.seed(0)
+    >>> # generate fake data and bootstrap it
+    >>> data = numpy.random.normal(loc=2, scale=1.75, size=37)
+    >>> wqio.bootstrap.percentile(data, numpy.median, niter=1000, alpha=0.05)
+    array([2.20960993, 3.33181602])
+    """
+
+    if plan is not None:
+        CI = plan.percentile(data, [statfxn], alpha=alpha, censored=censored, ros_opts=ros_opts)[0]
+        return (CI, plan.niter) if full_output else CI
+
+    data = numpy.asarray(data)
+    rng = _get_rng(random_state)
+
+    if censored is not None:
+        censored = numpy.asarray(censored, dtype=bool)
+
+    worker = partial(
+        _boot_stats,
+        data,
+        statfxn,
+        censored=censored,
+        ros_opts=ros_opts,
+        maxbytes=maxbytes,
+        sampling=sampling,
+    )
+    if tolerance is None:
+        boot_stats = _run_boot(worker, niter, rng=rng, n_jobs=n_jobs, executor=executor)
+    else:
+        with _adaptive_executor(n_jobs, executor) as pool:
+            boot_stats = _adaptive_boot_stats(
+                partial(_run_boot, worker, rng=rng, n_jobs=n_jobs, executor=pool),
+                niter,
+                batchsize,
+                tolerance,
+                lambda boot_stats: [alpha * 50, 100 - (alpha * 50)],
+            )[0]
+
+    # compute the `alpha/2` and `1-alpha/2` percentiles of `boot_stats`
+    CI = _percentile_interval(boot_stats, alpha)
+    return (CI, boot_stats.shape[0]) if full_output else CI
+
+
+def _mean_stderr(x, axis=None):
+    """Standard error of the mean of ``x``."""
+    x = numpy.asarray(x)
+    n = x.size if axis is None else x.shape[axis]
+    return numpy.std(x, axis=axis, ddof=1) / numpy.sqrt(n)
+
+
+def _logmean_stderr(x, axis=None):
+    return _mean_stderr(numpy.log(x), axis=axis)
+
+
+# closed-form standard errors used by the studentized bootstrap instead
+# of nested resampling
+_STDERRS = {
+    numpy.mean: _mean_stderr,
+    statistics.mean: _mean_stderr,
+    statistics.fmean: _mean_stderr,
+    logmean: _logmean_stderr,
+}
+
+
+def _iter_nested_index(elements, niter, ninner, maxbytes=None, itemsize=8, rng=None):
+    """Generate the indices of a nested bootstrap in blocks of outer
+    iterations.
+
+    Parameters
+    ----------
+    elements : int
+        The number of rows in the original dataset.
+    niter : int
+        Total number of outer iterations.
+    ninner : int
+        Number of inner iterations for each outer iteration.
+    maxbytes : int, optional
+        Memory budget (in bytes) for a block of the inner index and the
+        resampled data. When not provided, each block holds up to
+        ``_NESTED_BLOCKSIZE`` resampled values.
+    itemsize : int, optional (default = 8)
+        Size (in bytes) of the elements of the data being resampled.
+    rng : numpy.random.Generator, optional
+        Source of the random numbers (see ``_make_boot_index``).
+
+    Yields
+    ------
+    outer : numpy array
+        ``nblock x elements`` index of the original data.
+    inner : numpy array
+        ``nblock x ninner x elements`` index of the values of each
+        (outer) resampled dataset.
+
+    """
+
+    dtype = _index_dtype(elements)
+    rowvalues = max(elements, 1) * ninner
+    if maxbytes is None:
+        blocksize = _NESTED_BLOCKSIZE // rowvalues
+    else:
+        blocksize = maxbytes // (rowvalues * (dtype.itemsize + itemsize))
+    blocksize = int(max(1, min(niter, blocksize)))
+
+    for start in range(0, niter, blocksize):
+        nblock = min(blocksize, niter - start)
+        outer = _make_boot_index(elements, nblock, dtype=dtype, rng=rng)
+        inner = _make_boot_index(elements, nblock * ninner, dtype=dtype, rng=rng)
+        yield outer, inner.reshape(nblock, ninner, elements)
+
+
+def _nested_stats(data, kernel, outer, inner):
+    """The statistic of each outer resampled dataset and of each of its
+    inner resampled datasets."""
+
+    resampled = data[outer]
+    rows = numpy.arange(outer.shape[0])[:, None, None]
+    return kernel(resampled, axis=-1), kernel(resampled[rows, inner], axis=-1)
+
+
+def _boot_t_stats(data, statfxn, niter, ninner=50, maxbytes=None, rng=None):
+    """The statistic (first column) and its standard error (second
+    column) of ``niter`` resampled datasets."""
+
+    kernel = get_kernel(statfxn)
+    stderr = _STDERRS.get(statfxn)
+    results = []
+    if stderr is not None:
+        for index in _iter_boot_index(data.shape[0], niter, maxbytes, data.itemsize, rng=rng):
+            resampled = data[index]
+            results.append(
+                numpy.column_stack([kernel(resampled, axis=-1), stderr(resampled, axis=-1)])
+            )
+    else:
+        blocks = _iter_nested_index(data.shape[0], niter, ninner, maxbytes, data.itemsize, rng)
+        for outer, inner in blocks:
+            stat, inner_stats = _nested_stats(data, kernel, outer, inner)
+            results.append(numpy.column_stack([stat, inner_stats.std(axis=-1, ddof=1)]))
+
+    return numpy.vstack(results)
+
+
+def studentized(
+    data,
+    statfxn,
+    niter=10000,
+    alpha=0.05,
+    ninner=50,
+    maxbytes=None,
+    random_state=None,
+    n_jobs=None,
+    executor=None,
+):
+    """
+    Estimates confidence intervals around a statistic using the
+    studentized (bootstrap-t) method.
+
+    Parameters
+    ----------
+    data : array-like
+        Input sequence of values
+    statfxn : callable
+        A reducing function that returns a single value when passed
+        ``data`` (see :func:`get_kernel`).
+    niter : int, optional (default = 10000)
+        The number of iterations for which the data will be resampled
+        and the statistic recomputed.
+    alpha : float, optional (default = 0.05)
+        The desired confidence interval subtracted from 1.
+    ninner : int, optional (default = 50)
+        Number of inner resampled datasets used to estimate the standard
+        error of the statistic of each resampled dataset. The standard
+        errors of means and log-means are computed directly instead.
+    maxbytes : int, optional
+        Memory budget of the blocks of the (nested) bootstrap index and
+        the resampled data. See :func:`BCA`.
+    random_state : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+        Seed or generator used to resample the data. See :func:`BCA`.
+    n_jobs : int, optional
+        Number of parts run in parallel. See :func:`BCA`.
+    executor : concurrent.futures.Executor, optional
+        Executor that runs the parts. See :func:`BCA`.
+
+    Returns
+    -------
+    CI : numpy array
+        Confidence intervals around the statistic.
+
+    Examples
+    --------
+    >>> import numpy
+    >>> from wqio import bootstrap
+    >>> data = numpy.random.lognormal(size=25)
+    >>> CI = bootstrap.studentized(data, numpy.median, niter=1000, random_state=0)
+
+    """
+
+    data = numpy.asarray(data)
+    worker = partial(_boot_t_stats, data, statfxn, ninner=ninner, maxbytes=maxbytes)
+    boot_stats = _run_boot(
+        worker, niter, rng=_get_rng(random_state), n_jobs=n_jobs, executor=executor
+    )
+
+    primary_result = statfxn(data)
+    stderr = _STDERRS.get(statfxn)
+    primary_stderr = stderr(data) if stderr is not None else boot_stats[:, 0].std(ddof=1)
+
+    # resampled datasets without any spread have undefined t-statistics
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        t_stats = (boot_stats[:, 0] - primary_result) / boot_stats[:, 1]
+    t_stats = t_stats[numpy.isfinite(t_stats)]
+
+    t_upper, t_lower = numpy.percentile(t_stats, [100 - (alpha * 50), alpha * 50])
+    return numpy.array(
+        [primary_result - t_upper * primary_stderr, primary_result - t_lower * primary_stderr]
+    )
+
+
+def _double_boot_stats(data, statfxn, primary_result, niter, ninner=500, maxbytes=None, rng=None):
+    """The statistic (first column) of ``niter`` resampled datasets and
+    the fraction of each one's inner resampled statistics that are no
+    greater than ``primary_result`` (second column)."""
 
+    kernel = get_kernel(statfxn)
+    results = []
+    blocks = _iter_nested_index(data.shape[0], niter, ninner, maxbytes, data.itemsize, rng)
+    for outer, inner in blocks:
+        stat, inner_stats = _nested_stats(data, kernel, outer, inner)
+        results.append(numpy.column_stack([stat, (inner_stats <= primary_result).mean(axis=-1)]))
 
-def _acceleration(data):
-    """Compute the acceleration statistic.
+    return numpy.vstack(results)
+
+
+def double(
+    data,
+    statfxn,
+    niter=1000,
+    alpha=0.05,
+    ninner=500,
+    maxbytes=None,
+    random_state=None,
+    n_jobs=None,
+    executor=None,
+):
+    """
+    Estimates confidence intervals around a statistic using the double
+    (calibrated percentile) bootstrap.
+
+    Each resampled dataset is itself resampled to find how often its
+    percentile interval would cover the original statistic. The
+    percentiles of the (outer) bootstrapped statistics that bound the
+    interval are then adjusted to achieve the nominal coverage.
 
     Parameters
     ----------
     data : array-like
-        Sequence of values whose acceleration will be computed.
+        Input sequence of values
+    statfxn : callable
+        A reducing function that returns a single value when passed
+        ``data`` (see :func:`get_kernel`).
+    niter : int, optional (default = 1000)
+        The number of (outer) resampled datasets.
+    alpha : float, optional (default = 0.05)
+        The desired confidence interval subtracted from 1.
+    ninner : int, optional (default = 500)
+        Number of inner resampled datasets of each outer one.
+    maxbytes : int, optional
+        Memory budget of the blocks of the nested bootstrap index and
+        the resampled data. See :func:`BCA`.
+    random_state : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+        Seed or generator used to resample the data. See :func:`BCA`.
+    n_jobs : int, optional
+        Number of parts run in parallel. See :func:`BCA`.
+    executor : concurrent.futures.Executor, optional
+        Executor that runs the parts. See :func:`BCA`.
 
     Returns
     -------
-    acc : float
-        The acceleration statistic.
+    CI : numpy array
+        Confidence intervals around the statistic.
+
+    Examples
+    --------
+    >>> import numpy
+    >>> from wqio import bootstrap
+    >>> data = numpy.random.lognormal(size=25)
+    >>> CI = bootstrap.double(data, numpy.median, niter=500, ninner=200, random_state=0)
 
     """
 
-    # intermediate values
-    sumcube_resids = ((data.mean() - data) ** 3).sum()
+    data = numpy.asarray(data)
+    primary_result = statfxn(data)
+    worker = partial(
+        _double_boot_stats, data, statfxn, primary_result, ninner=ninner, maxbytes=maxbytes
+    )
+    boot_stats = _run_boot(
+        worker, niter, rng=_get_rng(random_state), n_jobs=n_jobs, executor=executor
+    )
 
-    # dodge the ZeroDivision error
-    sumsqr_resids = max(((data.mean() - data) ** 2).sum(), 1e-12)
+    # calibrated levels of the percentile interval
+    levels = numpy.percentile(boot_stats[:, 1], [alpha * 50, 100 - (alpha * 50)])
+    return numpy.percentile(boot_stats[:, 0], 100 * levels)
 
-    # compute and return the acceleration
-    return sumcube_resids / (6 * sumsqr_resids**1.5)
 
+def order_statistic_CI(data, q=50, alpha=0.05):
+    """
+    Exact, distribution-free confidence interval around a percentile
+    from the order statistics of the data.
 
-def _make_boot_index(elements, niter):
-    """Generate an array of bootstrap sample sets
+    The number of values below the true ``q``-th percentile follows a
+    binomial distribution, so the ranks of the order statistics that
+    bound the interval come straight from its quantiles.
 
     Parameters
     ----------
-    elements : int
-        The number of rows in the original dataset.
-    niter : int
-        Number of iteration for the bootstrapping.
+    data : array-like
+        Input sequence of values
+    q : float, optional (default = 50)
+        The percentile (0 - 100). The default is the median.
+    alpha : float, optional (default = 0.05)
+        The desired confidence interval subtracted from 1.
 
     Returns
     -------
-    index : numpy array
-        A collection of random *indices* that can be used to randomly
-        sample a dataset ``niter`` times.
+    CI : numpy array
+        Confidence intervals around the percentile. With very small
+        datasets, the coverage can be less than ``1 - alpha`` since the
+        interval can't extend beyond the min and max of the data.
 
     """
-    return numpy.random.randint(low=0, high=elements, size=(niter, elements))
+
+    data = numpy.asarray(data, dtype=float)
+    n = data.shape[0]
+    p = q / 100.0
+
+    # 1-based ranks of the lower and upper order statistics
+    lower = int(max(stats.binom.ppf(alpha / 2, n, p), 1))
+    upper = int(min(stats.binom.ppf(1 - alpha / 2, n, p) + 1, n))
+
+    part = numpy.partition(data, [lower - 1, upper - 1])
+    return numpy.array([part[lower - 1], part[upper - 1]])
 
 
-def BCA(data, statfxn, niter=10000, alpha=0.05, log=True, warn=False):
+def t_CI(data, alpha=0.05):
     """
-    Estimates confidence intervals around a statistic using the
-    Bias-Corrected and Accelerated method.
+    Confidence interval around the mean based on Student's
+    t-distribution.
 
     Parameters
     ----------
     data : array-like
         Input sequence of values
-    statfxn : callable
-        A reducing function that returns a single value when passed
-        ``data``.
-    niter : int, optional (default = 10000)
-        The number of iterations for which the data will be resampled
-        and the statistic recomputed.
     alpha : float, optional (default = 0.05)
-        The desired confidence interval subtracted from 1. For example,
-        if you want the 95% CI, use ``alpha = 0.05``.
+        The desired confidence interval subtracted from 1.
 
     Returns
     -------
     CI : numpy array
-        Confidence intervals around the statistic.
 
-    Examples
-    --------
-    >>> import numpy
-    >>> import wqio
-    >>> numpy.random.seed(0)
-    >>> # generate fake data and bootstrap it
-    >>> data = numpy.random.normal(loc=2, scale=1.75, size=37)
-    >>> wqio.bootstrap.BCA(data, numpy.mean, niter=1000, alpha=0.05)
-    array([1.89528037, 3.16395883])
+    """
+
+    data = numpy.asarray(data, dtype=float)
+    n = data.shape[0]
+    halfwidth = stats.t.ppf(1 - alpha / 2, n - 1) * data.std(ddof=1) / numpy.sqrt(n)
+    return data.mean() + numpy.array([-halfwidth, halfwidth])
 
+
+def cox_CI(data, alpha=0.05):
     """
+    Confidence interval around the mean of log-normally distributed
+    data using the (modified) Cox method.
 
-    data = numpy.asarray(data)
+    Parameters
+    ----------
+    data : array-like
+        Input sequence of positive values
+    alpha : float, optional (default = 0.05)
+        The desired confidence interval subtracted from 1.
 
-    index = _make_boot_index(data.shape[0], niter)
-    boot_stats = statfxn(data[index], axis=-1)
-    primary_result = statfxn(data)
-    boot_result = boot_stats.mean()
+    Returns
+    -------
+    CI : numpy array
 
-    # number of results below the premlinary estimate
-    NumBelow = numpy.sum(boot_stats < primary_result)
-    if NumBelow == 0:
-        NumBelow = 0.00001
+    References
+    ----------
+    Olsson, U. (2005). Confidence intervals for the mean of a
+    log-normal distribution. Journal of Statistics Education, 13(1).
 
-    # compute the acceleration
-    a_hat = _acceleration(data)
+    """
 
-    if NumBelow == niter:
-        utils.log_or_warn(
-            "All results below primary_result",
-            warning=UserWarning if warn else None,
-            logger=_logger.debug if log else None,
-        )
+    logs = numpy.log(numpy.asarray(data, dtype=float))
+    n = logs.shape[0]
+    var = logs.var(ddof=1)
+    estimate = logs.mean() + var / 2
+    stderr = numpy.sqrt(var / n + var**2 / (2 * (n - 1)))
+    halfwidth = stats.t.ppf(1 - alpha / 2, n - 1) * stderr
+    return numpy.exp(estimate + numpy.array([-halfwidth, halfwidth]))
 
-    # z-stats on the % of `NumBelow` and the confidence limits
-    else:
-        z0 = stats.norm.ppf(NumBelow / niter)
-        z = stats.norm.ppf([0.5 * alpha, 1 - (0.5 * alpha)])
 
-        # refine the confidence limits (alphas)
-        zTotal = z0 + (z0 + z) / (1 - a_hat * (z0 + z))
-        new_alpha = stats.norm.cdf(zTotal) * 100.0
+def analytic_CI(data, statfxn, alpha=0.05, lognormal=False):
+    """
+    Resampling-free confidence interval around common statistics.
 
-        # confidence intervals from the new alphas
-        CI = numpy.percentile(boot_stats, new_alpha)
+    Parameters
+    ----------
+    data : array-like
+        Input sequence of values
+    statfxn : callable
+        One of ``numpy.median``, ``numpy.mean``, :func:`logmean`,
+        :func:`geomean` (or ``scipy.stats.gmean``), their counterparts
+        in the ``statistics`` module, or a statistic created by
+        :func:`percentile_stat`.
+    alpha : float, optional (default = 0.05)
+        The desired confidence interval subtracted from 1.
+    lognormal : bool, optional (default = False)
+        Toggles using :func:`cox_CI` instead of :func:`t_CI` for the
+        arithmetic mean.
 
-        # fall back to the standard percentile method if the results
-        # don't make any sense
-        if boot_result < CI[0] or CI[1] < boot_result:
-            utils.log_or_warn(
-                "Secondary result outside of CI",
-                warning=UserWarning if warn else None,
-                logger=_logger.debug if log else None,
-            )
-            CI = percentile(data, statfxn, niter, alpha=alpha)
+    Returns
+    -------
+    CI : numpy array
+        Exact order-statistic intervals (:func:`order_statistic_CI`)
+        for percentiles and t-intervals (on the logs of the data for
+        log-means and geometric means) for means.
 
-    return CI
+    """
+
+    data = numpy.asarray(data, dtype=float)
+    kernel = _KERNELS.get(statfxn, statfxn)
+
+    if kernel is _median:
+        return order_statistic_CI(data, q=50, alpha=alpha)
+    elif hasattr(kernel, "q"):
+        return order_statistic_CI(data, q=kernel.q, alpha=alpha)
+    elif kernel is numpy.mean:
+        return cox_CI(data, alpha=alpha) if lognormal else t_CI(data, alpha=alpha)
+    elif kernel is logmean:
+        return t_CI(numpy.log(data), alpha=alpha)
+    elif kernel is geomean:
+        return numpy.exp(t_CI(numpy.log(data), alpha=alpha))
+
+    raise ValueError(f"No analytic confidence interval for {statfxn}")
 
 
-def percentile(data, statfxn, niter=10000, alpha=0.05):
+def confidence_interval(data, statfxn, ci_method="BCA", alpha=0.05, **kwargs):
     """
-    Estimates confidence intervals around a statistic using the
-    percentile method.
+    Estimate a confidence interval around a statistic with any of the
+    available methods.
 
     Parameters
     ----------
@@ -156,39 +1605,136 @@ def percentile(data, statfxn, niter=10000, alpha=0.05):
     statfxn : callable
         A reducing function that returns a single value when passed
         ``data``.
-    niter : int, optional (default = 10000)
-        The number of iterations for which the data will be resampled
-        and the statistic recomputed.
+    ci_method : str, optional (default = "BCA")
+        One of:
+
+          - "BCA": see :func:`BCA`
+          - "percentile": see :func:`percentile`
+          - "analytic": see :func:`analytic_CI`
+          - "cox": :func:`analytic_CI` with ``lognormal=True``
+          - "studentized": see :func:`studentized`
+          - "double": see :func:`double`
+
     alpha : float, optional (default = 0.05)
-        The desired confidence interval subtracted from 1. For example,
-        if you want the 95% CI, use ``alpha = 0.05``.
+        The desired confidence interval subtracted from 1.
+    **kwargs
+        Passed to the bootstrapping function. Ignored by the analytic
+        methods.
 
     Returns
     -------
     CI : numpy array
-        Confidence intervals around the statistic.
 
-    Examples
-    --------
-    >>> import numpy
-    >>> import wqio
-    >>> numpy.random.seed(0)
-    >>> # generate fake data and bootstrap it
-    >>> data = numpy.random.normal(loc=2, scale=1.75, size=37)
-    >>> wqio.bootstrap.percentile(data, numpy.median, niter=1000, alpha=0.05)
-    array([2.20960993, 3.33181602])
     """
 
-    index = _make_boot_index(data.shape[0], niter)
-    boot_stats = statfxn(data[index], axis=-1)
+    if ci_method == "BCA":
+        return BCA(data, statfxn, alpha=alpha, **kwargs)
+    elif ci_method == "percentile":
+        return percentile(data, statfxn, alpha=alpha, **kwargs)
+    elif ci_method in ("analytic", "cox"):
+        return analytic_CI(data, statfxn, alpha=alpha, lognormal=ci_method == "cox")
+    elif ci_method == "studentized":
+        return studentized(data, statfxn, alpha=alpha, **kwargs)
+    elif ci_method == "double":
+        return double(data, statfxn, alpha=alpha, **kwargs)
 
-    # compute the `alpha/2` and `1-alpha/2` percentiles of `boot_stats`
-    CI = numpy.percentile(boot_stats, [alpha * 50, 100 - (alpha * 50)], axis=0)
+    raise ValueError(f"`ci_method` must be one of {CI_METHODS}, not {ci_method!r}")
 
-    return CI
 
+def _boot_fit_params(x, y, fitfxn, niter, maxbytes=None, rng=None, sampling="iid", **kwargs):
+    """Fit a line to ``niter`` resampled datasets.
+
+    Returns
+    -------
+    bs_params : numpy array
+        The results of ``fitfxn`` (one row per resampled dataset).
+
+    """
+
+    return numpy.array(
+        [
+            fitfxn(x[ii], y[ii], **kwargs)
+            for index in _iter_boot_index(len(x), niter, maxbytes, rng=rng, sampling=sampling)
+            for ii in index
+        ]
+    )
+
+
+def _is_linear_fit(fitfxn, kwargs):
+    """Whether or not ``fitfxn(x, y, **kwargs)`` is an ordinary least
+    squares line that can be bootstrapped in closed form."""
+
+    if fitfxn is numpy.polyfit:
+        return kwargs.get("deg") == 1 and set(kwargs) <= {"deg", "full"} and not kwargs.get("full")
+    return fitfxn is stats.linregress and not kwargs
+
+
+def _boot_linear_params(x, y, niter, maxbytes=None, rng=None, sampling="iid"):
+    """Fit ordinary least squares lines to ``niter`` resampled datasets
+    at once from the (centered) sums of each resampled dataset.
+
+    Returns
+    -------
+    bs_params : numpy array
+        The slope and intercept of each resampled dataset.
+
+    """
+
+    bs_params = []
+    for index in _iter_boot_index(len(x), niter, maxbytes, rng=rng, sampling=sampling):
+        xs = x[index]
+        ys = y[index]
+        xbar = xs.mean(axis=1, keepdims=True)
+        ybar = ys.mean(axis=1, keepdims=True)
+        dx = xs - xbar
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            slope = (dx * (ys - ybar)).sum(axis=1) / (dx**2).sum(axis=1)
+        intercept = ybar[:, 0] - slope * xbar[:, 0]
+        bs_params.append(numpy.column_stack([slope, intercept]))
+
+    return numpy.vstack(bs_params)
+
+
+def _fit_bounds(xhat, slopes, intercepts, percentiles, xlog, ylog, maxbytes=None):
+    """Percentiles of the bootstrapped estimates of a fit at each value
+    of ``xhat``, computed a block of ``xhat`` values at a time instead
+    of from the full ``len(xhat) x niter`` matrix of estimates.
+
+    Returns
+    -------
+    bounds : numpy array
+        One row for each percentile.
+
+    """
+
+    niter = slopes.shape[0]
+    blockelements = _BAND_BLOCKSIZE if maxbytes is None else maxbytes // 8
+    blocksize = int(max(1, blockelements // max(niter, 1)))
+    bounds = []
+    for start in range(0, xhat.shape[0], blocksize):
+        estimates = _estimate_from_fit(
+            xhat[start : start + blocksize, None], slopes, intercepts, xlog=xlog, ylog=ylog
+        )
+        bounds.append(numpy.percentile(estimates, percentiles, axis=1))
+
+    return numpy.hstack(bounds)
 
-def fit(x, y, fitfxn, niter=10000, alpha=0.05, xlog=False, ylog=False, **kwargs):
+
+def fit(
+    x,
+    y,
+    fitfxn,
+    niter=10000,
+    alpha=0.05,
+    xlog=False,
+    ylog=False,
+    maxbytes=None,
+    random_state=None,
+    n_jobs=None,
+    executor=None,
+    sampling="iid",
+    **kwargs,
+):
     """
     Perform a percentile bootstrap estimate on a linear regression.
 
@@ -201,7 +1747,9 @@ def fit(x, y, fitfxn, niter=10000, alpha=0.05, xlog=False, ylog=False, **kwargs)
         sequence (length > 3) where each element is a scalar and the first and
         second elements are the slope and intercept (in that order). The first
         two parameters fed to the function must be ``x`` and ``y`` (in that
-        order).
+        order). Ordinary least squares lines (i.e., ``numpy.polyfit`` with
+        ``deg=1`` or ``scipy.stats.linregress``) are bootstrapped in closed
+        form for all of the iterations at once.
     niter : int, optional (default = 10000)
         Number of bootstrap iterations to perform.
     alpha : float, optional (default = 0.05)
@@ -211,6 +1759,17 @@ def fit(x, y, fitfxn, niter=10000, alpha=0.05, xlog=False, ylog=False, **kwargs)
     xlog, ylog : bool, optional (default = False)
         Toggles performing the fit and estimates in arithmetic or logarithmic
         space.
+    maxbytes : int, optional
+        Memory budget of the blocks of the bootstrap index. See :func:`BCA`.
+    random_state : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+        Seed or generator used to resample the data. See :func:`BCA`.
+    n_jobs : int, optional
+        Number of parts run in parallel. See :func:`BCA`.
+    executor : concurrent.futures.Executor, optional
+        Executor that runs the parts. See :func:`BCA`.
+    sampling : str, optional (default = "iid")
+        How the resampled datasets are drawn. See :func:`BCA`. With
+        "antithetic", the (x, y) pairs are ranked by ``x``.
 
     Additional Parameters
     ---------------------
@@ -260,9 +1819,16 @@ def fit(x, y, fitfxn, niter=10000, alpha=0.05, xlog=False, ylog=False, **kwargs)
     # compute fit on original data
     main_params = fitfxn(x, y, **kwargs)
 
-    # raw loop to estimate the bootstrapped fit parameters
-    bs_params = numpy.array(
-        [fitfxn(x[ii], y[ii], **kwargs) for ii in _make_boot_index(len(x), niter)]
+    # closed-form fits of all of the resampled datasets for simple
+    # linear regressions, or a raw loop for anything else
+    if _is_linear_fit(fitfxn, kwargs):
+        worker = partial(_boot_linear_params, x, y, maxbytes=maxbytes, sampling=sampling)
+    else:
+        worker = partial(
+            _boot_fit_params, x, y, fitfxn, maxbytes=maxbytes, sampling=sampling, **kwargs
+        )
+    bs_params = _run_boot(
+        worker, niter, rng=_get_rng(random_state), n_jobs=n_jobs, executor=executor
     )
 
     # un-log, if necesssary
@@ -272,15 +1838,326 @@ def fit(x, y, fitfxn, niter=10000, alpha=0.05, xlog=False, ylog=False, **kwargs)
     # compute estimate from original data fit
     yhat = _estimate_from_fit(x, main_params[0], main_params[1], xlog=xlog, ylog=ylog)
 
-    # full array of estimates
-    bs_estimates = _estimate_from_fit(
-        x[:, None], bs_params[:, 0], bs_params[:, 1], xlog=xlog, ylog=ylog
-    )
-
     # both alpha alphas
     percentiles = 100 * numpy.array([alpha * 0.5, 1 - alpha * 0.5])
 
     # lower, upper bounds
-    bounds = numpy.percentile(bs_estimates, percentiles, axis=1)
+    # resampled datasets whose x-values are all the same don't have a
+    # line through them, and would turn the whole band into NaN
+    finite = numpy.isfinite(bs_params[:, :2]).all(axis=1)
+    bounds = _fit_bounds(
+        x, bs_params[finite, 0], bs_params[finite, 1], percentiles, xlog, ylog, maxbytes=maxbytes
+    )
 
     return fitestimate(x, yhat, bounds[0], bounds[1], xlog, ylog)
+
+
+def _paired_quantities(infl_stat, effl_stat):
+    """The difference, ratio, and percent removal between influent and
+    effluent statistics."""
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        ratio = effl_stat / infl_stat
+    return [effl_stat - infl_stat, ratio, 100 * (1 - ratio)]
+
+
+def _boot_paired_stats(influent, effluent, statfxn, niter, maxbytes=None, rng=None, sampling="iid"):
+    """Evaluate a statistic on ``niter`` resampled influent and effluent
+    datasets, whose rows are drawn jointly with the same index.
+
+    Returns
+    -------
+    boot_stats : numpy array
+        The statistic of the influent (first column) and effluent
+        (second column) of each resampled dataset.
+
+    """
+
+    kernel = get_kernel(statfxn)
+    boot_stats = []
+    blocks = _iter_boot_index(
+        influent.shape[0],
+        niter,
+        maxbytes,
+        itemsize=influent.itemsize + effluent.itemsize,
+        rng=rng,
+        sampling=sampling,
+        order=_sampling_order(influent, sampling),
+    )
+    for index in blocks:
+        boot_stats.append(
+            numpy.column_stack([kernel(influent[index], axis=-1), kernel(effluent[index], axis=-1)])
+        )
+
+    return numpy.vstack(boot_stats)
+
+
+def paired(
+    influent,
+    effluent,
+    statfxn=numpy.median,
+    niter=10000,
+    alpha=0.05,
+    ci_method="BCA",
+    log=True,
+    warn=False,
+    maxbytes=None,
+    random_state=None,
+    n_jobs=None,
+    executor=None,
+    sampling="iid",
+):
+    """
+    Estimates confidence intervals around the change in a statistic
+    between paired influent and effluent samples.
+
+    The pairs are resampled jointly (i.e., with one index for both
+    samples), so the correlation between influent and effluent values
+    is kept in each resampled dataset.
+
+    Parameters
+    ----------
+    influent, effluent : array-like
+        Paired sequences of values of the same length.
+    statfxn : callable, optional (default = numpy.median)
+        A reducing function (e.g., ``numpy.median``, ``numpy.mean``, or
+        :func:`geomean`). See :func:`get_kernel`.
+    niter : int, optional (default = 10000)
+        The number of iterations for which the pairs will be resampled
+        and the statistics recomputed.
+    alpha : float, optional (default = 0.05)
+        The desired confidence interval subtracted from 1.
+    ci_method : str, optional (default = "BCA")
+        "BCA" or "percentile". The BCA acceleration of each quantity is
+        computed from the leave-one-pair-out estimates of the
+        statistics (see :func:`jackknife`).
+    maxbytes : int, optional
+        Memory budget of the blocks of resampled data. See :func:`BCA`.
+    random_state : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+        Seed or generator used to resample the data. See :func:`BCA`.
+    n_jobs : int, optional
+        Number of parts run in parallel. See :func:`BCA`.
+    executor : concurrent.futures.Executor, optional
+        Executor that runs the parts. See :func:`BCA`.
+    sampling : str, optional (default = "iid")
+        How the resampled datasets are drawn. See :func:`BCA`. With
+        "antithetic", the pairs are ranked by the influent values.
+
+    Returns
+    -------
+    BootstrappedPairedEstimate : namedtuple
+        Names include:
+
+          difference : the effluent statistic minus the influent statistic
+          ratio : the effluent statistic divided by the influent statistic
+          removal : the percent removal, i.e., ``100 * (1 - ratio)``
+
+        along with ``difference_CI``, ``ratio_CI``, and ``removal_CI``,
+        the confidence intervals around each.
+
+    Examples
+    --------
+    >>> import numpy
+    >>> from wqio import bootstrap
+    >>> rng = numpy.random.default_rng(0)
+    >>> infl = rng.lognormal(mean=2, size=37)
+    >>> effl = infl * rng.lognormal(mean=-0.5, sigma=0.25, size=37)
+    >>> est = bootstrap.paired(infl, effl, numpy.median, niter=1000, random_state=0)
+    >>> lower, upper = est.removal_CI
+
+    """
+
+    influent = numpy.asarray(influent, dtype=float)
+    effluent = numpy.asarray(effluent, dtype=float)
+    if influent.shape != effluent.shape:
+        raise ValueError("`influent` and `effluent` must be the same shape")
+
+    if ci_method not in ("BCA", "percentile"):
+        raise ValueError(f"`ci_method` must be 'BCA' or 'percentile', not {ci_method!r}")
+
+    worker = partial(
+        _boot_paired_stats, influent, effluent, statfxn, maxbytes=maxbytes, sampling=sampling
+    )
+    boot_stats = _run_boot(
+        worker, niter, rng=_get_rng(random_state), n_jobs=n_jobs, executor=executor
+    )
+
+    primary = _paired_quantities(statfxn(influent), statfxn(effluent))
+    all_boot_quantities = _paired_quantities(boot_stats[:, 0], boot_stats[:, 1])
+    if ci_method == "percentile":
+        CIs = [_percentile_interval(bq, alpha) for bq in all_boot_quantities]
+    else:
+        loo = _paired_quantities(jackknife(influent, statfxn), jackknife(effluent, statfxn))
+        CIs = [
+            _bca_interval(
+                _jackknife_acceleration(lq),
+                pq,
+                bq,
+                alpha,
+                partial(_percentile_interval, bq, alpha),
+                log=log,
+                warn=warn,
+            )
+            for pq, bq, lq in zip(primary, all_boot_quantities, loo)
+        ]
+
+    return pairedestimate(primary[0], CIs[0], primary[1], CIs[1], primary[2], CIs[2])
+
+
+class ResamplePlan:
+    """
+    A bootstrap index that is generated once and shared by several
+    statistics and by datasets with the same number of values.
+
+    Parameters
+    ----------
+    elements : int
+        The number of values in the datasets that will be resampled.
+    niter : int, optional (default = 10000)
+        The number of resampled datasets.
+    random_state : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+        Seed or generator used to create the index. When not provided,
+        the global ``numpy.random`` state is used.
+    maxbytes : int, optional
+        Memory budget for the blocks of resampled data. The full index
+        is kept, but the data are gathered one block at a time (see
+        :func:`BCA`).
+    sampling : str, optional (default = "iid")
+        How the index is drawn (see :func:`BCA`). Antithetic indices are
+        stored as ranks and converted to the order of each dataset when
+        it is evaluated.
+
+    Examples
+    --------
+    >>> import numpy
+    >>> from wqio import bootstrap
+    >>> data = numpy.random.lognormal(size=37)
+    >>> plan = bootstrap.ResamplePlan(data.shape[0], niter=1000, random_state=0)
+    >>> median_CI, mean_CI = plan.BCA(data, [numpy.median, numpy.mean])
+
+    """
+
+    def __init__(self, elements, niter=10000, random_state=None, maxbytes=None, sampling="iid"):
+        self.elements = elements
+        self.niter = niter
+        self.maxbytes = maxbytes
+        self.sampling = sampling
+        self.blocks = list(
+            _iter_boot_index(
+                elements, niter, maxbytes, rng=_get_rng(random_state), sampling=sampling
+            )
+        )
+
+    def evaluate(self, data, statfxns, censored=None, ros_opts=None):
+        """
+        Evaluate statistics on the resampled datasets.
+
+        Each block of the resampled data is gathered once and reduced by
+        every function in ``statfxns``.
+
+        Parameters
+        ----------
+        data : array-like
+            Input sequence of ``elements`` values.
+        statfxns : list of callable
+            Reducing functions (see :func:`get_kernel`).
+        censored : array-like of bool, optional
+            Censorship status of each value in ``data``. See
+            :func:`BCA`.
+        ros_opts : dict, optional
+            Keyword arguments passed to ``wqio.ros.ROS_batched`` when
+            ``censored`` is provided.
+
+        Returns
+        -------
+        boot_stats : list of numpy arrays
+            The ``niter`` bootstrapped values of each statistic.
+
+        """
+
+        data = numpy.asarray(data)
+        if data.shape[0] != self.elements:
+            raise ValueError(f"`data` must have {self.elements} values, not {data.shape[0]}")
+
+        if censored is not None:
+            censored = numpy.asarray(censored, dtype=bool)
+
+        order = _sampling_order(data, self.sampling)
+        boot_stats = [[] for _ in statfxns]
+        for index in self.blocks:
+            if order is not None:
+                index = order[index]
+            block_stats = _block_stats(data, index, statfxns, censored, ros_opts)
+            for bs, stat in zip(boot_stats, block_stats):
+                bs.append(stat)
+
+        return [numpy.concatenate(bs) for bs in boot_stats]
+
+    def BCA(
+        self,
+        data,
+        statfxns,
+        alpha=0.05,
+        log=True,
+        warn=False,
+        censored=None,
+        ros_opts=None,
+        acceleration="auto",
+    ):
+        """
+        BCA confidence intervals around several statistics.
+
+        Parameters
+        ----------
+        data : array-like
+            Input sequence of ``elements`` values.
+        statfxns : list of callable
+            Reducing functions (see :func:`get_kernel`).
+        alpha : float, optional (default = 0.05)
+            The desired confidence interval subtracted from 1.
+        censored : array-like of bool, optional
+            See :meth:`evaluate`.
+        ros_opts : dict, optional
+            See :meth:`evaluate`.
+        acceleration : str, optional (default = "auto")
+            How the acceleration is computed. See :func:`BCA`.
+
+        Returns
+        -------
+        CIs : list of numpy arrays
+            Confidence intervals around each statistic. If the BCA
+            interval doesn't make sense, the percentile interval of the
+            same resampled datasets is used.
+
+        """
+
+        data = numpy.asarray(data)
+        all_boot_stats = self.evaluate(data, statfxns, censored=censored, ros_opts=ros_opts)
+        if censored is not None:
+            data = ros.ros_array(data, numpy.asarray(censored, dtype=bool), **(ros_opts or {}))
+
+        CIs = []
+        for statfxn, boot_stats in zip(statfxns, all_boot_stats):
+            a_hat = _get_acceleration(data, statfxn, acceleration)
+            fallback = partial(_percentile_interval, boot_stats, alpha)
+            CIs.append(
+                _bca_interval(a_hat, statfxn(data), boot_stats, alpha, fallback, log=log, warn=warn)
+            )
+        return CIs
+
+    def percentile(self, data, statfxns, alpha=0.05, censored=None, ros_opts=None):
+        """
+        Percentile confidence intervals around several statistics.
+
+        Parameters
+        ----------
+        See :meth:`BCA`.
+
+        Returns
+        -------
+        CIs : list of numpy arrays
+
+        """
+
+        all_boot_stats = self.evaluate(data, statfxns, censored=censored, ros_opts=ros_opts)
+        return [_percentile_interval(boot_stats, alpha) for boot_stats in all_boot_stats]
@@ -1,3 +1,4 @@
+import itertools
 import warnings
 from collections import namedtuple
 from functools import partial
@@ -13,9 +14,9 @@ try:
 except ImportError:  # pragma: no cover
     tqdm = None
 
-from wqio import bootstrap, utils, validate
+from wqio import bootstrap, trend, utils, validate
 from wqio.features import Dataset, Location
-from wqio.ros import ROS
+from wqio.ros import ROS_grouped
 
 _Stat = namedtuple("_stat", ["stat", "pvalue"])
 
@@ -69,6 +70,22 @@ class DataCollection:
     showpbar : bool (True)
         When True and the `tqdm` module is available, this will toggle the
         appears of progress bars in long-running group by-apply operations.
+    random_state : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+        Seed of the bootstrapped confidence intervals. Every group (and
+        every ``Location``) gets its own stream derived with
+        ``wqio.bootstrap.spawn``, so the results are the same no matter
+        the order in which the groups are processed. When not provided,
+        the global ``numpy.random`` state is used.
+    share_resamples : bool (default = False)
+        When True, groups with the same number of results share one
+        bootstrap index of ``bsiter`` resampled datasets (see
+        ``wqio.bootstrap.ResamplePlan``) across all of the BCA and
+        percentile bootstrapped statistics instead of each generating
+        their own.
+    ci_method : string (default = 'BCA')
+        Default method of estimating confidence intervals in
+        ``generic_stat`` and of the ``locations``. See
+        ``wqio.bootstrap.confidence_interval``.
 
     """
 
@@ -89,6 +106,9 @@ class DataCollection:
         filterfxn=None,
         bsiter=10000,
         showpbar=True,
+        random_state=None,
+        share_resamples=False,
+        ci_method="BCA",
     ):
         # cache for all of the properties
         self._cache = {}
@@ -106,6 +126,12 @@ class DataCollection:
         self.filterfxn = filterfxn or utils.non_filter
         self.bsiter = bsiter
         self.showpbar = showpbar
+        self.random_state = random_state
+        self.share_resamples = share_resamples
+        if ci_method not in bootstrap.CI_METHODS:
+            raise ValueError(f"`ci_method` must be one of {bootstrap.CI_METHODS}")
+        self.ci_method = ci_method
+        self._resample_plans = {}
 
         # column that stores ROS'd values
         self.roscol = "ros_" + rescol
@@ -135,21 +161,23 @@ class DataCollection:
 
     @cache_readonly
     def tidy(self):
+        return self._tidy_rows.reset_index(drop=True)
+
+    @cache_readonly
+    def _tidy_rows(self):
+        """``tidy``, indexed by the rows of ``data`` that it came from."""
+
         if self.useros:
 
-            def fxn(g):
+            def make_tidy(df):
                 with warnings.catch_warnings():
                     warnings.simplefilter("ignore")
-                    rosdf = (
-                        ROS(
-                            df=g,
-                            result=self._raw_rescol,
-                            censorship=self.cencol,
-                            as_array=False,
-                        )
-                        .rename(columns={"final": self.roscol})
-                        .loc[:, [self._raw_rescol, self.roscol, self.cencol]]
-                    )
+                    rosdf = ROS_grouped(
+                        df,
+                        by=self.groupcols,
+                        result=self._raw_rescol,
+                        censorship=self.cencol,
+                    ).rename(columns={"final": self.roscol})
                 return rosdf
 
         else:
@@ -158,16 +186,20 @@ class DataCollection:
                 g[self.roscol] = numpy.nan
                 return g
 
-        if tqdm and self.showpbar:
+            if tqdm and self.showpbar:
 
-            def make_tidy(df):
-                tqdm.pandas(desc="Tidying the DataCollection")
-                return df.groupby(self.groupcols).progress_apply(fxn, include_groups=False)
+                def make_tidy(df):
+                    tqdm.pandas(desc="Tidying the DataCollection")
+                    return (
+                        df.groupby(self.groupcols)
+                        .progress_apply(fxn, include_groups=False)
+                        .reset_index()
+                    )
 
-        else:
+            else:
 
-            def make_tidy(df):
-                return df.groupby(self.groupcols).apply(fxn, include_groups=False)
+                def make_tidy(df):
+                    return df.groupby(self.groupcols).apply(fxn, include_groups=False).reset_index()
 
         # keep_cols = self.tidy_columns
         with warnings.catch_warnings():
@@ -177,7 +209,6 @@ class DataCollection:
                 .groupby(by=self.groupcols)
                 .filter(self.filterfxn)
                 .pipe(make_tidy)
-                .reset_index()
                 .sort_values(by=self.groupcols)
             )
 
@@ -195,6 +226,25 @@ class DataCollection:
         )[[self._raw_rescol, self.cencol]]
         return _pairs
 
+    def _random_streams(self, n):
+        """Independent random streams for ``n`` groups."""
+
+        if self.random_state is None:
+            return [None] * n
+        return bootstrap.spawn(self.random_state, n)
+
+    def _resample_plan(self, size):
+        """Bootstrap index shared by all of the groups of ``size``
+        results."""
+
+        if size not in self._resample_plans:
+            sizes = sorted(self.tidy.groupby(by=self.groupcols).size().unique())
+            random_state = self._random_streams(len(sizes))[sizes.index(size)]
+            self._resample_plans[size] = bootstrap.ResamplePlan(
+                size, niter=self.bsiter, random_state=random_state
+            )
+        return self._resample_plans[size]
+
     def generic_stat(
         self,
         statfxn,
@@ -202,6 +252,7 @@ class DataCollection:
         statname=None,
         has_pvalue=False,
         filterfxn=None,
+        ci_method=None,
         **statopts,
     ):
         """Generic function to estimate a statistic and its CIs.
@@ -213,14 +264,19 @@ class DataCollection:
             results. Its call signature should be in the form:
             ``statfxn(seq, **kwargs)``.
         use_bootstrap : bool, optional
-            Toggles using a BCA bootstrapping method to estimate the
-            95% confidence interval around the statistic.
+            Toggles estimating the 95% confidence interval around the
+            statistic (using ``ci_method``).
         statname : string, optional
             Name of the statistic. Included as a column name in the
             final dataframe.
         has_pvalue : bool, optional
             Set to ``True`` if ``statfxn`` returns a tuple of the
             statistic and it's p-value.
+        ci_method : string, optional
+            How to estimate the confidence intervals: 'BCA',
+            'percentile', 'analytic', or 'cox'. See
+            ``wqio.bootstrap.confidence_interval``. Defaults to
+            ``self.ci_method``.
         **statopts : optional kwargs
             Additional keyword arguments that will be passed to
             ``statfxn``.
@@ -258,11 +314,24 @@ class DataCollection:
         if filterfxn is None:
             filterfxn = utils.non_filter
 
+        if ci_method is None:
+            ci_method = self.ci_method
+
+        groups = self.tidy.groupby(by=self.groupcols).filter(filterfxn).groupby(by=self.groupcols)
+        group_numbers = groups.ngroup()
+        streams = self._random_streams(groups.ngroups)
+
         def fxn(x):
             data = x[self.rescol].values
             if use_bootstrap:
                 stat = statfxn(data)
-                lci, uci = bootstrap.BCA(data, statfxn=statfxn)
+                if ci_method in ("analytic", "cox"):
+                    opts = {}
+                elif self.share_resamples and ci_method in ("BCA", "percentile"):
+                    opts = dict(plan=self._resample_plan(data.shape[0]))
+                else:
+                    opts = dict(random_state=streams[group_numbers.loc[x.index[0]]])
+                lci, uci = bootstrap.confidence_interval(data, statfxn, ci_method=ci_method, **opts)
                 values = [lci, stat, uci]
                 statnames = ["lower", statname, "upper"]
             else:
@@ -276,8 +345,6 @@ class DataCollection:
 
             return pandas.Series(values, index=statnames)
 
-        groups = self.tidy.groupby(by=self.groupcols).filter(filterfxn).groupby(by=self.groupcols)
-
         if tqdm and self.showpbar:
             tqdm.pandas(desc="Computing stats")
             vals = groups.progress_apply(fxn, include_groups=False)
@@ -338,9 +405,7 @@ class DataCollection:
 
     @cache_readonly
     def logmean(self):
-        return self.generic_stat(
-            lambda x, axis=0: numpy.mean(numpy.log(x), axis=axis), statname="Log-mean"
-        )
+        return self.generic_stat(bootstrap.logmean, statname="Log-mean")
 
     @cache_readonly
     def logstd_dev(self):
@@ -634,8 +699,84 @@ class DataCollection:
             lambda g: utils.dunn_test(g, self.rescol, self.stationcol, *self.othergroups).scores
         )
 
-    def theilslopes(self, logs=False):
-        raise NotImplementedError
+    def theilslopes(self, logs=False, alpha=0.95, percentile=50, n_jobs=None, executor=None):
+        """
+        Theil-Sen slopes of the paired results of every pair of
+        stations in each group, all fit in one batch.
+
+        Parameters
+        ----------
+        logs : bool, optional (default = False)
+            When True, the fits are done on log-transformed results.
+        alpha, percentile : float, optional
+            See ``wqio.utils.compute_theilslope``.
+        n_jobs : int, optional
+            Number of worker processes (see
+            ``wqio.utils.compute_theilslope_batched``).
+        executor : concurrent.futures.Executor, optional
+            Executor used to run the parts of the batch.
+
+        Returns
+        -------
+        theil : pandas.DataFrame
+            The slope, intercept, and confidence interval of the slope
+            of the results of the second station (y) versus those of
+            the first (x) for every permutation of the stations.
+
+        """
+
+        station_columns = [self.stationcol + "_1", self.stationcol + "_2"]
+        index_cols = self.groupcols_comparison + station_columns
+
+        datasets = {}
+        groups = self.paired.groupby(level=self.groupcols_comparison)[self._raw_rescol]
+        for name, g in groups:
+            name = validate.at_least_empty_list(name)
+            for _x, _y in itertools.permutations(g.columns.tolist(), 2):
+                _df = g[[_x, _y]].dropna()
+                x, y = _df[_x].values, _df[_y].values
+                if logs:
+                    x, y = numpy.log(x), numpy.log(y)
+                datasets[(*name, _x, _y)] = (x, y)
+
+        theil = utils.compute_theilslope_batched(
+            datasets, alpha=alpha, percentile=percentile, n_jobs=n_jobs, executor=executor
+        )
+        theil.index = pandas.MultiIndex.from_tuples(list(datasets.keys()), names=index_cols)
+        return theil
+
+    def trend(self, datecol, seasonal=False, alpha=0.05):
+        """
+        Mann-Kendall (or Seasonal Kendall) trend test of the results of
+        every group, all computed together.
+
+        Parameters
+        ----------
+        datecol : str
+            Column (or index level) of the raw data with the sample
+            dates.
+        seasonal : bool, optional (default = False)
+            When True, uses the Seasonal Kendall test (see
+            ``wqio.trend.seasonal_kendall``).
+        alpha : float, optional (default = 0.05)
+            Significance level of the trends.
+
+        Returns
+        -------
+        trends : pandas.DataFrame
+            The ``wqio.trend.KendallTrend`` of each group.
+
+        """
+
+        # the dates aren't part of the tidy data, so the ROS'd results
+        # are matched to the rows of the raw data
+        data = self.data.reset_index().groupby(by=self.groupcols).filter(self.filterfxn)
+        if self.useros:
+            data = data.assign(**{self.rescol: self._tidy_rows[self.rescol]})
+
+        return trend.kendall_trends(
+            data, self.rescol, datecol, groupcols=self.groupcols, seasonal=seasonal, alpha=alpha
+        )
 
     @cache_readonly
     def locations(self):
@@ -644,7 +785,8 @@ class DataCollection:
             self.data.groupby(by=self.groupcols).filter(self.filterfxn).groupby(by=self.groupcols)
         )
         cols = [self._raw_rescol, self.qualcol]
-        for names, data in groups:
+        streams = self._random_streams(groups.ngroups)
+        for (names, data), random_state in zip(groups, streams):
             loc_dict = dict(zip(self.groupcols, names))
             loc = (
                 data.set_index(self.pairgroups)[cols]
@@ -657,6 +799,8 @@ class DataCollection:
                     ndval=self.ndval,
                     bsiter=self.bsiter,
                     useros=self.useros,
+                    random_state=random_state,
+                    ci_method=self.ci_method,
                 )
             )
 
@@ -61,6 +61,20 @@ class Location:
     include : bool, optional (default = True)
         Toggles the inclusion of the location when programmatically
         creating many `Location` objects.
+    random_state : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+        Seed of the bootstrapped confidence intervals. All of the
+        intervals are computed from the same resampled data (see
+        ``wqio.bootstrap.ResamplePlan``), so the results do not depend
+        on the order in which they are accessed. When not provided, the
+        global ``numpy.random`` state is used.
+    ci_method : string, optional (default = 'BCA')
+        How the confidence intervals are estimated: 'BCA' or
+        'percentile' bootstrapping, 'studentized' or 'double'
+        (nested) bootstrapping, or without any resampling via
+        'analytic' (exact order-statistic intervals for the median and
+        t-intervals for the means) or 'cox' (same as 'analytic', but
+        the Cox method for the arithmetic mean). See
+        ``wqio.bootstrap.confidence_interval``.
 
     Settable Properties
     -------------------
@@ -149,6 +163,8 @@ class Location:
         cencol="cen",
         bsiter=10000,
         include=True,
+        random_state=None,
+        ci_method="BCA",
     ):
         # plotting symbology based on location type
         self.station_type = station_type
@@ -167,6 +183,10 @@ class Location:
 
         # properties of the dataframe and analysis
         self.bsiter = bsiter
+        self.random_state = random_state
+        if ci_method not in bootstrap.CI_METHODS:
+            raise ValueError(f"`ci_method` must be one of {bootstrap.CI_METHODS}")
+        self.ci_method = ci_method
         self.useros = useros
         self.rescol = rescol
         self.qualcol = qualcol
@@ -349,6 +369,40 @@ class Location:
         if self.hasData:
             return numpy.percentile(self.data, 90)
 
+    @cache_readonly
+    def _conf_intervals(self):
+        """Confidence intervals around the median, mean, and log-mean.
+        With BCA or percentile bootstrapping, they all share one set of
+        resampled data."""
+
+        statfxns = {"median": numpy.median, "mean": numpy.mean}
+        if self.all_positive:
+            statfxns["logmean"] = bootstrap.logmean
+
+        if self.ci_method in ("analytic", "cox"):
+            lognormal = self.ci_method == "cox"
+            CIs = [
+                bootstrap.analytic_CI(self.data, fxn, lognormal=lognormal)
+                for fxn in statfxns.values()
+            ]
+        elif self.ci_method in ("studentized", "double"):
+            CIs = [
+                bootstrap.confidence_interval(
+                    self.data,
+                    fxn,
+                    ci_method=self.ci_method,
+                    niter=self.bsiter,
+                    random_state=self.random_state,
+                )
+                for fxn in statfxns.values()
+            ]
+        else:
+            plan = bootstrap.ResamplePlan(
+                self.data.shape[0], niter=self.bsiter, random_state=self.random_state
+            )
+            CIs = getattr(plan, self.ci_method)(self.data, list(statfxns.values()))
+        return dict(zip(statfxns, CIs))
+
     # stats that we need
     @cache_readonly
     def median(self):
@@ -358,7 +412,7 @@ class Location:
     @cache_readonly
     def median_conf_interval(self):
         if self.hasData:
-            return bootstrap.BCA(self.data, numpy.median, niter=self.bsiter)
+            return self._conf_intervals["median"]
 
     @cache_readonly
     def mean(self):
@@ -368,7 +422,7 @@ class Location:
     @cache_readonly
     def mean_conf_interval(self):
         if self.hasData:
-            return bootstrap.BCA(self.data, numpy.mean, niter=self.bsiter)
+            return self._conf_intervals["mean"]
 
     @cache_readonly
     def std(self):
@@ -383,11 +437,7 @@ class Location:
     @cache_readonly
     def logmean_conf_interval(self):
         if self.all_positive and self.hasData:
-
-            def fxn(x, **kwds):
-                return numpy.mean(numpy.log(x), **kwds)
-
-            return bootstrap.BCA(self.data, fxn, niter=self.bsiter)
+            return self._conf_intervals["logmean"]
 
     @cache_readonly
     def logstd(self):
@@ -866,6 +916,40 @@ class Dataset:
         return not self.include
 
     # stats describing the dataset
+    def paired_bootstrap(self, statfxn=numpy.median, **bootopts):
+        """
+        Confidence intervals around the change in a statistic from the
+        influent to the effluent, resampling the paired data jointly.
+
+        Parameters
+        ----------
+        statfxn : callable, optional (default = numpy.median)
+            Statistic to compare (e.g., ``numpy.median``,
+            ``numpy.mean``, or ``wqio.bootstrap.geomean``).
+        **bootopts : optional kwargs
+            Passed directly to ``wqio.bootstrap.paired``.
+
+        Returns
+        -------
+        BootstrappedPairedEstimate : namedtuple or None
+            The difference, ratio, and percent removal of the statistic
+            and their confidence intervals, or None if there are not
+            enough paired data.
+
+        See also
+        --------
+        wqio.bootstrap.paired
+
+        """
+
+        if self._paired_stats:
+            return bootstrap.paired(
+                self.paired_data.inflow.res.values,
+                self.paired_data.outflow.res.values,
+                statfxn,
+                **bootopts,
+            )
+
     @cache_readonly
     def medianCIsOverlap(self):
         overlap = True
@@ -1,14 +1,37 @@
+import hashlib
 import logging
+import threading
 import warnings
+from collections import OrderedDict, namedtuple
 
 import numpy
 import pandas
 from scipy import stats
+from statsmodels.tools.decorators import cache_readonly
 
-from wqio import utils
+from wqio import utils, validate
 
 _logger = logging.getLogger(__name__)
 
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "entries", "nbytes", "maxbytes"])
+
+_OrderStats = namedtuple(
+    "ROSOrderStatistics",
+    [
+        "DLs",
+        "nuncen_above",
+        "nobs_below",
+        "ncen_equal",
+        "prob_exceedance",
+        "result",
+        "censored",
+        "det_limit_index",
+        "rank",
+        "plot_pos",
+        "Zprelim",
+    ],
+)
+
 
 def _ros_sort(df, result, censorship, log=True, warn=False):
     """
@@ -62,6 +85,96 @@ def _ros_sort(df, result, censorship, log=True, warn=False):
     return df_sorted[[result, censorship]]
 
 
+def _compute_PE(A, B):
+    r"""Computes the probability of exceedance for each detection limit.
+
+    The recurrence :math:`\mathrm{PE}_j = \mathrm{PE}_{j+1} + (1 -
+    \mathrm{PE}_{j+1}) A_j / (A_j + B_j)` is equivalent to a reversed
+    cumulative product of the non-exceedance ratios.
+
+    Parameters
+    ----------
+    A, B : numpy.array
+        Number of uncensored observations above and number of all
+        observations below each detection limit.
+
+    Returns
+    -------
+    prob_exceedance : numpy.array
+        One element longer than ``A`` and ``B`` with a final value
+        of zero.
+
+    """
+
+    ratio = 1 - A / (A + B)
+    PE = numpy.zeros(A.shape[0] + 1, dtype="float64")
+    PE[:-1] = 1 - numpy.cumprod(ratio[::-1])[::-1]
+    return PE
+
+
+def _cohn_arrays(res, cen):
+    """Array-based counterpart to :func:`cohn_numbers`.
+
+    Parameters
+    ----------
+    res : numpy.array of float
+        Observed values. Censored values should be set to the detection
+        (upper) limit.
+    cen : numpy.array of bool
+        Censorship status of each value in ``res``.
+
+    Returns
+    -------
+    DLs, nuncen_above, nobs_below, ncen_equal : numpy.array
+        Sorted detection limits and their Cohn numbers (as floats).
+    prob_exceedance : numpy.array
+        Probability of exceedance for each detection limit with an
+        additional zero at the end.
+
+    """
+
+    uncensored = numpy.sort(res[~cen])
+    censored = numpy.sort(res[cen])
+    return _sorted_cohn_arrays(uncensored, censored, numpy.unique(censored))
+
+
+def _sorted_cohn_arrays(uncensored, censored, DLs):
+    """Computes the Cohn numbers from data that is already sorted.
+
+    Parameters
+    ----------
+    uncensored, censored : numpy.array of float
+        Sorted uncensored and censored results.
+    DLs : numpy.array of float
+        Sorted, unique values of ``censored``.
+
+    Returns
+    -------
+    See :func:`_cohn_arrays`.
+
+    """
+
+    # if there is a results smaller than the minimum detection limit,
+    # add that value to the array
+    firsts = numpy.hstack([uncensored[:1], censored[:1]])
+    min_result = numpy.nanmin(firsts) if firsts.shape[0] > 0 else numpy.nan
+    if DLs.shape[0] > 0 and min_result < DLs[0]:
+        DLs = numpy.hstack([min_result, DLs])
+
+    upper = numpy.hstack([DLs[1:], numpy.inf])
+
+    # number of uncensored/censored values strictly below and censored
+    # values at or below each of the detection limits
+    uncen_lt = numpy.searchsorted(uncensored, DLs, side="left")
+    cen_lt = numpy.searchsorted(censored, DLs, side="left")
+    cen_lte = numpy.searchsorted(censored, DLs, side="right")
+
+    A = (numpy.searchsorted(uncensored, upper, side="left") - uncen_lt).astype(float)
+    B = (cen_lte + uncen_lt).astype(float)
+    C = (cen_lte - cen_lt).astype(float)
+    return DLs, A, B, C, _compute_PE(A, B)
+
+
 def cohn_numbers(df, result, censorship):
     r"""
     Computes the Cohn numbers for the detection limits in the dataset.
@@ -98,93 +211,30 @@ def cohn_numbers(df, result, censorship):
 
     """
 
-    def nuncen_above(row):
-        """A, the number of uncensored obs above the given threshold."""
-
-        # index of results above the lower_dl DL
-        above = df[result] >= row["lower_dl"]
+    # unique, sorted detection limits and the Cohn numbers for each
+    res = df[result].to_numpy(dtype=float)
+    cen = df[censorship].to_numpy(dtype=bool)
+    return _cohn_frame(*_cohn_arrays(res, cen))
 
-        # index of results below the upper_dl DL
-        below = df[result] < row["upper_dl"]
 
-        # index of non-detect results
-        detect = df[censorship].eq(False)
-
-        # return the number of results where all conditions are True
-        return df[above & below & detect].shape[0]
-
-    def nobs_below(row):
-        """B, the number of observations (cen & uncen) below the given
-        threshold
-        """
+def _cohn_frame(DLs, nuncen_above, nobs_below, ncen_equal, prob_exceedance):
+    """Assembles the output of :func:`_cohn_arrays` into the dataframe
+    returned by :func:`cohn_numbers`."""
 
-        # index of data less than the lower_dl DL
-        less_than = df[result] < row["lower_dl"]
-
-        # index of data less than or equal to the lower_dl DL
-        less_thanequal = df[result] <= row["lower_dl"]
-
-        # index of detects, non-detects
-        uncensored = df[censorship].eq(False)
-        censored = df[censorship].eq(True)
-
-        # number results less than or equal to lower_dl DL and non-detect
-        LTE_censored = df[less_thanequal & censored].shape[0]
-
-        # number of results less than lower_dl DL and detected
-        LT_uncensored = df[less_than & uncensored].shape[0]
-
-        # return the sum
-        return LTE_censored + LT_uncensored
-
-    def ncen_equal(row):
-        """C, the number of censored observations at the given
-        threshold.
-        """
-
-        censored_index = df[censorship]
-        censored_data = df[result][censored_index]
-        censored_below = censored_data == row["lower_dl"]
-        return censored_below.sum()
-
-    def set_upper_limit(cohn):
-        """Sets the upper_dl DL for each row of the Cohn dataframe."""
-        if cohn.shape[0] > 1:
-            return cohn["lower_dl"].shift(-1).fillna(value=numpy.inf)
-        else:
-            return [numpy.inf]
-
-    def compute_PE(A, B):
-        """Computes the probability of excedance for each row of the
-        Cohn dataframe."""
-        N = len(A)
-        PE = numpy.empty(N, dtype="float64")
-        PE[-1] = 0.0
-        for j in range(N - 2, -1, -1):
-            PE[j] = PE[j + 1] + (1 - PE[j + 1]) * A[j] / (A[j] + B[j])
-
-        return PE
-
-    # unique, sorted detection limts
-    censored_data = df[censorship]
-    DLs = pandas.unique(df.loc[censored_data, result])
-    DLs.sort()
-
-    # if there is a results smaller than the minimum detection limit,
-    # add that value to the array
     if DLs.shape[0] > 0:
-        if df[result].min() < DLs.min():
-            DLs = numpy.hstack([df[result].min(), DLs])
-
         # create a dataframe
         cohn = (
-            pandas.DataFrame(DLs, columns=["lower_dl"])
-            .assign(upper_dl=lambda df: set_upper_limit(df))
-            .assign(nuncen_above=lambda df: df.apply(nuncen_above, axis=1))
-            .assign(nobs_below=lambda df: df.apply(nobs_below, axis=1))
-            .assign(ncen_equal=lambda df: df.apply(ncen_equal, axis=1))
+            pandas.DataFrame(
+                {
+                    "lower_dl": DLs,
+                    "upper_dl": numpy.hstack([DLs[1:], numpy.inf]),
+                    "nuncen_above": nuncen_above,
+                    "nobs_below": nobs_below,
+                    "ncen_equal": ncen_equal,
+                }
+            )
             .reindex(range(DLs.shape[0] + 1))
-            .assign(prob_exceedance=lambda df: compute_PE(df["nuncen_above"], df["nobs_below"]))
+            .assign(prob_exceedance=prob_exceedance)
         )
 
     else:
@@ -232,6 +282,27 @@ def _detection_limit_index(res, cohn):
     return det_limit_index
 
 
+def _detection_limit_indices(results, lower_dl):
+    """Vectorized version of :func:`_detection_limit_index`.
+
+    Parameters
+    ----------
+    results : numpy.array of float
+        Observed results from the larger dataset.
+    lower_dl : numpy.array of float
+        The sorted detection limits (``cohn["lower_dl"]``).
+
+    Returns
+    -------
+    det_limit_index : numpy.array of int
+
+    """
+
+    if lower_dl.shape[0] > 0:
+        return numpy.searchsorted(lower_dl, results, side="right") - 1
+    return numpy.zeros(results.shape[0], dtype=int)
+
+
 def _ros_group_rank(df, dl_idx, censorship):
     """
     Ranks each result within the groups defined by the record's
@@ -255,12 +326,37 @@ def _ros_group_rank(df, dl_idx, censorship):
 
     """
 
-    ranks = (
-        df.assign(rank=1).groupby(by=[dl_idx, censorship])["rank"].transform(lambda g: g.cumsum())
-    )
+    ranks = df.groupby(by=[dl_idx, censorship]).cumcount().add(1).rename("rank")
     return ranks
 
 
+def _sorted_group_rank(dl_idx, censored):
+    """
+    Array-based version of :func:`_ros_group_rank` for results that are
+    already sorted by censorship and value, so that every group of
+    detection limit index and censorship is a contiguous run.
+
+    Parameters
+    ----------
+    dl_idx : numpy.array of int
+        Index of each result's detection limit.
+    censored : numpy.array of bool
+        Censorship status of each result.
+
+    Returns
+    -------
+    ranks : numpy.array of int
+
+    """
+
+    N = dl_idx.shape[0]
+    new_group = numpy.ones(N, dtype=bool)
+    new_group[1:] = (dl_idx[1:] != dl_idx[:-1]) | (censored[1:] != censored[:-1])
+    starts = numpy.flatnonzero(new_group)
+    group = numpy.cumsum(new_group) - 1
+    return numpy.arange(1, N + 1) - starts[group]
+
+
 def _ros_plot_pos(row, censorship, cohn):
     """
     Compute the ROS plotting position for a result based on its rank,
@@ -320,6 +416,46 @@ def _norm_plot_pos(results):
     return stats.norm.cdf(ppos)
 
 
+def _plotting_positions(dl_idx, rank, censored, prob_exceedance, ncen_equal, nuncen_above):
+    """
+    Array-based ROS plotting positions. The Cohn numbers of each
+    result's detection limit are gathered by ``dl_idx`` instead of
+    being looked up row by row.
+
+    Parameters
+    ----------
+    dl_idx, rank : numpy.array of int
+        Index of each result's detection limit and its rank within
+        the groups defined by that index and the censorship status.
+    censored : numpy.array of bool
+        Censorship status of each result.
+    prob_exceedance, ncen_equal, nuncen_above : numpy.array
+        Columns of the Cohn numbers (see :func:`cohn_numbers`).
+
+    Returns
+    -------
+    plotting_position : numpy.array of float
+        Unsorted plotting positions. Callers are responsible for
+        sorting the values of the censored data.
+
+    """
+
+    plot_pos = numpy.empty(dl_idx.shape[0], dtype="float64")
+    uncensored = ~censored
+
+    # censored values
+    idx = dl_idx[censored]
+    pe_1 = prob_exceedance[idx]
+    plot_pos[censored] = (1 - pe_1) * rank[censored] / (ncen_equal[idx] + 1)
+
+    # uncensored values
+    idx = dl_idx[uncensored]
+    pe_1 = prob_exceedance[idx]
+    pe_2 = prob_exceedance[idx + 1]
+    plot_pos[uncensored] = (1 - pe_1) + (pe_1 - pe_2) * rank[uncensored] / (nuncen_above[idx] + 1)
+    return plot_pos
+
+
 def plotting_positions(df, censorship, cohn):
     """
     Compute the ROS plotting positions for results based on their rank,
@@ -345,14 +481,19 @@ def plotting_positions(df, censorship, cohn):
 
     """
 
-    plot_pos = df.apply(lambda r: _ros_plot_pos(r, censorship, cohn), axis=1)
+    plot_pos = _plotting_positions(
+        df["det_limit_index"].to_numpy(),
+        df["rank"].to_numpy(),
+        df[censorship].to_numpy(dtype=bool),
+        cohn["prob_exceedance"].to_numpy(),
+        cohn["ncen_equal"].to_numpy(),
+        cohn["nuncen_above"].to_numpy(),
+    )
 
     # correctly sort the plotting positions of the ND data:
-    ND_plotpos = plot_pos[df[censorship]]
-    ND_plotpos.values.sort()
-    plot_pos.loc[df[censorship]] = ND_plotpos
-
-    return plot_pos
+    censored = df[censorship].to_numpy(dtype=bool)
+    plot_pos[censored] = numpy.sort(plot_pos[censored])
+    return pandas.Series(plot_pos, index=df.index)
 
 
 def _ros_estimate(df, result, censorship, transform_in, transform_out):
@@ -459,7 +600,9 @@ def _do_ros(
         modeled = (
             df.pipe(_ros_sort, result=result, censorship=censorship, log=log, warn=warn)
             .assign(
-                det_limit_index=lambda df: df[result].apply(_detection_limit_index, args=(cohn,))
+                det_limit_index=lambda df: _detection_limit_indices(
+                    df[result].to_numpy(), cohn["lower_dl"].to_numpy()
+                )
             )
             .assign(rank=lambda df: _ros_group_rank(df, "det_limit_index", censorship))
             .assign(plot_pos=lambda df: plotting_positions(df, censorship, cohn))
@@ -473,15 +616,22 @@ def _do_ros(
     return modeled
 
 
-def is_valid_to_ros(df, censorship, max_fraction_censored=0.8, min_uncensored=2, as_obj=False):
-    # basic counts/metrics of the dataset
-    N_observations = df.shape[0]
-    N_censored = df[censorship].astype(int).sum()
+def _ros_validity(N_observations, N_censored, max_fraction_censored, min_uncensored):
     N_uncensored = N_observations - N_censored
     fraction_censored = N_censored / N_observations
 
     enough_uncensored = N_uncensored >= min_uncensored
     not_too_many_censored = fraction_censored <= max_fraction_censored
+    return enough_uncensored, not_too_many_censored
+
+
+def is_valid_to_ros(df, censorship, max_fraction_censored=0.8, min_uncensored=2, as_obj=False):
+    # basic counts/metrics of the dataset
+    N_observations = df.shape[0]
+    N_censored = df[censorship].astype(int).sum()
+    enough_uncensored, not_too_many_censored = _ros_validity(
+        N_observations, N_censored, max_fraction_censored, min_uncensored
+    )
 
     if as_obj:
         return {
@@ -491,6 +641,667 @@ def is_valid_to_ros(df, censorship, max_fraction_censored=0.8, min_uncensored=2,
     return enough_uncensored and not_too_many_censored
 
 
+def _ros_order_stats(res, cen, log=True, warn=False):
+    """
+    Computes everything needed for ROS that does not depend on the
+    transformations of the data: the Cohn numbers, the sort order,
+    ranks, and plotting positions.
+
+    Parameters
+    ----------
+    res : numpy.array of float
+        Observed values. Censored values should be set to the detection
+        (upper) limit.
+    cen : numpy.array of bool
+        Censorship status of each value in ``res``.
+
+    Returns
+    -------
+    ROSOrderStatistics : namedtuple
+        Arrays of the Cohn numbers (``DLs``, ``nuncen_above``,
+        ``nobs_below``, ``ncen_equal``, and ``prob_exceedance``) and of
+        the sorted data (``result``, ``censored``, ``det_limit_index``,
+        ``rank``, ``plot_pos``, and ``Zprelim``). The censored results
+        are sorted to the top and censored results greater than the max
+        uncensored result are dropped.
+
+    """
+
+    uncensored = numpy.sort(res[~cen])
+    censored = numpy.sort(res[cen])
+    return _sorted_order_stats(uncensored, censored, numpy.unique(censored), log=log, warn=warn)
+
+
+def _sorted_order_stats(uncensored, censored, DLs, log=True, warn=False):
+    """
+    Computes the ordered statistics of :func:`_ros_order_stats` from
+    data that is already sorted.
+
+    Parameters
+    ----------
+    uncensored, censored : numpy.array of float
+        Sorted uncensored and censored results.
+    DLs : numpy.array of float
+        Sorted, unique values of ``censored``.
+
+    Returns
+    -------
+    ROSOrderStatistics : namedtuple
+
+    """
+
+    DLs, nuncen_above, nobs_below, ncen_equal, prob_exceedance = _sorted_cohn_arrays(
+        uncensored, censored, DLs
+    )
+
+    # drop censored results greater than the max uncensored result
+    max_uncensored = numpy.nanmax(uncensored)
+    n_kept = numpy.searchsorted(censored, max_uncensored, side="right")
+    if n_kept < censored.shape[0]:
+        msg = "Dropping censored results greater than the max uncensored result."
+        utils.log_or_warn(
+            msg,
+            warning=UserWarning if warn else None,
+            logger=_logger.debug if log else None,
+        )
+
+    # censored results on top, each block sorted ascending
+    res = numpy.hstack([censored[:n_kept], uncensored])
+    cen = numpy.arange(res.shape[0]) < n_kept
+
+    dl_idx = _detection_limit_indices(res, DLs)
+    rank = _sorted_group_rank(dl_idx, cen)
+    plot_pos = _plotting_positions(dl_idx, rank, cen, prob_exceedance, ncen_equal, nuncen_above)
+    plot_pos[cen] = numpy.sort(plot_pos[cen])
+    Zprelim = stats.norm.ppf(plot_pos)
+
+    return _OrderStats(
+        DLs,
+        nuncen_above,
+        nobs_below,
+        ncen_equal,
+        prob_exceedance,
+        res,
+        cen,
+        dl_idx,
+        rank,
+        plot_pos,
+        Zprelim,
+    )
+
+
+def _ros_fit_estimate(res, cen, Zprelim, transform_in, transform_out, floor=None):
+    """
+    Fits a line to the transformed uncensored data of the sorted data
+    from :func:`_ros_order_stats` and uses it to estimate the censored
+    values.
+
+    Returns
+    -------
+    final : numpy.array of float
+
+    """
+
+    uncen = ~cen
+    slope, intercept = stats.linregress(Zprelim[uncen], transform_in(res[uncen]))[:2]
+    final = res.copy()
+    final[cen] = transform_out(slope * Zprelim[cen] + intercept)
+
+    if floor:
+        final = numpy.where(final >= floor, final, floor)
+
+    return final
+
+
+def _ros_array_estimate(res, cen, transform_in, transform_out, floor=None, log=True, warn=False):
+    """
+    Array-only equivalent of :func:`_do_ros`.
+
+    Parameters
+    ----------
+    res : numpy.array of float
+        Observed values. Censored values should be set to the detection
+        (upper) limit.
+    cen : numpy.array of bool
+        Censorship status of each value in ``res``.
+    transform_in, transform_out : callable
+        Transformations to be applied to the data prior to fitting
+        the line and after estimated values from that line.
+    floor : float (optional)
+        Lower bound of the final values.
+
+    Returns
+    -------
+    final : numpy.array of float
+        Final results in the same order as the "final" column returned
+        by :func:`_do_ros` (i.e., censored results first, each block
+        sorted ascending).
+
+    """
+
+    order_stats = _ros_order_stats(res, cen, log=log, warn=warn)
+    return _ros_fit_estimate(
+        order_stats.result,
+        order_stats.censored,
+        order_stats.Zprelim,
+        transform_in,
+        transform_out,
+        floor=floor,
+    )
+
+
+def ros_array(
+    result,
+    censored,
+    min_uncensored=2,
+    max_fraction_censored=0.8,
+    substitution_fraction=0.5,
+    transform_in=numpy.log,
+    transform_out=numpy.exp,
+    floor=None,
+    log=True,
+    warn=False,
+):
+    """
+    Impute a censored dataset using ROS (or simple substitution)
+    working only with numpy arrays.
+
+    This is the lean counterpart to :func:`ROS` that skips building
+    the intermediate dataframe. ``ROS(..., as_array=True)`` dispatches
+    here.
+
+    Parameters
+    ----------
+    result : array-like of float
+        Censored results. Censored values should be set to the
+        detection (upper) limit.
+    censored : array-like of bool
+        Censorship status of each result (True -> censored).
+    min_uncensored, max_fraction_censored : int, float
+        Criteria for using ROS instead of simple substitution. See
+        :func:`ROS`.
+    substitution_fraction : float (default is 0.5)
+        The fraction of the detection limit to be used during simple
+        substitution of the censored values.
+    transform_in, transform_out : callable
+        Transformations to be applied to the data prior to fitting
+        the line and after estimated values from that line.
+    floor : float (optional)
+        When provided, all resulting values (inputed or otherwise) that
+        are less than the `floor` will be replaced with its value.
+
+    Returns
+    -------
+    imputed : numpy.array
+        Identical to the output of ``ROS(..., as_array=True)``.
+
+    """
+
+    res = numpy.asarray(result, dtype=float)
+    cen = numpy.asarray(censored, dtype=bool)
+    params = (
+        min_uncensored,
+        max_fraction_censored,
+        substitution_fraction,
+        transform_in,
+        transform_out,
+        floor,
+    )
+    return _cached(
+        ("ros_array", *params, log, warn), (res, cen), _ros_array, res, cen, *params, log, warn
+    )
+
+
+def _ros_array(
+    res,
+    cen,
+    min_uncensored,
+    max_fraction_censored,
+    substitution_fraction,
+    transform_in,
+    transform_out,
+    floor,
+    log,
+    warn,
+):
+    N_censored = cen.sum()
+    if N_censored == 0:
+        return res.copy()
+
+    enough_uncensored, not_too_many_censored = _ros_validity(
+        res.shape[0], N_censored, max_fraction_censored, min_uncensored
+    )
+    if enough_uncensored and not_too_many_censored:
+        with warnings.catch_warnings():
+            warnings.simplefilter("once")
+            return _ros_array_estimate(
+                res, cen, transform_in, transform_out, floor=floor, log=log, warn=warn
+            )
+
+    return numpy.where(cen, res * substitution_fraction, res)
+
+
+def _segmented_ros_estimate(
+    group, res, cen, transform_in, transform_out, floor=None, log=True, warn=False
+):
+    """
+    Estimates the censored values of many groups of data at once with
+    segmented array operations.
+
+    Parameters
+    ----------
+    group : numpy.array of int
+        Contiguous group codes (0, 1, ..., G - 1) of each result.
+    res : numpy.array of float
+        Observed values. Censored values should be set to the detection
+        (upper) limit.
+    cen : numpy.array of bool
+        Censorship status of each value in ``res``.
+    transform_in, transform_out : callable
+        Vectorized transformations to be applied to the data prior to
+        fitting the lines and after estimated values from those lines.
+    floor : float (optional)
+        Lower bound of the final values.
+
+    Returns
+    -------
+    keep : numpy.array of bool
+        False where censored results were greater than their group's
+        maximum uncensored result and were dropped.
+    final : numpy.array of float
+        Final results of the rows that were kept.
+
+    Notes
+    -----
+    The inputs must be sorted by group, then censorship (censored
+    first), then result. Every group must have censored results and
+    be valid for ROS (see :func:`is_valid_to_ros`).
+
+    """
+
+    N_groups = group[-1] + 1
+    n_obs = numpy.bincount(group, minlength=N_groups)
+    n_cen = numpy.bincount(group[cen], minlength=N_groups)
+    first = numpy.cumsum(n_obs) - n_obs
+    last = first + n_obs - 1
+
+    # Results are replaced by their dense ranks and offset by group so
+    # that sorted searches never cross from one group into another. A
+    # rank of `width - 1` represents infinity.
+    _, rank = numpy.unique(res, return_inverse=True)
+    width = rank.max() + 2
+    key = group * width + rank.reshape(-1)
+
+    # since the data are sorted, these are sorted too
+    cen_keys = key[cen]
+    uncen_keys = key[~cen]
+
+    # unique detection limits of each group, with the group's minimum
+    # prepended if it is smaller than the lowest detection limit
+    has_uncen = n_obs > n_cen
+    first_uncen = key[numpy.minimum(first + n_cen, last)]
+    needs_min = has_uncen & (first_uncen < key[first])
+    dl_keys = numpy.unique(numpy.hstack([cen_keys, first_uncen[needs_min]]))
+    dl_group = dl_keys // width
+    group_start = dl_group * width
+
+    upper = dl_group * width + (width - 1)
+    same_group = dl_group[1:] == dl_group[:-1]
+    upper[:-1][same_group] = dl_keys[1:][same_group]
+
+    # Cohn numbers
+    uncen_lt = numpy.searchsorted(uncen_keys, dl_keys, side="left")
+    cen_lt = numpy.searchsorted(cen_keys, dl_keys, side="left")
+    cen_lte = numpy.searchsorted(cen_keys, dl_keys, side="right")
+    cen_start = numpy.searchsorted(cen_keys, group_start, side="left")
+    A = (numpy.searchsorted(uncen_keys, upper, side="left") - uncen_lt).astype(float)
+    B = (
+        (cen_lte - cen_start)
+        + (uncen_lt - numpy.searchsorted(uncen_keys, group_start, side="left"))
+    ).astype(float)
+    C = (cen_lte - cen_lt).astype(float)
+
+    # segmented, reversed cumulative product (see _compute_PE)
+    ratio = 1 - A / (A + B)
+    survival = pandas.Series(ratio[::-1]).groupby(dl_group[::-1]).cumprod().to_numpy()[::-1]
+
+    # lay the Cohn numbers out as if the tables were stacked, each
+    # with its trailing `prob_exceedance = 0` row
+    position = numpy.arange(dl_keys.shape[0]) + dl_group
+    size = dl_keys.shape[0] + N_groups
+    prob_exceedance = numpy.zeros(size, dtype="float64")
+    prob_exceedance[position] = 1 - survival
+    nuncen_above = numpy.zeros(size, dtype="float64")
+    nuncen_above[position] = A
+    ncen_equal = numpy.zeros(size, dtype="float64")
+    ncen_equal[position] = C
+
+    # drop censored results greater than the max uncensored result
+    max_uncen = numpy.where(has_uncen, key[last], -1)
+    keep = ~(cen & (key > max_uncen[group]))
+    if not keep.all():
+        msg = "Dropping censored results greater than the max uncensored result."
+        utils.log_or_warn(
+            msg,
+            warning=UserWarning if warn else None,
+            logger=_logger.debug if log else None,
+        )
+        group, res, cen, key = group[keep], res[keep], cen[keep], key[keep]
+
+    # plotting positions, with the censored values sorted within groups
+    dl_idx = numpy.searchsorted(dl_keys, key, side="right") - 1
+    ranks = _sorted_group_rank(dl_idx, cen)
+    plot_pos = _plotting_positions(
+        position[dl_idx], ranks, cen, prob_exceedance, ncen_equal, nuncen_above
+    )
+    cen_rows = numpy.flatnonzero(cen)
+    cen_pp = plot_pos[cen_rows]
+    plot_pos[cen_rows] = cen_pp[numpy.lexsort((cen_pp, group[cen_rows]))]
+    Zprelim = stats.norm.ppf(plot_pos)
+
+    # least-squares fit of each group's uncensored data
+    uncen = ~cen
+    g_u = group[uncen]
+    x = Zprelim[uncen]
+    y = transform_in(res[uncen])
+    n_u = numpy.bincount(g_u, minlength=N_groups)
+    xmean = numpy.bincount(g_u, weights=x, minlength=N_groups) / n_u
+    ymean = numpy.bincount(g_u, weights=y, minlength=N_groups) / n_u
+    dx = x - xmean[g_u]
+    ssxm = numpy.bincount(g_u, weights=dx * dx, minlength=N_groups)
+    ssxym = numpy.bincount(g_u, weights=dx * (y - ymean[g_u]), minlength=N_groups)
+    slope = ssxym / ssxm
+    intercept = ymean - slope * xmean
+
+    final = res.copy()
+    g_c = group[cen]
+    final[cen] = transform_out(slope[g_c] * Zprelim[cen] + intercept[g_c])
+
+    if floor:
+        final = numpy.where(final >= floor, final, floor)
+
+    return keep, final
+
+
+def _grouped_ros(
+    codes,
+    res,
+    cen,
+    min_uncensored=2,
+    max_fraction_censored=0.8,
+    substitution_fraction=0.5,
+    transform_in=numpy.log,
+    transform_out=numpy.exp,
+    floor=None,
+    log=True,
+    warn=False,
+):
+    """
+    Array engine behind :func:`ROS_grouped`.
+
+    Parameters
+    ----------
+    codes : numpy.array of int
+        Group code (0, 1, ..., G - 1) of each result.
+    res : numpy.array of float
+        Observed values. Censored values should be set to the detection
+        (upper) limit.
+    cen : numpy.array of bool
+        Censorship status of each value in ``res``.
+
+    Returns
+    -------
+    order : numpy.array of int
+        Indices that sort the input by group (and by censorship and
+        result within the groups that were ROS'd).
+    keep : numpy.array of bool
+        Whether each of the sorted rows was kept (i.e., not a censored
+        result greater than its group's maximum uncensored result).
+    final : numpy.array of float
+        Imputed values of the sorted rows. Values of the rows that were
+        dropped are undefined.
+
+    """
+
+    N = res.shape[0]
+
+    # decide which groups get ROS, substitution, or nothing at all
+    N_groups = codes.max() + 1 if N > 0 else 0
+    n_obs = numpy.bincount(codes, minlength=N_groups)
+    n_cen = numpy.bincount(codes[cen], minlength=N_groups)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        enough_uncensored, not_too_many_censored = _ros_validity(
+            n_obs, n_cen, max_fraction_censored, min_uncensored
+        )
+    use_ros = (n_cen > 0) & enough_uncensored & not_too_many_censored
+    substitute = (n_cen > 0) & ~use_ros
+    final = numpy.where(cen & substitute[codes], res * substitution_fraction, res)
+
+    # sort by group; the ROS'd groups are also sorted with the censored
+    # results on top
+    is_ros = use_ros[codes]
+    order = numpy.lexsort(
+        (numpy.where(is_ros, res, numpy.arange(N)), is_ros & ~cen, codes),
+    )
+    codes, res, cen, final, is_ros = (
+        codes[order],
+        res[order],
+        cen[order],
+        final[order],
+        is_ros[order],
+    )
+
+    keep = numpy.ones(N, dtype=bool)
+    ros_rows = numpy.flatnonzero(is_ros)
+    if ros_rows.shape[0] > 0:
+        _, ros_group = numpy.unique(codes[ros_rows], return_inverse=True)
+        with warnings.catch_warnings():
+            warnings.simplefilter("once")
+            ros_keep, ros_final = _segmented_ros_estimate(
+                ros_group.reshape(-1),
+                res[ros_rows],
+                cen[ros_rows],
+                transform_in,
+                transform_out,
+                floor=floor,
+                log=log,
+                warn=warn,
+            )
+        keep[ros_rows] = ros_keep
+        final[ros_rows[ros_keep]] = ros_final
+
+    return order, keep, final
+
+
+def ROS_grouped(
+    df,
+    by,
+    result,
+    censorship,
+    min_uncensored=2,
+    max_fraction_censored=0.8,
+    substitution_fraction=0.5,
+    transform_in=numpy.log,
+    transform_out=numpy.exp,
+    floor=None,
+    log=True,
+    warn=False,
+):
+    """
+    Impute the censored values of every group in a dataframe in a
+    single pass.
+
+    This is equivalent to
+    ``df.groupby(by).apply(lambda g: ROS(result, censorship, df=g, as_array=False))``,
+    but the data are sorted once and the Cohn numbers, ranks, plotting
+    positions, and regressions of all of the groups are computed with
+    segmented array operations. Groups that are not valid for ROS fall
+    back to simple substitution just like :func:`ROS`.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+    by : str or list of str
+        Columns that define the groups.
+    result : str
+        Label of the column of censored results.
+    censorship : str
+        Label of the column of the censorship status of the results.
+    min_uncensored, max_fraction_censored, substitution_fraction : optional
+        See :func:`ROS`.
+    transform_in, transform_out : callable
+        Transformations to be applied to the data prior to fitting
+        the lines and after estimated values from that line. Must
+        operate element-wise on numpy arrays.
+    floor : float (optional)
+        When provided, all resulting values (inputed or otherwise) of
+        the ROS'd groups that are less than the `floor` will be replaced
+        with its value.
+
+    Returns
+    -------
+    imputed : pandas.DataFrame
+        The ``by``, ``result``, and ``censorship`` columns of ``df``
+        with an additional "final" column. Rows are sorted by group.
+        Within groups that were ROS'd, rows are sorted as they are in
+        ``ROS(..., as_array=False)``; other groups keep their original
+        order. The original index is preserved.
+
+    """
+
+    by = validate.at_least_empty_list(by)
+    params = (
+        min_uncensored,
+        max_fraction_censored,
+        substitution_fraction,
+        transform_in,
+        transform_out,
+        floor,
+    )
+    return _cached(
+        ("ROS_grouped", tuple(by), result, censorship, *params, log, warn),
+        (df[by + [result, censorship]],),
+        _ros_grouped,
+        df,
+        by,
+        result,
+        censorship,
+        *params,
+        log,
+        warn,
+    )
+
+
+def _ros_grouped(
+    df,
+    by,
+    result,
+    censorship,
+    min_uncensored,
+    max_fraction_censored,
+    substitution_fraction,
+    transform_in,
+    transform_out,
+    floor,
+    log,
+    warn,
+):
+    codes = df.groupby(by=by, sort=True).ngroup().to_numpy()
+    has_group = ~numpy.isnan(codes.astype(float))
+    df = df.loc[has_group]
+    codes = codes[has_group].astype(int)
+
+    order, keep, final = _grouped_ros(
+        codes,
+        df[result].to_numpy(dtype=float),
+        df[censorship].to_numpy(dtype=bool),
+        min_uncensored=min_uncensored,
+        max_fraction_censored=max_fraction_censored,
+        substitution_fraction=substitution_fraction,
+        transform_in=transform_in,
+        transform_out=transform_out,
+        floor=floor,
+        log=log,
+        warn=warn,
+    )
+
+    output = df.iloc[order].loc[:, by + [result, censorship]].assign(final=final).loc[keep]
+    return output
+
+
+def ROS_batched(
+    result,
+    censored,
+    min_uncensored=2,
+    max_fraction_censored=0.8,
+    substitution_fraction=0.5,
+    transform_in=numpy.log,
+    transform_out=numpy.exp,
+    floor=None,
+    log=True,
+    warn=False,
+):
+    """
+    Impute every row of a 2-D array of censored data in a single
+    vectorized call (e.g., all of the resampled datasets of a
+    bootstrap).
+
+    Parameters
+    ----------
+    result : 2-D array-like of float
+        Censored results with one dataset per row. Censored values
+        should be set to the detection (upper) limit.
+    censored : 2-D array-like of bool
+        Censorship status of each value in ``result``.
+    min_uncensored, max_fraction_censored, substitution_fraction : optional
+        See :func:`ROS`.
+    transform_in, transform_out : callable
+        Transformations to be applied to the data prior to fitting
+        the lines and after estimated values from that line. Must
+        operate element-wise on numpy arrays.
+    floor : float (optional)
+        When provided, all resulting values (inputed or otherwise) of
+        the ROS'd rows that are less than the `floor` will be replaced
+        with its value.
+
+    Returns
+    -------
+    imputed : numpy.array
+        Array of the same shape as ``result``. Each row is identical to
+        ``ROS(row_result, row_censored)`` followed by NaNs in place of
+        any censored results that were dropped because they were
+        greater than the row's maximum uncensored result.
+
+    """
+
+    res = numpy.atleast_2d(numpy.asarray(result, dtype=float))
+    cen = numpy.atleast_2d(numpy.asarray(censored, dtype=bool))
+    N_rows, N = res.shape
+
+    codes = numpy.repeat(numpy.arange(N_rows), N)
+    order, keep, final = _grouped_ros(
+        codes,
+        res.ravel(),
+        cen.ravel(),
+        min_uncensored=min_uncensored,
+        max_fraction_censored=max_fraction_censored,
+        substitution_fraction=substitution_fraction,
+        transform_in=transform_in,
+        transform_out=transform_out,
+        floor=floor,
+        log=log,
+        warn=warn,
+    )
+
+    # position of each kept value within its row
+    rows = codes[order][keep]
+    columns = numpy.arange(rows.shape[0]) - numpy.searchsorted(rows, rows, side="left")
+
+    imputed = numpy.full((N_rows, N), numpy.nan)
+    imputed[rows, columns] = final[keep]
+    return imputed
+
+
 def ROS(
     result,
     censorship,
@@ -552,9 +1363,11 @@ def ROS(
         estimated from the previously computed best-fit line.
 
     as_array : bool (default is True)
-        When True, a numpy array of the imputed results is returned.
-        Otherwise, a modified copy of the original dataframe with all
-        of the intermediate calculations is returned.
+        When True, a numpy array of the imputed results is returned
+        (computed by :func:`ros_array` without any intermediate
+        dataframes). Otherwise, a modified copy of the original
+        dataframe with all of the intermediate calculations is
+        returned.
 
     floor : float (optional)
         When provided, all resulting values (inputed or otherwise) that are less
@@ -571,12 +1384,65 @@ def ROS(
 
     """
 
+    # skip the dataframes entirely when only the final values are needed
+    if as_array:
+        if df is not None:
+            result = df[result]
+            censorship = df[censorship]
+
+        return ros_array(
+            result,
+            censorship,
+            min_uncensored=min_uncensored,
+            max_fraction_censored=max_fraction_censored,
+            substitution_fraction=substitution_fraction,
+            transform_in=transform_in,
+            transform_out=transform_out,
+            floor=floor,
+            log=log,
+            warn=warn,
+        )
+
     # process arrays into a dataframe, if necessary
     if df is None:
         df = pandas.DataFrame({"res": result, "cen": censorship})
         result = "res"
         censorship = "cen"
 
+    params = (
+        min_uncensored,
+        max_fraction_censored,
+        substitution_fraction,
+        transform_in,
+        transform_out,
+        floor,
+    )
+    return _cached(
+        ("ROS", result, censorship, *params, log, warn),
+        (df[[result, censorship]],),
+        _ros_frame,
+        df,
+        result,
+        censorship,
+        *params,
+        log,
+        warn,
+    )
+
+
+def _ros_frame(
+    df,
+    result,
+    censorship,
+    min_uncensored,
+    max_fraction_censored,
+    substitution_fraction,
+    transform_in,
+    transform_out,
+    floor,
+    log,
+    warn,
+):
     # add plotting positions if there are no censored values
     if df[censorship].astype(int).sum() == 0:
         output = df[[result, censorship]].assign(final=df[result])
@@ -606,8 +1472,452 @@ def ROS(
         final = numpy.where(df[censorship], df[result] * substitution_fraction, df[result])
         output = df.assign(final=final)[[result, censorship, "final"]]
 
-    # convert to an array if necessary
-    if as_array:
-        output = output["final"].values
-
     return output
+
+
+class ROSModel:
+    """
+    Regression on Order Statistics split into its two stages so that
+    the censored data can be re-estimated cheaply.
+
+    The Cohn numbers, sort order, ranks, and plotting positions depend
+    only on the results and their censorship, so they are computed once
+    (lazily) and cached. Calls to :meth:`estimate` with different
+    transformations, floors, or substitution fractions only refit the
+    regression line.
+
+    Parameters
+    ----------
+    result : str or array-like
+        Label of the column or the float array of censored results
+    censorship : str or array-like
+        Label of the column or the bool array of the censorship
+        status of the results.
+    df : pandas.DataFrame, optional
+        If `result` and `censorship` are labels, this is the DataFrame
+        that contains those columns.
+    min_uncensored, max_fraction_censored : int, float
+        Criteria for using ROS instead of simple substitution. See
+        :func:`ROS`.
+
+    Examples
+    --------
+    >>> import numpy
+    >>> from wqio.ros import ROSModel
+    >>> res = numpy.array([1.0, 1.0, 2.5, 3.1, 4.6, 5.2, 7.0, 12.4])
+    >>> cen = numpy.array([True, True, False, False, False, False, False, False])
+    >>> model = ROSModel(res, cen)
+    >>> floored = model.estimate(floor=0.5)
+    >>> linear = model.estimate(transform_in=lambda x: x, transform_out=lambda x: x)
+
+    """
+
+    def __init__(
+        self,
+        result,
+        censorship,
+        df=None,
+        min_uncensored=2,
+        max_fraction_censored=0.8,
+        log=True,
+        warn=False,
+    ):
+        if df is not None:
+            result = df[result]
+            censorship = df[censorship]
+
+        self.result = numpy.asarray(result, dtype=float)
+        self.censored = numpy.asarray(censorship, dtype=bool)
+        self.min_uncensored = min_uncensored
+        self.max_fraction_censored = max_fraction_censored
+        self.log = log
+        self.warn = warn
+        self._cache = {}
+
+    @cache_readonly
+    def method(self):
+        """How the censored data will be estimated: "ROS",
+        "substitution", or "none" when there are no censored data."""
+
+        N_censored = self.censored.sum()
+        if N_censored == 0:
+            return "none"
+
+        enough_uncensored, not_too_many_censored = _ros_validity(
+            self.result.shape[0],
+            N_censored,
+            self.max_fraction_censored,
+            self.min_uncensored,
+        )
+        if enough_uncensored and not_too_many_censored:
+            return "ROS"
+        return "substitution"
+
+    @cache_readonly
+    def order_stats(self):
+        """The cached arrays of the ordered statistics (see
+        ``ROSOrderStatistics``). None unless ``method`` is "ROS"."""
+
+        if self.method == "ROS":
+            with warnings.catch_warnings():
+                warnings.simplefilter("once")
+                return _ros_order_stats(self.result, self.censored, log=self.log, warn=self.warn)
+
+    @cache_readonly
+    def cohn(self):
+        """Dataframe of Cohn numbers (see :func:`cohn_numbers`)."""
+
+        if self.order_stats is not None:
+            order_stats = self.order_stats
+            return _cohn_frame(
+                order_stats.DLs,
+                order_stats.nuncen_above,
+                order_stats.nobs_below,
+                order_stats.ncen_equal,
+                order_stats.prob_exceedance,
+            )
+        return _cohn_frame(*_cohn_arrays(self.result, self.censored))
+
+    @cache_readonly
+    def table(self):
+        """Dataframe of the sorted data and their plotting positions.
+        None unless ``method`` is "ROS"."""
+
+        if self.order_stats is not None:
+            order_stats = self.order_stats
+            return pandas.DataFrame(
+                {
+                    "res": order_stats.result,
+                    "cen": order_stats.censored,
+                    "det_limit_index": order_stats.det_limit_index,
+                    "rank": order_stats.rank,
+                    "plot_pos": order_stats.plot_pos,
+                    "Zprelim": order_stats.Zprelim,
+                }
+            )
+
+    def estimate(
+        self,
+        transform_in=numpy.log,
+        transform_out=numpy.exp,
+        floor=None,
+        substitution_fraction=0.5,
+    ):
+        """
+        Estimate the censored values.
+
+        Parameters
+        ----------
+        transform_in, transform_out : callable
+            Transformations to be applied to the data prior to fitting
+            the line and after estimated values from that line.
+        floor : float (optional)
+            When provided, all resulting values (inputed or otherwise)
+            that are less than the `floor` will be replaced with its
+            value.
+        substitution_fraction : float (default is 0.5)
+            The fraction of the detection limit to be used during simple
+            substitution of the censored values.
+
+        Returns
+        -------
+        imputed : numpy.array
+            Identical to the output of ``ROS(..., as_array=True)``.
+
+        """
+
+        if self.method == "ROS":
+            order_stats = self.order_stats
+            return _ros_fit_estimate(
+                order_stats.result,
+                order_stats.censored,
+                order_stats.Zprelim,
+                transform_in,
+                transform_out,
+                floor=floor,
+            )
+        elif self.method == "substitution":
+            return numpy.where(self.censored, self.result * substitution_fraction, self.result)
+        return self.result.copy()
+
+
+class IncrementalROS(ROSModel):
+    """
+    Convenience wrapper around :class:`ROSModel` for adding new
+    observations to a dataset.
+
+    This is not an incremental algorithm. A single new value changes
+    the probability of exceedance of every lower detection limit, so
+    the Cohn numbers, all of the plotting positions, and the regression
+    are recomputed (lazily, the next time they or an estimate are
+    requested). Each :meth:`append` is therefore O(n), like imputing
+    the whole dataset again. The data are kept as sorted arrays that
+    new observations are merged into, which only saves re-sorting them.
+
+    Parameters
+    ----------
+    result : array-like of float
+        Censored results. Censored values should be set to the
+        detection (upper) limit.
+    censorship : array-like of bool
+        Censorship status of each result (True -> censored).
+    min_uncensored, max_fraction_censored : int, float
+        Criteria for using ROS instead of simple substitution. See
+        :func:`ROS`.
+
+    Examples
+    --------
+    >>> import numpy
+    >>> from wqio.ros import IncrementalROS
+    >>> res = numpy.array([1.0, 1.0, 2.5, 3.1, 4.6, 5.2, 7.0, 12.4])
+    >>> cen = numpy.array([True, True, False, False, False, False, False, False])
+    >>> model = IncrementalROS(res, cen)
+    >>> first = model.estimate()
+    >>> model = model.append([2.0, 8.3], [True, False])
+    >>> second = model.estimate()
+
+    """
+
+    def __init__(
+        self,
+        result,
+        censorship,
+        min_uncensored=2,
+        max_fraction_censored=0.8,
+        log=True,
+        warn=False,
+    ):
+        super().__init__(
+            result,
+            censorship,
+            min_uncensored=min_uncensored,
+            max_fraction_censored=max_fraction_censored,
+            log=log,
+            warn=warn,
+        )
+        self._uncensored = numpy.sort(self.result[~self.censored])
+        self._censored = numpy.sort(self.result[self.censored])
+        self._DLs = numpy.unique(self._censored)
+
+    @staticmethod
+    def _merge(sorted_values, new_values):
+        new_values = numpy.sort(new_values)
+        index = numpy.searchsorted(sorted_values, new_values, side="right")
+        return numpy.insert(sorted_values, index, new_values)
+
+    def append(self, result, censorship):
+        """
+        Add new observations to the model.
+
+        Parameters
+        ----------
+        result : array-like of float
+            The new censored results.
+        censorship : array-like of bool
+            Censorship status of each new result.
+
+        Returns
+        -------
+        self : IncrementalROS
+
+        """
+
+        res = numpy.atleast_1d(numpy.asarray(result, dtype=float))
+        cen = numpy.atleast_1d(numpy.asarray(censorship, dtype=bool))
+        if res.shape != cen.shape:
+            raise ValueError("`result` and `censorship` must have the same shape")
+
+        self._uncensored = self._merge(self._uncensored, res[~cen])
+        self._censored = self._merge(self._censored, res[cen])
+        new_DLs = numpy.unique(res[cen])
+        is_new = ~numpy.isin(new_DLs, self._DLs, assume_unique=True)
+        self._DLs = self._merge(self._DLs, new_DLs[is_new])
+
+        self.result = numpy.hstack([self.result, res])
+        self.censored = numpy.hstack([self.censored, cen])
+
+        # reset everything cached by the `cache_readonly` properties
+        self._cache = {}
+        return self
+
+    @cache_readonly
+    def order_stats(self):
+        """The cached arrays of the ordered statistics (see
+        ``ROSOrderStatistics``). None unless ``method`` is "ROS"."""
+
+        if self.method == "ROS":
+            with warnings.catch_warnings():
+                warnings.simplefilter("once")
+                return _sorted_order_stats(
+                    self._uncensored, self._censored, self._DLs, log=self.log, warn=self.warn
+                )
+
+
+class ROSCache:
+    """
+    Content-addressed, least-recently-used cache of ROS results.
+
+    Results are keyed by a hash of the input data (including the index
+    of dataframes) and all of the options of the imputation (including
+    ``log`` and ``warn``), so identical
+    data imputed in different places (e.g., ``DataCollection.tidy``
+    and ``Location.dataframe``) is only imputed once. Use
+    :func:`enable_cache` to activate a cache.
+
+    Parameters
+    ----------
+    maxbytes : int, optional (default = 256 MB)
+        Memory cap of the stored results. The least recently used
+        results are evicted when it is exceeded.
+
+    """
+
+    def __init__(self, maxbytes=2**28):
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+
+        # the bootstrappers' executors can impute from several threads
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def digest(*data):
+        """Fast hash of numpy arrays and/or pandas objects."""
+        h = hashlib.blake2b(digest_size=16)
+        for d in data:
+            if isinstance(d, (pandas.DataFrame, pandas.Series)):
+                labels = d.columns if isinstance(d, pandas.DataFrame) else [d.name]
+                h.update(repr(list(labels)).encode())
+                d = pandas.util.hash_pandas_object(d, index=True).to_numpy()
+
+            d = numpy.ascontiguousarray(d)
+            h.update(f"{d.dtype.str}{d.shape}".encode())
+            h.update(d.data)
+        return h.hexdigest()
+
+    @staticmethod
+    def _sizeof(value):
+        if isinstance(value, pandas.DataFrame):
+            return int(value.memory_usage(index=True, deep=True).sum())
+        return value.nbytes
+
+    def get(self, key):
+        """Returns a copy of the cached value or None."""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return value.copy()
+
+    def put(self, key, value):
+        """Stores a copy of ``value`` and evicts the least recently
+        used values until the cache fits within ``maxbytes``."""
+        nbytes = self._sizeof(value)
+        if nbytes > self.maxbytes:
+            return
+
+        value = value.copy()
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._sizeof(self._entries.pop(key))
+
+            self._entries[key] = value
+            self.nbytes += nbytes
+            while self.nbytes > self.maxbytes:
+                _, old = self._entries.popitem(last=False)
+                self.nbytes -= self._sizeof(old)
+
+    def fetch(self, key, fxn, *args):
+        """Returns the cached value of ``key`` or computes, stores, and
+        returns ``fxn(*args)``."""
+        try:
+            hash(key)
+        except TypeError:  # e.g., unhashable transformations
+            return fxn(*args)
+
+        value = self.get(key)
+        if value is None:
+            value = fxn(*args)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Removes all of the results and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            nentries = len(self._entries)
+            return CacheInfo(self.hits, self.misses, nentries, self.nbytes, self.maxbytes)
+
+
+_cache = None
+
+
+def enable_cache(maxbytes=2**28):
+    """
+    Memoize the results of :func:`ROS`, :func:`ros_array`, and
+    :func:`ROS_grouped` for the rest of the session (or until
+    :func:`disable_cache` is called).
+
+    Parameters
+    ----------
+    maxbytes : int, optional (default = 256 MB)
+        Memory cap of the cache.
+
+    Returns
+    -------
+    cache : ROSCache
+
+    Examples
+    --------
+    >>> import numpy
+    >>> from wqio import ros
+    >>> cache = ros.enable_cache(maxbytes=2**20)
+    >>> res = numpy.array([1.0, 1.0, 2.5, 3.1, 4.6, 5.2, 7.0, 12.4])
+    >>> cen = numpy.array([True, True, False, False, False, False, False, False])
+    >>> first = ros.ROS(res, cen)
+    >>> second = ros.ROS(res, cen)
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, entries=1, nbytes=64, maxbytes=1048576)
+    >>> ros.disable_cache()
+
+    """
+
+    global _cache
+    _cache = ROSCache(maxbytes=maxbytes)
+    return _cache
+
+
+def disable_cache():
+    """Stops memoizing ROS results and discards the current cache."""
+    global _cache
+    _cache = None
+
+
+def get_cache():
+    """Returns the active :class:`ROSCache` (or None)."""
+    return _cache
+
+
+def _cached(key, data, fxn, *args):
+    """Evaluates ``fxn(*args)`` through the active cache (if any) with
+    the content of ``data`` appended to ``key``."""
+    if _cache is None:
+        return fxn(*args)
+    return _cache.fetch((*key, ROSCache.digest(*data)), fxn, *args)
@@ -1,6 +1,10 @@
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy
 import numpy.testing as nptest
 import pytest
+from scipy import stats
 
 from wqio import bootstrap
 from wqio.tests import helpers
@@ -12,10 +16,54 @@ def testdata():
 
 
 def test__acceleration(testdata):
-    known_acceleration = -0.024051865664929263
+    known_acceleration = 0.024051865664929263
     assert abs(bootstrap._acceleration(testdata) - known_acceleration) < 0.00001
 
 
+@pytest.mark.parametrize("n", [2, 3, 10, 11])
+@pytest.mark.parametrize(
+    "statfxn",
+    [
+        numpy.mean,
+        numpy.median,
+        bootstrap.logmean,
+        stats.gmean,
+        bootstrap.percentile_stat(0),
+        bootstrap.percentile_stat(33),
+        bootstrap.percentile_stat(100),
+        numpy.std,
+        lambda x: x.max() - x.min(),
+    ],
+)
+def test_jackknife(n, statfxn):
+    # integer values so that there are ties
+    data = numpy.random.default_rng(n).integers(1, 6, size=n).astype(float)
+    expected = [statfxn(numpy.delete(data, i)) for i in range(n)]
+    nptest.assert_allclose(bootstrap.jackknife(data, statfxn), expected)
+
+
+def test_jackknife_too_small():
+    with helpers.raises(ValueError):
+        bootstrap.jackknife([1.0], numpy.mean)
+
+
+def test__jackknife_acceleration(testdata):
+    # the jackknife acceleration of the mean is the skewness-based one
+    loo = bootstrap.jackknife(testdata, numpy.mean)
+    expected = bootstrap._acceleration(testdata)
+    assert abs(bootstrap._jackknife_acceleration(loo) - expected) < 1e-12
+
+
+@pytest.mark.parametrize(("acceleration", "error"), [("jackknife", None), ("junk", ValueError)])
+@pytest.mark.parametrize("use_plan", [False, True])
+def test_BCA_acceleration(testdata, acceleration, error, use_plan):
+    plan = bootstrap.ResamplePlan(testdata.shape[0], niter=1000, random_state=0)
+    opts = dict(plan=plan) if use_plan else dict(niter=1000, random_state=0)
+    with helpers.raises(error):
+        CI = bootstrap.BCA(testdata, numpy.median, acceleration=acceleration, **opts)
+        assert CI[0] < numpy.median(testdata) < CI[1]
+
+
 def test__make_boot_index():
     result = bootstrap._make_boot_index(5, 5000)
     assert result.shape == (5000, 5)
@@ -23,11 +71,111 @@ def test__make_boot_index():
     assert result.max() == 4
 
 
+@pytest.mark.parametrize("rng", [None, numpy.random.default_rng(0)])
+def test__make_boot_index_balanced(rng):
+    index = bootstrap._make_boot_index(7, 30, rng=rng, sampling="balanced")
+    assert index.shape == (30, 7)
+    nptest.assert_array_equal(numpy.bincount(index.ravel()), [30] * 7)
+
+
+@pytest.mark.parametrize("niter", [30, 31])
+def test__make_boot_index_antithetic(niter):
+    order = numpy.array([3, 0, 4, 1, 2])
+    ranks = bootstrap._make_boot_index(
+        5, niter, rng=numpy.random.default_rng(0), sampling="antithetic"
+    )
+    assert ranks.shape == (niter, 5)
+    half = niter - niter // 2
+    nptest.assert_array_equal(ranks[: niter // 2] + ranks[half:], 4)
+
+    index = bootstrap._make_boot_index(
+        5, niter, rng=numpy.random.default_rng(0), sampling="antithetic", order=order
+    )
+    nptest.assert_array_equal(index, order[ranks])
+
+
+def test__make_boot_index_bad_sampling():
+    with helpers.raises(ValueError):
+        bootstrap._make_boot_index(5, 10, sampling="junk")
+
+
+def test__iter_boot_index_balanced():
+    rng = numpy.random.default_rng(0)
+    blocks = list(bootstrap._iter_boot_index(7, 31, maxbytes=210, rng=rng, sampling="balanced"))
+    assert len(blocks) > 1
+    counts = numpy.bincount(numpy.vstack(blocks).ravel().astype(int))
+    nptest.assert_array_equal(counts, [31] * 7)
+
+
+@pytest.mark.parametrize(
+    ("elements", "expected"),
+    [(5, numpy.uint16), (2**16, numpy.uint16), (2**16 + 1, numpy.uint32), (2**33, numpy.uint64)],
+)
+def test__index_dtype(elements, expected):
+    assert bootstrap._index_dtype(elements) == expected
+
+
+@pytest.mark.parametrize(("maxbytes", "nblocks"), [(None, 1), (10 * 5 * 10, 10), (1, 100)])
+def test__iter_boot_index(maxbytes, nblocks):
+    blocks = list(bootstrap._iter_boot_index(5, 100, maxbytes))
+    assert len(blocks) == nblocks
+    index = numpy.vstack(blocks)
+    assert index.shape == (100, 5)
+    assert index.min() >= 0
+    assert index.max() <= 4
+    if maxbytes is not None:
+        assert index.dtype == numpy.uint16
+
+
+@pytest.mark.parametrize(
+    ("statfxn", "expected"),
+    [
+        (numpy.median, lambda x: numpy.median(x, axis=-1)),
+        (statistics.median, lambda x: numpy.median(x, axis=-1)),
+        (stats.gmean, lambda x: stats.gmean(x, axis=-1)),
+        (bootstrap.geomean, lambda x: stats.gmean(x, axis=-1)),
+        (bootstrap.logmean, lambda x: numpy.log(x).mean(axis=-1)),
+        (bootstrap.percentile_stat(35), lambda x: numpy.percentile(x, 35, axis=-1)),
+        (bootstrap.trimmed_mean_stat(0.1), lambda x: stats.trim_mean(x, 0.1, axis=-1)),
+        (lambda x: numpy.percentile(x, 35), lambda x: numpy.percentile(x, 35, axis=-1)),
+        (lambda x, **kwds: numpy.max(x, **kwds), lambda x: x.max(axis=-1)),
+    ],
+)
+@pytest.mark.parametrize("ncols", [14, 15])
+def test_get_kernel(statfxn, expected, ncols):
+    values = numpy.random.default_rng(0).lognormal(size=(2501, ncols))
+    kernel = bootstrap.get_kernel(statfxn)
+    nptest.assert_allclose(kernel(values, axis=-1), expected(values), rtol=1e-12)
+    nptest.assert_allclose(kernel(values[0]), statfxn(values[0]), rtol=1e-12)
+
+
+def test_register_kernel():
+    def mystat(x):
+        return x.max() - x.min()
+
+    def ptp(x, axis=None):
+        return numpy.ptp(x, axis=axis)
+
+    assert bootstrap.get_kernel(mystat) is not ptp
+    bootstrap.register_kernel(mystat, ptp)
+    try:
+        assert bootstrap.get_kernel(mystat) is ptp
+    finally:
+        bootstrap._KERNELS.pop(mystat)
+
+
+@pytest.mark.parametrize("bootstrapper", [bootstrap.BCA, bootstrap.percentile])
+def test_bootstrappers_no_axis(testdata, bootstrapper):
+    expected = bootstrapper(testdata, numpy.median, 1000, 0.10, random_state=2)
+    ci = bootstrapper(testdata, lambda x: numpy.median(x), 1000, 0.10, random_state=2)
+    nptest.assert_array_equal(ci, expected)
+
+
 @helpers.seed
 @pytest.mark.parametrize(
     ("bootstrapper", "known_ci"),
     [
-        (bootstrap.BCA, numpy.array([8.686, 11.661])),
+        (bootstrap.BCA, numpy.array([8.799, 11.780])),
         (bootstrap.percentile, numpy.array([8.670, 11.647])),
     ],
 )
@@ -143,3 +291,415 @@ def test_fit(uselog):
     nptest.assert_array_almost_equal(bsfit.upper, expected[uselog]["upper"], decimal=3)
     assert bsfit.xlog == uselog
     assert bsfit.ylog == uselog
+
+
+@helpers.seed
+@pytest.mark.parametrize("bootstrapper", [bootstrap.BCA, bootstrap.percentile])
+def test_bootstrappers_chunked(testdata, bootstrapper):
+    known_ci = bootstrapper(testdata, numpy.mean, 10000, 0.10)
+    ci = bootstrapper(testdata, numpy.mean, 10000, 0.10, maxbytes=2**14)
+    nptest.assert_allclose(known_ci, ci, rtol=0.02)
+
+
+@pytest.mark.parametrize("random_state", [42, numpy.random.SeedSequence(42)])
+def test_spawn(random_state):
+    streams = bootstrap.spawn(random_state, 3)
+    assert len(streams) == 3
+    assert streams[1].spawn_key == (1,)
+
+    # same streams every time, and the first ones don't depend on `n`
+    again = bootstrap.spawn(random_state, 5)
+    for a, b in zip(streams, again):
+        assert a.generate_state(4).tolist() == b.generate_state(4).tolist()
+    assert streams[0].generate_state(4).tolist() != streams[1].generate_state(4).tolist()
+
+
+@pytest.mark.parametrize("bootstrapper", [bootstrap.BCA, bootstrap.percentile])
+def test_bootstrappers_random_state(testdata, bootstrapper):
+    ci1 = bootstrapper(testdata, numpy.mean, 1000, 0.10, random_state=7)
+    numpy.random.seed(0)
+    ci2 = bootstrapper(testdata, numpy.mean, 1000, 0.10, random_state=numpy.random.default_rng(7))
+    ci3 = bootstrapper(testdata, numpy.mean, 1000, 0.10, random_state=8)
+    nptest.assert_array_equal(ci1, ci2)
+    assert not numpy.array_equal(ci1, ci3)
+
+
+@pytest.mark.parametrize(
+    ("fitfxn", "kwargs", "linear"),
+    [
+        (numpy.polyfit, dict(deg=1), True),
+        (numpy.polyfit, dict(deg=1, full=False), True),
+        (numpy.polyfit, dict(deg=1, full=True), False),
+        (numpy.polyfit, dict(deg=2), False),
+        (stats.linregress, dict(), True),
+        (stats.theilslopes, dict(), False),
+    ],
+)
+def test__is_linear_fit(fitfxn, kwargs, linear):
+    assert bootstrap._is_linear_fit(fitfxn, kwargs) == linear
+
+
+@pytest.mark.parametrize("uselog", [True, False])
+@pytest.mark.parametrize("maxbytes", [None, 2**10])
+def test_fit_closed_form(uselog, maxbytes):
+    x = numpy.arange(1, 11, dtype=float)
+    y = numpy.array([4.527, 3.519, 9.653, 8.036, 10.805, 14.329, 13.508, 11.822, 13.281, 10.410])
+
+    def polyfit(x, y):
+        return numpy.polyfit(x, y, 1)
+
+    opts = dict(niter=500, xlog=uselog, ylog=uselog, random_state=2, maxbytes=maxbytes)
+    expected = bootstrap.fit(x, y, polyfit, **opts)
+    for fitfxn, kwargs in [(numpy.polyfit, dict(deg=1)), (stats.linregress, {})]:
+        result = bootstrap.fit(x, y, fitfxn, **opts, **kwargs)
+        nptest.assert_allclose(result.yhat, expected.yhat, rtol=1e-10)
+        nptest.assert_allclose(result.lower, expected.lower, rtol=1e-10)
+        nptest.assert_allclose(result.upper, expected.upper, rtol=1e-10)
+
+
+def test_fit_tied_x():
+    # about 1 in 9 of the resampled datasets only have x = 1
+    x = numpy.array([1.0] * 8 + [2.0, 3.0])
+    y = numpy.array([4.527, 3.519, 9.653, 8.036, 10.805, 14.329, 13.508, 11.822, 13.281, 10.410])
+    params = bootstrap._boot_linear_params(x, y, 500, rng=numpy.random.default_rng(0))
+    assert not numpy.isfinite(params).all()
+
+    result = bootstrap.fit(x, y, numpy.polyfit, niter=500, random_state=0, deg=1)
+    assert numpy.isfinite(result.lower).all()
+    assert numpy.isfinite(result.upper).all()
+    assert (result.lower <= result.yhat).all()
+    assert (result.yhat <= result.upper).all()
+
+
+def test_fit_random_state():
+    x = numpy.arange(1, 11, dtype=float)
+    y = numpy.array([4.527, 3.519, 9.653, 8.036, 10.805, 14.329, 13.508, 11.822, 13.281, 10.410])
+    fit1 = bootstrap.fit(x, y, numpy.polyfit, niter=200, random_state=3, deg=1)
+    fit2 = bootstrap.fit(x, y, numpy.polyfit, niter=200, random_state=3, deg=1)
+    nptest.assert_array_equal(fit1.lower, fit2.lower)
+    nptest.assert_array_equal(fit1.upper, fit2.upper)
+
+
+@pytest.mark.parametrize("bootstrapper", [bootstrap.BCA, bootstrap.percentile])
+def test_bootstrappers_parallel(testdata, bootstrapper):
+    opts = dict(niter=2000, alpha=0.10, random_state=7, n_jobs=3)
+    in_processes = bootstrapper(testdata, numpy.mean, **opts)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        in_threads = bootstrapper(testdata, numpy.mean, executor=pool, **opts)
+    nptest.assert_array_equal(in_processes, in_threads)
+
+    serial = bootstrapper(testdata, numpy.mean, 2000, 0.10, random_state=7)
+    nptest.assert_allclose(serial, in_processes, rtol=0.02)
+
+
+def test__run_boot_splits_iterations():
+    def worker(niter, rng):
+        return numpy.full(niter, niter)
+
+    rng = numpy.random.default_rng(0)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        result = bootstrap._run_boot(worker, 10, rng=rng, n_jobs=4, executor=pool)
+    nptest.assert_array_equal(result, [2, 2, 3, 3, 3, 2, 2, 3, 3, 3])
+
+
+def test_fit_parallel():
+    x = numpy.arange(1, 11, dtype=float)
+    y = numpy.array([4.527, 3.519, 9.653, 8.036, 10.805, 14.329, 13.508, 11.822, 13.281, 10.410])
+    opts = dict(niter=200, random_state=3, n_jobs=2, deg=1)
+    fit1 = bootstrap.fit(x, y, numpy.polyfit, **opts)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        fit2 = bootstrap.fit(x, y, numpy.polyfit, executor=pool, **opts)
+    nptest.assert_array_equal(fit1.lower, fit2.lower)
+    nptest.assert_array_equal(fit1.upper, fit2.upper)
+
+
+@pytest.fixture
+def paired_data():
+    rng = numpy.random.default_rng(0)
+    infl = rng.lognormal(mean=2, size=37)
+    effl = infl * rng.lognormal(mean=-0.5, sigma=0.25, size=37)
+    return infl, effl
+
+
+@pytest.mark.parametrize("statfxn", [numpy.median, numpy.mean, bootstrap.geomean])
+def test_paired(paired_data, statfxn):
+    infl, effl = paired_data
+    est = bootstrap.paired(infl, effl, statfxn, niter=500, ci_method="percentile", random_state=0)
+
+    # same index for both samples
+    index = bootstrap._make_boot_index(37, 500, rng=numpy.random.default_rng(0))
+    infl_stats = statfxn(infl[index], axis=-1)
+    effl_stats = statfxn(effl[index], axis=-1)
+    ratios = effl_stats / infl_stats
+    differences = effl_stats - infl_stats
+    nptest.assert_allclose(est.difference_CI, numpy.percentile(differences, [2.5, 97.5]))
+    nptest.assert_allclose(est.ratio_CI, numpy.percentile(ratios, [2.5, 97.5]))
+    nptest.assert_allclose(est.removal_CI, 100 * (1 - est.ratio_CI[::-1]))
+
+    assert est.difference == statfxn(effl) - statfxn(infl)
+    assert abs(est.removal - 100 * (1 - est.ratio)) < 1e-12
+
+    bca = bootstrap.paired(infl, effl, statfxn, niter=500, random_state=0)
+    assert bca.difference_CI[0] < bca.difference < bca.difference_CI[1]
+    assert bca.removal_CI[0] < bca.removal < bca.removal_CI[1]
+
+
+@pytest.mark.parametrize(
+    ("infl", "effl", "opts"),
+    [(numpy.ones(5), numpy.ones(6), {}), (numpy.ones(5), numpy.ones(5), dict(ci_method="cox"))],
+)
+def test_paired_errors(infl, effl, opts):
+    with helpers.raises(ValueError):
+        bootstrap.paired(infl, effl, **opts)
+
+
+def test_paired_parallel(paired_data):
+    opts = dict(niter=200, random_state=3, n_jobs=2)
+    est1 = bootstrap.paired(*paired_data, **opts)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        est2 = bootstrap.paired(*paired_data, executor=pool, **opts)
+    nptest.assert_array_equal(est1.removal_CI, est2.removal_CI)
+
+
+@pytest.mark.parametrize("bootstrapper", [bootstrap.BCA, bootstrap.percentile])
+def test_bootstrappers_plan(testdata, bootstrapper):
+    plan = bootstrap.ResamplePlan(testdata.shape[0], niter=1000, random_state=7)
+    expected = bootstrapper(testdata, numpy.mean, 1000, 0.10, random_state=7)
+    result = bootstrapper(testdata, numpy.mean, alpha=0.10, plan=plan)
+    nptest.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize("bootstrapper", [bootstrap.BCA, bootstrap.percentile])
+@pytest.mark.parametrize("sampling", ["balanced", "antithetic"])
+def test_bootstrappers_sampling(testdata, bootstrapper, sampling):
+    CI = bootstrapper(testdata, numpy.median, niter=1000, random_state=0, sampling=sampling)
+    assert CI[0] < numpy.median(testdata) < CI[1]
+
+    # the plan gives the same results from the same stream
+    plan = bootstrap.ResamplePlan(testdata.shape[0], niter=1000, random_state=0, sampling=sampling)
+    nptest.assert_allclose(bootstrapper(testdata, numpy.median, plan=plan), CI)
+
+
+@pytest.mark.parametrize("fitfxn", [numpy.polyfit, stats.linregress])
+@pytest.mark.parametrize("sampling", ["balanced", "antithetic"])
+def test_fit_sampling(fitfxn, sampling):
+    x = numpy.arange(1, 11, dtype=float)
+    y = numpy.array([4.527, 3.519, 9.653, 8.036, 10.805, 14.329, 13.508, 11.822, 13.281, 10.410])
+    kwargs = dict(deg=1) if fitfxn is numpy.polyfit else {}
+    bsfit = bootstrap.fit(x, y, fitfxn, niter=500, random_state=0, sampling=sampling, **kwargs)
+    assert (bsfit.lower <= bsfit.yhat).all()
+    assert (bsfit.yhat <= bsfit.upper).all()
+
+
+@pytest.mark.parametrize("bootstrapper", [bootstrap.BCA, bootstrap.percentile])
+@pytest.mark.parametrize(("tolerance", "expected_niter"), [(1.0, 5000), (1e-6, 10000)])
+def test_bootstrappers_adaptive(testdata, bootstrapper, tolerance, expected_niter):
+    ci, niter = bootstrapper(
+        testdata,
+        numpy.mean,
+        niter=10000,
+        alpha=0.10,
+        random_state=5,
+        tolerance=tolerance,
+        batchsize=1000,
+        full_output=True,
+    )
+    assert niter == expected_niter
+    known_ci = numpy.array([8.686, 11.661])
+    nptest.assert_allclose(ci, known_ci, rtol=0.03)
+
+
+def test__adaptive_boot_stats_min_batches():
+    # even a tolerance that any two batches would meet uses the minimum
+    rng = numpy.random.default_rng(0)
+    boot_stats, stderr = bootstrap._adaptive_boot_stats(
+        lambda n: rng.normal(size=n), 10000, 100, 1e6, lambda bs: [5, 95]
+    )
+    assert boot_stats.shape == (100 * bootstrap._MIN_ADAPTIVE_BATCHES,)
+    assert (stderr <= 1e6).all()
+
+
+@pytest.mark.parametrize("bootstrapper", [bootstrap.BCA, bootstrap.percentile])
+def test_bootstrappers_adaptive_one_pool(monkeypatch, testdata, bootstrapper):
+    pools = []
+
+    def pool(max_workers):
+        pools.append(max_workers)
+        return ThreadPoolExecutor(max_workers=max_workers)
+
+    monkeypatch.setattr(bootstrap, "ProcessPoolExecutor", pool)
+    opts = dict(niter=10000, random_state=5, tolerance=1.0, batchsize=1000, full_output=True)
+    ci, niter = bootstrapper(testdata, numpy.mean, n_jobs=2, **opts)
+    assert niter > 1000
+    assert pools == [2]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        expected = bootstrapper(testdata, numpy.mean, n_jobs=2, executor=executor, **opts)
+    nptest.assert_array_equal(ci, expected[0])
+
+
+def test__adaptive_boot_stats_stderr():
+    rng = numpy.random.default_rng(0)
+    boot_stats, stderr = bootstrap._adaptive_boot_stats(
+        lambda n: rng.normal(size=n), 5500, 1000, 0.0, lambda bs: [5, 95]
+    )
+    assert boot_stats.shape == (5500,)
+    assert stderr.shape == (2,)
+    assert (stderr > 0).all()
+
+
+@pytest.mark.parametrize("bootstrapper", [bootstrap.BCA, bootstrap.percentile])
+def test_bootstrappers_full_output(testdata, bootstrapper):
+    ci, niter = bootstrapper(testdata, numpy.mean, 500, random_state=5, full_output=True)
+    assert niter == 500
+    nptest.assert_array_equal(ci, bootstrapper(testdata, numpy.mean, 500, random_state=5))
+
+
+def test_ResamplePlan(testdata):
+    plan = bootstrap.ResamplePlan(testdata.shape[0], niter=1000, random_state=7, maxbytes=2**14)
+    assert sum(block.shape[0] for block in plan.blocks) == 1000
+
+    median, mean = plan.evaluate(testdata, [numpy.median, numpy.mean])
+    assert median.shape == mean.shape == (1000,)
+
+    CIs = plan.BCA(testdata, [numpy.median, numpy.mean], alpha=0.10)
+    nptest.assert_array_equal(CIs[1], bootstrap.BCA(testdata, numpy.mean, alpha=0.10, plan=plan))
+
+    CIs = plan.percentile(testdata, [numpy.median, numpy.mean], alpha=0.10)
+    nptest.assert_array_equal(CIs[0], numpy.percentile(median, [5, 95]))
+
+    with helpers.raises(ValueError):
+        plan.evaluate(testdata[:-1], [numpy.mean])
+
+
+@pytest.mark.parametrize(("maxbytes", "nblocks"), [(None, 1), (6 * 20 * 10 * 10, 5)])
+def test__iter_nested_index(maxbytes, nblocks):
+    blocks = list(bootstrap._iter_nested_index(10, 30, 20, maxbytes=maxbytes))
+    assert len(blocks) == nblocks
+    outer = numpy.vstack([o for o, i in blocks])
+    inner = numpy.vstack([i for o, i in blocks])
+    assert outer.shape == (30, 10)
+    assert inner.shape == (30, 20, 10)
+    assert inner.max() <= 9
+
+
+def test_studentized_closed_form(testdata):
+    CI = bootstrap.studentized(testdata, numpy.mean, niter=1000, random_state=0)
+
+    index = bootstrap._make_boot_index(testdata.shape[0], 1000, rng=numpy.random.default_rng(0))
+    resampled = testdata[index]
+    n = testdata.shape[0]
+    t_stats = (resampled.mean(axis=1) - testdata.mean()) / (resampled.std(axis=1, ddof=1) / n**0.5)
+    t_upper, t_lower = numpy.percentile(t_stats, [97.5, 2.5])
+    stderr = stats.sem(testdata)
+    expected = [testdata.mean() - t_upper * stderr, testdata.mean() - t_lower * stderr]
+    nptest.assert_allclose(CI, expected)
+
+
+@pytest.mark.parametrize("bootstrapper", [bootstrap.studentized, bootstrap.double])
+@pytest.mark.parametrize("statfxn", [numpy.median, numpy.mean])
+def test_nested_bootstrappers(testdata, bootstrapper, statfxn):
+    opts = dict(niter=200, ninner=50, random_state=0)
+    CI = bootstrapper(testdata, statfxn, **opts)
+    assert CI[0] < statfxn(testdata) < CI[1]
+
+    # small memory budgets only change the number of blocks
+    nptest.assert_allclose(bootstrapper(testdata, statfxn, maxbytes=10**5, **opts), CI, rtol=0.5)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        CI1 = bootstrapper(testdata, statfxn, n_jobs=2, executor=pool, **opts)
+    CI2 = bootstrapper(testdata, statfxn, n_jobs=2, **opts)
+    nptest.assert_array_equal(CI1, CI2)
+
+
+@pytest.mark.parametrize(
+    ("q", "expected"), [(50, [6.0, 15.0]), (10, [1.0, 6.0]), (90, [15.0, 20.0])]
+)
+def test_order_statistic_CI(q, expected):
+    data = numpy.arange(20.0, 0.0, -1.0)
+    ci = bootstrap.order_statistic_CI(data, q=q, alpha=0.05)
+    nptest.assert_array_equal(ci, expected)
+
+    # coverage of the true median of a uniform distribution
+    rng = numpy.random.default_rng(0)
+    samples = rng.uniform(size=(2000, 25))
+    CIs = numpy.array([bootstrap.order_statistic_CI(x, alpha=0.10) for x in samples])
+    coverage = ((CIs[:, 0] <= 0.5) & (CIs[:, 1] >= 0.5)).mean()
+    assert 0.88 <= coverage <= 0.97
+
+
+def test_t_CI(testdata):
+    expected = stats.t.interval(
+        0.95, testdata.shape[0] - 1, loc=testdata.mean(), scale=stats.sem(testdata)
+    )
+    nptest.assert_allclose(bootstrap.t_CI(testdata), expected)
+
+
+def test_cox_CI(testdata):
+    logs = numpy.log(testdata)
+    n = logs.shape[0]
+    s2 = logs.var(ddof=1)
+    se = numpy.sqrt(s2 / n + s2**2 / (2 * (n - 1)))
+    est = logs.mean() + s2 / 2
+    t = stats.t.ppf(0.975, n - 1)
+    nptest.assert_allclose(bootstrap.cox_CI(testdata), numpy.exp([est - t * se, est + t * se]))
+
+
+@pytest.mark.parametrize(
+    ("statfxn", "lognormal", "expected"),
+    [
+        (numpy.median, False, lambda x: bootstrap.order_statistic_CI(x, 50)),
+        (bootstrap.percentile_stat(25), False, lambda x: bootstrap.order_statistic_CI(x, 25)),
+        (numpy.mean, False, bootstrap.t_CI),
+        (numpy.mean, True, bootstrap.cox_CI),
+        (bootstrap.logmean, False, lambda x: bootstrap.t_CI(numpy.log(x))),
+        (stats.gmean, False, lambda x: numpy.exp(bootstrap.t_CI(numpy.log(x)))),
+    ],
+)
+def test_analytic_CI(testdata, statfxn, lognormal, expected):
+    ci = bootstrap.analytic_CI(testdata, statfxn, lognormal=lognormal)
+    nptest.assert_array_equal(ci, expected(testdata))
+
+
+def test_analytic_CI_unknown(testdata):
+    with helpers.raises(ValueError):
+        bootstrap.analytic_CI(testdata, numpy.std)
+
+
+@pytest.mark.parametrize(
+    ("ci_method", "error"),
+    [
+        ("BCA", None),
+        ("percentile", None),
+        ("analytic", None),
+        ("cox", None),
+        ("studentized", None),
+        ("double", None),
+        ("junk", ValueError),
+    ],
+)
+def test_confidence_interval(testdata, ci_method, error):
+    with helpers.raises(error):
+        ci = bootstrap.confidence_interval(testdata, numpy.mean, ci_method=ci_method, niter=500)
+        assert ci[0] < testdata.mean() < ci[1]
+
+
+@pytest.mark.parametrize("bootstrapper", [bootstrap.BCA, bootstrap.percentile])
+def test_bootstrappers_censored_no_NDs(testdata, bootstrapper):
+    numpy.random.seed(0)
+    expected = bootstrapper(testdata, numpy.mean, 1000, 0.10)
+
+    numpy.random.seed(0)
+    censored = numpy.zeros_like(testdata, dtype=bool)
+    result = bootstrapper(testdata, numpy.mean, 1000, 0.10, censored=censored)
+    nptest.assert_array_almost_equal(result, expected)
+
+
+@helpers.seed
+@pytest.mark.parametrize("bootstrapper", [bootstrap.BCA, bootstrap.percentile])
+def test_bootstrappers_censored(bootstrapper):
+    df = helpers.getTestROSData()
+    res = df["res"].values
+    cen = (df["qual"] == "ND").values
+    lci, uci = bootstrapper(res, numpy.median, 1000, 0.10, censored=cen)
+    assert lci < numpy.median(res) < uci
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 from textwrap import dedent
 from unittest import mock
@@ -10,6 +11,7 @@ import scipy
 from packaging.version import Version
 from scipy import stats
 
+from wqio import bootstrap, trend, utils
 from wqio.datacollections import DataCollection, _dist_compare
 from wqio.features import Dataset, Location
 from wqio.tests import helpers
@@ -129,6 +131,8 @@ def test_tidy(dc, useros):
     assert "H" not in dc.tidy["param"].unique()
     collist = ["loc", "param", "res", "__censorship", "ros_res"]
     assert sorted(dc.tidy.columns.tolist()) == sorted(collist)
+    assert dc.tidy.columns.tolist() == dc.tidy_columns
+    pdtest.assert_index_equal(dc.tidy.index, pandas.RangeIndex(388))
 
 
 def test_paired(dc):
@@ -184,12 +188,12 @@ def test_median(dc):
         station,Inflow,Inflow,Inflow,Outflow,Outflow,Outflow,Reference,Reference,Reference
         result,lower,median,upper,lower,median,upper,lower,median,upper
         param,,,,,,,,,
-        A,0.334506,1.197251,2.013994,0.860493,2.231058,2.626023,1.073386,1.639472,1.717293
-        B,1.366948,2.773989,3.297147,0.23201,1.546499,2.579206,0.204164,1.565076,2.196367
-        C,0.17351,0.525957,0.68024,0.247769,0.396984,0.540742,0.136462,0.412693,0.559458
-        D,0.374122,1.201892,2.098846,0.516989,1.362759,1.827087,0.314655,0.882695,1.24545
-        E,0.276095,1.070858,1.152887,0.287914,0.516746,1.456859,0.366824,0.80716,2.040739
-        F,0.05667,0.832488,1.310575,0.425237,1.510942,2.193997,0.162327,0.745993,1.992513
+        A,0.522601,1.197251,2.013994,1.042636,2.231058,2.65258,1.123626,1.639472,1.922627
+        B,1.795373,2.773989,3.476856,0.308472,1.546499,2.668954,0.273497,1.565076,2.196367
+        C,0.17351,0.525957,0.697097,0.301091,0.396984,0.609065,0.156361,0.412693,0.564999
+        D,0.45218,1.201892,2.316181,0.597125,1.362759,1.877473,0.383895,0.882695,1.24545
+        E,0.276095,1.070858,1.152887,0.303643,0.516746,1.477551,0.422493,0.80716,2.173085
+        F,0.120068,0.832488,1.310575,0.468165,1.510942,2.209813,0.162327,0.745993,1.992513
     """
     check_stat(known_csv, dc.median)
 
@@ -200,12 +204,12 @@ def test_mean(dc):
         station,Inflow,Inflow,Inflow,Outflow,Outflow,Outflow,Reference,Reference,Reference
         result,lower,mean,upper,lower,mean,upper,lower,mean,upper
         param,,,,,,,,,
-        A,1.231607,2.646682,4.204054,1.930601,5.249281,9.081952,1.540167,3.777974,6.389439
-        B,2.99031,7.647175,12.810844,1.545539,6.863835,12.705913,1.010374,4.504255,9.592572
-        C,0.37496,0.513248,0.65948,0.411501,1.004637,1.706317,0.35779,0.541962,0.734751
-        D,1.29141,3.021235,4.987855,1.285899,2.318808,3.451824,1.008364,1.945828,2.924812
-        E,0.818641,1.914696,3.049554,0.584826,1.098241,1.640807,1.113589,2.283292,3.581946
-        F,0.8379,9.825404,25.289933,1.497825,3.450184,5.61929,0.939917,2.491708,4.094258
+        A,1.483228,2.646682,4.813629,2.643991,5.249281,11.311138,2.009326,3.777974,7.558878
+        B,3.941949,7.647175,14.949272,2.672653,6.863835,15.321768,1.54027,4.504255,14.336232
+        C,0.38302,0.513248,0.671403,0.551182,1.004637,2.16641,0.380067,0.541962,0.768591
+        D,1.681442,3.021235,6.106322,1.477062,2.318808,3.879686,1.138318,1.945828,3.152505
+        E,1.040122,1.914696,3.427823,0.669217,1.098241,1.791044,1.298631,2.283292,3.86929
+        F,1.675614,9.825404,41.72134,1.912039,3.450184,6.678413,1.167724,2.491708,4.557287
     """
     check_stat(known_csv, dc.mean)
 
@@ -264,12 +268,12 @@ def test_logmean(dc):
         station,Inflow,Inflow,Inflow,Outflow,Outflow,Outflow,Reference,Reference,Reference
         result,Log-mean,lower,upper,Log-mean,lower,upper,Log-mean,lower,upper
         param,,,,,,,,,
-        A,0.140559,-0.55112,0.644202,0.733004,0.047053,1.22099,0.545205,-0.057683,1.029948
-        B,1.026473,0.368659,1.541241,0.105106,-0.939789,0.860244,0.068638,-0.932357,0.661203
-        C,-0.963004,-1.304115,-0.638446,-0.83221,-1.464092,-0.414379,-1.088377,-1.556795,-0.720706
-        D,0.062317,-0.663241,0.58349,0.185757,-0.325074,0.598432,-0.063507,-0.670456,0.434214
-        E,-0.103655,-0.751075,0.385909,-0.456202,-1.08692,0.029967,-0.068135,-0.787007,0.51226
-        F,-0.442721,-1.874677,0.344704,0.211658,-0.504166,0.734283,-0.253352,-1.175917,0.467231
+        A,0.140559,-0.462668,0.711554,0.733004,0.172944,1.323494,0.545205,0.04106,1.118756
+        B,1.026473,0.472349,1.624886,0.105106,-0.781244,0.977091,0.068638,-0.664325,0.824634
+        C,-0.963004,-1.294722,-0.632597,-0.83221,-1.317467,-0.301102,-1.088377,-1.521184,-0.698589
+        D,0.062317,-0.547159,0.669061,0.185757,-0.26317,0.649853,-0.063507,-0.617717,0.48089
+        E,-0.103655,-0.670424,0.46532,-0.456202,-1.016874,0.077593,-0.068135,-0.722195,0.56535
+        F,-0.442721,-1.414087,0.577645,0.211658,-0.395257,0.816118,-0.253352,-1.084834,0.549918
     """
     check_stat(known_csv, dc.logmean)
 
@@ -296,12 +300,12 @@ def test_geomean(dc):
         station,Inflow,Inflow,Inflow,Outflow,Outflow,Outflow,Reference,Reference,Reference
         Geo-mean,Log-mean,lower,upper,Log-mean,lower,upper,Log-mean,lower,upper
         param,,,,,,,,,
-        A,1.150917,0.576304,1.904467,2.081323,1.048178,3.390543,1.724962,0.943949,2.800919
-        B,2.791205,1.445795,4.670381,1.110829,0.39071,2.363737,1.071049,0.393625,1.937121
-        C,0.381744,0.271413,0.528113,0.435087,0.231288,0.66075,0.336763,0.210811,0.486409
-        D,1.064299,0.515179,1.792283,1.204129,0.722474,1.819264,0.938467,0.511475,1.543749
-        E,0.901536,0.471859,1.470951,0.633686,0.337254,1.03042,0.934134,0.455205,1.66906
-        F,0.642286,0.153405,1.411572,1.235726,0.604009,2.083988,0.776195,0.308536,1.595571
+        A,1.150917,0.629602,2.037154,2.081323,1.1888,3.756522,1.724962,1.041915,3.061045
+        B,2.791205,1.603757,5.07784,1.110829,0.457836,2.656718,1.071049,0.514621,2.281047
+        C,0.381744,0.273974,0.53121,0.435087,0.267813,0.740002,0.336763,0.218453,0.497287
+        D,1.064299,0.578591,1.952403,1.204129,0.768611,1.915259,0.938467,0.539174,1.617513
+        E,0.901536,0.511492,1.592524,0.633686,0.361724,1.080683,0.934134,0.485685,1.760064
+        F,0.642286,0.243148,1.781837,1.235726,0.673507,2.261702,0.776195,0.337958,1.733111
     """
     check_stat(known_csv, dc.geomean)
 
@@ -651,10 +655,55 @@ def test_dunn(dc):
     assert dunnres.columns.tolist() == ["Inflow", "Outflow", "Reference"]
 
 
-@helpers.seed
-def test_theilslopes(dc):
-    with helpers.raises(NotImplementedError):
-        _ = dc.theilslopes()
+@pytest.mark.parametrize("logs", [False, True])
+def test_theilslopes(dc, logs):
+    theil = dc.theilslopes(logs=logs)
+    assert theil.index.names == ["param", "loc_1", "loc_2"]
+    assert theil.columns.tolist() == ["slope", "intercept", "low_slope", "high_slope"]
+    assert theil.shape == (36, 4)
+
+    paired = dc.paired.xs("B", level="param")["res"][["Inflow", "Outflow"]].dropna()
+    x, y = paired["Inflow"].values, paired["Outflow"].values
+    if logs:
+        x, y = numpy.log(x), numpy.log(y)
+    expected = utils.compute_theilslope(y, x)
+    assert tuple(theil.loc[("B", "Inflow", "Outflow")]) == tuple(expected)
+
+
+def test_theilslopes_executor(dc):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        theil = dc.theilslopes(executor=executor)
+    pdtest.assert_frame_equal(theil, dc.theilslopes())
+
+
+@pytest.mark.parametrize("seasonal", [False, True])
+def test_trend(seasonal):
+    # treat the BMPs as quarterly samples at each station
+    df = helpers.make_dc_data_complex().reset_index()
+    df["date"] = pandas.Timestamp("2000-01-01") + pandas.to_timedelta(
+        df["bmp"].astype(int) * 91, unit="D"
+    )
+    dc = DataCollection(
+        df,
+        rescol="res",
+        qualcol="qual",
+        stationcol="loc",
+        paramcol="param",
+        ndval="<",
+        pairgroups=["state", "bmp"],
+        filterfxn=remove_g_and_h,
+    )
+    result = dc.trend("date", seasonal=seasonal)
+    assert result.index.names == ["loc", "param"]
+    assert result.columns.tolist() == list(trend.KendallTrend._fields)
+    assert result.shape == (18, 7)
+
+    group = dc._tidy_rows.join(dc.data["date"]).query("loc == 'Inflow' and param == 'B'")
+    if seasonal:
+        expected = trend.seasonal_kendall(group["date"], group["ros_res"])
+    else:
+        expected = trend.mann_kendall(group["ros_res"], group["date"])
+    assert tuple(result.loc[("Inflow", "B")]) == tuple(expected)
 
 
 def test_inventory(dc):
@@ -792,6 +841,68 @@ def test_datasets(dc):
     assert _ds[1].definition == {"param": "B"}
 
 
+def test_random_state_threads():
+    df = helpers.make_dc_data_complex()
+    opts = dict(rescol="res", qualcol="qual", stationcol="loc", paramcol="param", ndval="<")
+    dc1 = DataCollection(df, bsiter=500, showpbar=False, random_state=42, **opts)
+    dc2 = DataCollection(df, bsiter=500, showpbar=False, random_state=42, **opts)
+    pdtest.assert_frame_equal(dc1.median, dc2.median)
+
+    def median_CI(loc):
+        return loc.median_conf_interval
+
+    serial = [median_CI(loc) for loc in dc1.locations]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        threaded = list(pool.map(median_CI, dc2.locations[::-1]))[::-1]
+    numpy.testing.assert_array_equal(numpy.array(serial), numpy.array(threaded))
+
+
+def test_share_resamples():
+    df = helpers.make_dc_data_complex()
+    opts = dict(rescol="res", qualcol="qual", stationcol="loc", paramcol="param", ndval="<")
+    dc = DataCollection(
+        df, bsiter=500, showpbar=False, random_state=42, share_resamples=True, **opts
+    )
+    medians = dc.median
+    sizes = dc.tidy.groupby(by=dc.groupcols).size()
+    assert sorted(dc._resample_plans) == sorted(sizes.unique())
+
+    # the plans are reused by the other statistics
+    plans = dict(dc._resample_plans)
+    dc.mean
+    assert all(dc._resample_plans[n] is plan for n, plan in plans.items())
+
+    again = DataCollection(
+        df, bsiter=500, showpbar=False, random_state=42, share_resamples=True, **opts
+    )
+    pdtest.assert_frame_equal(medians, again.median)
+
+
+def test_generic_stat_ci_method(dc):
+    medians = dc.generic_stat(numpy.median, statname="median", ci_method="analytic")
+    for loc in dc.locations:
+        row = medians.loc[loc.definition["param"], loc.definition["loc"]]
+        expected = bootstrap.order_statistic_CI(loc.data, 50)
+        numpy.testing.assert_allclose(row[["lower", "upper"]].values, expected)
+
+
+def test_locations_ci_method():
+    df = helpers.make_dc_data_complex()
+    opts = dict(rescol="res", qualcol="qual", stationcol="loc", paramcol="param", ndval="<")
+    dc = DataCollection(df, bsiter=500, showpbar=False, ci_method="analytic", **opts)
+    for loc in dc.locations:
+        assert loc.ci_method == "analytic"
+        expected = bootstrap.order_statistic_CI(loc.data, 50)
+        numpy.testing.assert_allclose(loc.median_conf_interval, expected)
+
+
+def test_bad_ci_method():
+    df = helpers.make_dc_data_complex()
+    opts = dict(rescol="res", qualcol="qual", stationcol="loc", paramcol="param", ndval="<")
+    with helpers.raises(ValueError):
+        DataCollection(df, ci_method="BAC", **opts)
+
+
 # this sufficiently tests dc._filter_collection
 def test_selectLocations(dc):
     locs = dc.selectLocations(param="A", loc=["Inflow", "Outflow"])
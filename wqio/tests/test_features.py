@@ -1,9 +1,11 @@
+import numpy
 import numpy.testing as nptest
 import pandas
 import pytest
 import scipy
 from packaging.version import Version
 
+from wqio import bootstrap
 from wqio.features import Dataset, Location
 from wqio.tests import helpers
 
@@ -139,10 +141,10 @@ def test_location_stats_arrays(location, attr):
             True: [0.32157, 0.45271, 0.66667],
             False: [0.32157, 0.45271, 0.66667],
         },
-        "geomean_conf_interval": {True: [6.55572, 9.79677], False: [7.25255, 10.34346]},
-        "logmean_conf_interval": {True: [1.88631, 2.27656], False: [1.97075, 2.34456]},
-        "mean_conf_interval": {True: [7.74564, 11.49393], False: [8.52743, 11.97627]},
-        "median_conf_interval": {True: [5.66000, 8.71000], False: [6.65000, 9.850000]},
+        "geomean_conf_interval": {True: [6.62635, 9.84400], False: [7.30061, 10.37952]},
+        "logmean_conf_interval": {True: [1.89216, 2.28224], False: [1.97709, 2.35026]},
+        "mean_conf_interval": {True: [7.90624, 11.68266], False: [8.64676, 12.20708]},
+        "median_conf_interval": {True: [5.66000, 8.71000], False: [6.71410, 9.850000]},
         "shapiro": {True: [0.886889, 0.001789], False: [0.896744, 0.003236]},
         "shapiro_log": {True: [0.972679, 0.520949], False: [0.964298, 0.306435]},
         "lilliefors": {True: [0.185180, 0.004200], False: [0.160353, 0.02425]},
@@ -197,6 +199,51 @@ def test_location_anderson(location, attr, index):
         nptest.assert_array_almost_equal(getattr(location, attr)[index], result, decimal=5)
 
 
+def test_location_random_state():
+    data = helpers.getTestROSData()
+    loc1 = Location(data, bsiter=1000, random_state=42)
+    loc2 = Location(data, bsiter=1000, random_state=42)
+
+    # the CIs are computed in a different order but are the same
+    ci1 = [loc1.median_conf_interval, loc1.mean_conf_interval, loc1.logmean_conf_interval]
+    ci2 = [loc2.logmean_conf_interval, loc2.mean_conf_interval, loc2.median_conf_interval][::-1]
+    nptest.assert_array_equal(numpy.array(ci1), numpy.array(ci2))
+
+
+def test_location_jackknife():
+    data = helpers.getTestROSData()
+    loc = Location(data, bsiter=1000, random_state=42)
+    statfxns = [numpy.median, numpy.mean, bootstrap.logmean]
+    plan = bootstrap.ResamplePlan(loc.data.shape[0], niter=1000, random_state=42)
+    expected = plan.BCA(loc.data, statfxns, acceleration="jackknife")
+    nptest.assert_allclose(loc.median_conf_interval, expected[0])
+    nptest.assert_allclose(loc.mean_conf_interval, expected[1])
+    nptest.assert_allclose(loc.logmean_conf_interval, expected[2])
+
+    # the skewness of the data isn't the acceleration of the log-mean
+    skew = plan.BCA(loc.data, statfxns, acceleration="skew")
+    assert not numpy.array_equal(loc.logmean_conf_interval, skew[2])
+
+
+@pytest.mark.parametrize("ci_method", ["analytic", "cox", "percentile", "studentized", "double"])
+def test_location_ci_method(ci_method):
+    data = helpers.getTestROSData()
+    loc = Location(data, bsiter=1000, random_state=42, ci_method=ci_method)
+    for stat in ["median", "mean", "logmean"]:
+        lower, upper = getattr(loc, f"{stat}_conf_interval")
+        assert lower < getattr(loc, stat) < upper
+
+    if ci_method == "analytic":
+        nptest.assert_array_equal(
+            loc.median_conf_interval, bootstrap.order_statistic_CI(loc.data, 50)
+        )
+
+
+def test_location_bad_ci_method():
+    with helpers.raises(ValueError):
+        Location(helpers.getTestROSData(), ci_method="junk")
+
+
 @pytest.fixture
 def dataset():
     known_bsiter = 750
@@ -381,6 +428,15 @@ def test_medianCIsOverlap(dataset):
     assert known_medianCIsOverlap == dataset.medianCIsOverlap
 
 
+@pytest.mark.parametrize("statfxn", [numpy.median, numpy.mean])
+def test_paired_bootstrap(dataset, statfxn):
+    est = dataset.paired_bootstrap(statfxn, niter=500, random_state=0)
+    infl = dataset.paired_data.inflow.res.values
+    effl = dataset.paired_data.outflow.res.values
+    assert est.ratio == statfxn(effl) / statfxn(infl)
+    assert est.ratio_CI[0] < est.ratio < est.ratio_CI[1]
+
+
 def test__repr__normal(dataset):
     dataset.__repr__
 
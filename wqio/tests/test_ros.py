@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 from textwrap import dedent
 
@@ -7,7 +8,7 @@ import pandas
 import pandas.testing as pdtest
 import pytest
 
-from wqio import ros
+from wqio import ros, utils
 from wqio.tests import helpers
 
 
@@ -562,6 +563,24 @@ def test_cohn_numbers_no_NDs(basic_data):
     assert result.shape == (0, 6)
 
 
+def test__compute_PE(expected_cohn):
+    A = expected_cohn["nuncen_above"].values[:-1]
+    B = expected_cohn["nobs_below"].values[:-1]
+    result = ros._compute_PE(A, B)
+    nptest.assert_array_almost_equal(result, expected_cohn["prob_exceedance"].values)
+
+
+def test__cohn_arrays(basic_data, expected_cohn):
+    res = basic_data["conc"].values
+    cen = basic_data["censored"].values
+    DLs, A, B, C, PE = ros._cohn_arrays(res, cen)
+    nptest.assert_array_equal(DLs, expected_cohn["lower_dl"].values[:-1])
+    nptest.assert_array_equal(A, expected_cohn["nuncen_above"].values[:-1])
+    nptest.assert_array_equal(B, expected_cohn["nobs_below"].values[:-1])
+    nptest.assert_array_equal(C, expected_cohn["ncen_equal"].values[:-1])
+    nptest.assert_array_almost_equal(PE, expected_cohn["prob_exceedance"].values)
+
+
 def test__detection_limit_index_empty():
     empty_cohn = pandas.DataFrame(numpy.empty((0, 7)))
     assert ros._detection_limit_index(None, empty_cohn) == 0
@@ -578,6 +597,25 @@ def test__detection_limit_index_out_of_bounds(basic_cohn):
         ros._detection_limit_index(0, basic_cohn)
 
 
+def test__detection_limit_indices(basic_cohn):
+    values = numpy.array([3.5, 6.0, 12.0, 5.0])
+    result = ros._detection_limit_indices(values, basic_cohn["lower_dl"].values)
+    nptest.assert_array_equal(result, numpy.array([0, 3, 5, 1]))
+
+
+def test__detection_limit_indices_empty():
+    result = ros._detection_limit_indices(numpy.array([1.0, 2.0]), numpy.array([]))
+    nptest.assert_array_equal(result, numpy.array([0, 0]))
+
+
+def test__sorted_group_rank():
+    dl_idx = numpy.array([0, 0, 1, 1, 1, 0, 0, 2, 2, 3])
+    censored = numpy.array([True, True, True, True, True, False, False, False, False, False])
+    result = ros._sorted_group_rank(dl_idx, censored)
+    expected = numpy.array([1, 2, 1, 2, 3, 1, 2, 1, 2, 1])
+    nptest.assert_array_equal(result, expected)
+
+
 def test__ros_group_rank():
     df = pandas.DataFrame(
         {
@@ -1492,3 +1530,235 @@ def test_cohn_from_literature(case):
     cols = ["nuncen_above", "nobs_below", "ncen_equal", "prob_exceedance"]
     result = ros.cohn_numbers(case.df, case.rescol, case.cencol)
     pdtest.assert_frame_equal(result[cols].round(5), case.cohn[cols].round(5), atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    "case",
+    [
+        HelselAppendixB,
+        HelselArsenic,
+        RNADAdata,
+        NoOp_ZeroND,
+        OneND,
+        HalfDLs_80pctNDs,
+        HaflDLs_OneUncensored,
+        MaxCen_GT_MaxUncen,
+        OnlyDL_GT_MaxUncen,
+    ],
+)
+@pytest.mark.parametrize("floor", [None, 2])
+def test_ros_array_matches_dataframe(case, floor):
+    expected = ros.ROS(case.rescol, case.cencol, df=case.df, as_array=False, floor=floor)
+    result = ros.ros_array(case.df[case.rescol], case.df[case.cencol], floor=floor)
+    nptest.assert_array_almost_equal(result, expected["final"].values, decimal=10)
+
+
+@pytest.fixture
+def grouped_data():
+    cases = [
+        HelselAppendixB,
+        HelselArsenic,
+        RNADAdata,
+        NoOp_ZeroND,
+        OneND,
+        HalfDLs_80pctNDs,
+        HaflDLs_OneUncensored,
+        MaxCen_GT_MaxUncen,
+        OnlyDL_GT_MaxUncen,
+    ]
+    df = pandas.concat(
+        [
+            pandas.DataFrame(
+                {"res": case.df[case.rescol].values, "cen": case.df[case.cencol].values}
+            ).assign(case=case.__name__, param=n % 2)
+            for n, case in enumerate(cases)
+        ],
+        ignore_index=True,
+    )
+    return df
+
+
+@pytest.mark.parametrize("floor", [None, 2])
+def test_ROS_grouped(grouped_data, floor):
+    result = ros.ROS_grouped(grouped_data, ["case", "param"], "res", "cen", floor=floor)
+    expected = grouped_data.groupby(by=["case", "param"]).apply(
+        lambda g: ros.ROS("res", "cen", df=g, as_array=False, floor=floor),
+        include_groups=False,
+    )
+    assert result.columns.tolist() == ["case", "param", "res", "cen", "final"]
+    nptest.assert_array_equal(result["case"].values, expected.index.get_level_values("case").values)
+    nptest.assert_array_equal(result["res"].values, expected["res"].values)
+    nptest.assert_array_almost_equal(result["final"].values, expected["final"].values, decimal=10)
+
+
+@pytest.mark.parametrize(
+    "case",
+    [
+        HelselAppendixB,
+        HelselArsenic,
+        RNADAdata,
+        NoOp_ZeroND,
+        OneND,
+        HalfDLs_80pctNDs,
+        HaflDLs_OneUncensored,
+        MaxCen_GT_MaxUncen,
+        OnlyDL_GT_MaxUncen,
+    ],
+)
+@pytest.mark.parametrize("floor", [None, 2])
+@pytest.mark.parametrize("uselogs", [True, False])
+def test_ROSModel_estimate(case, floor, uselogs):
+    transforms = (numpy.log, numpy.exp) if uselogs else (utils.no_op, utils.no_op)
+    model = ros.ROSModel(case.rescol, case.cencol, df=case.df)
+    expected = ros.ROS(
+        case.rescol,
+        case.cencol,
+        df=case.df,
+        floor=floor,
+        transform_in=transforms[0],
+        transform_out=transforms[1],
+    )
+    result = model.estimate(transform_in=transforms[0], transform_out=transforms[1], floor=floor)
+    nptest.assert_array_almost_equal(result, expected, decimal=10)
+
+
+def test_ROSModel_caches_order_stats(basic_data, expected_cohn):
+    model = ros.ROSModel("conc", "censored", df=basic_data)
+    assert model.method == "ROS"
+
+    order_stats = model.order_stats
+    model.estimate(floor=5)
+    model.estimate(transform_in=utils.no_op, transform_out=utils.no_op)
+    assert model.order_stats is order_stats
+
+    pdtest.assert_frame_equal(model.cohn, expected_cohn, rtol=1e-5)
+    assert model.table.columns.tolist() == [
+        "res",
+        "cen",
+        "det_limit_index",
+        "rank",
+        "plot_pos",
+        "Zprelim",
+    ]
+    nptest.assert_array_almost_equal(
+        model.table["plot_pos"].values,
+        ros._do_ros(basic_data, "conc", "censored", numpy.log, numpy.exp)["plot_pos"].values,
+    )
+
+
+@pytest.mark.parametrize(
+    ("case", "method"),
+    [(NoOp_ZeroND, "none"), (HaflDLs_OneUncensored, "substitution"), (OneND, "ROS")],
+)
+def test_ROSModel_method(case, method):
+    model = ros.ROSModel(case.rescol, case.cencol, df=case.df)
+    assert model.method == method
+    if method != "ROS":
+        assert model.order_stats is None
+        assert model.table is None
+
+
+def test_IncrementalROS():
+    numpy.random.seed(0)
+    res = numpy.round(numpy.random.lognormal(size=60), 1) + 0.1
+    cen = numpy.random.uniform(size=60) < 0.3
+    model = ros.IncrementalROS(res[:20], cen[:20])
+    for stop in [21, 35, 60]:
+        start = model.result.shape[0]
+        model = model.append(res[start:stop], cen[start:stop])
+        expected = ros.ROS(res[:stop], cen[:stop])
+        nptest.assert_array_almost_equal(model.estimate(), expected, decimal=10)
+        df = pandas.DataFrame({"res": res[:stop], "cen": cen[:stop]})
+        pdtest.assert_frame_equal(model.cohn, ros.cohn_numbers(df, "res", "cen"))
+
+
+def test_IncrementalROS_append_bad_shapes():
+    model = ros.IncrementalROS([1.0, 2.0, 3.0], [True, False, False])
+    with helpers.raises(ValueError):
+        model.append([1.0, 2.0], [True])
+
+
+def test_ROS_batched():
+    numpy.random.seed(0)
+    res = numpy.round(numpy.random.lognormal(size=(50, 15)), 1) + 0.1
+    cen = numpy.random.uniform(size=(50, 15)) < 0.4
+    result = ros.ROS_batched(res, cen)
+    assert result.shape == res.shape
+    for row, (r, c) in enumerate(zip(res, cen)):
+        expected = ros.ROS(r, c)
+        values = result[row]
+        nptest.assert_array_almost_equal(values[: expected.shape[0]], expected, decimal=10)
+        assert numpy.isnan(values[expected.shape[0] :]).all()
+
+
+@pytest.fixture
+def ros_cache():
+    cache = ros.enable_cache(maxbytes=2**20)
+    yield cache
+    ros.disable_cache()
+
+
+@pytest.mark.parametrize("as_array", [True, False])
+def test_ROS_cached(basic_data, ros_cache, as_array):
+    first = ros.ROS("conc", "censored", df=basic_data, as_array=as_array)
+    second = ros.ROS("conc", "censored", df=basic_data, as_array=as_array)
+    assert ros_cache.info()[:3] == (1, 1, 1)
+    if as_array:
+        nptest.assert_array_equal(first, second)
+    else:
+        pdtest.assert_frame_equal(first, second)
+
+    # different parameters are different entries
+    ros.ROS("conc", "censored", df=basic_data, as_array=as_array, floor=5)
+    assert ros_cache.info()[:3] == (1, 2, 2)
+    ros.ROS("conc", "censored", df=basic_data, as_array=as_array, log=False, warn=True)
+    assert ros_cache.info()[:3] == (1, 3, 3)
+
+
+def test_ROS_cached_returns_copies(basic_data, ros_cache):
+    first = ros.ROS("conc", "censored", df=basic_data)
+    first[:] = -1
+    second = ros.ROS("conc", "censored", df=basic_data)
+    assert (second > 0).all()
+
+
+def test_ROS_grouped_cached(grouped_data, ros_cache):
+    first = ros.ROS_grouped(grouped_data, ["case", "param"], "res", "cen")
+    second = ros.ROS_grouped(grouped_data, ["case", "param"], "res", "cen")
+    pdtest.assert_frame_equal(first, second)
+    assert ros_cache.hits == 1
+
+
+def test_ROSCache_threads():
+    cache = ros.ROSCache(maxbytes=800)
+
+    def churn(n):
+        for i in range(500):
+            key = (n + i) % 20
+            if cache.get(key) is None:
+                cache.put(key, numpy.zeros(10))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(churn, range(8)))
+
+    assert cache.hits + cache.misses == 4000
+    assert cache.nbytes == 80 * len(cache) <= 800
+
+
+def test_ROSCache_eviction():
+    cache = ros.ROSCache(maxbytes=200)
+    cache.put("a", numpy.zeros(10))
+    cache.put("b", numpy.zeros(10))
+    cache.get("a")
+    cache.put("c", numpy.zeros(10))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.nbytes == 160
+
+    # too big to ever store
+    cache.put("d", numpy.zeros(100))
+    assert len(cache) == 2
+
+    cache.clear()
+    assert cache.info() == (0, 0, 0, 0, 200)
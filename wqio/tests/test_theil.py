@@ -2,7 +2,7 @@ import numpy
 import numpy.testing as nptest
 import pytest
 
-from wqio import theil
+from wqio import theil, utils
 from wqio.tests import helpers
 from wqio.utils import TheilStats
 
@@ -290,3 +290,129 @@ def test_all_theil(xy):
     assert all([isinstance(x, theil.TheilSenFit) for x in all_tsf])
     assert isinstance(best_tsf, theil.TheilSenFit)
     assert (best_tsf.log_infl, best_tsf.log_effl) == (True, False)
+
+
+def test_all_theil_shared_cache(xy):
+    all_tsf, _ = theil.all_theil(*xy)
+    assert all(tsf.cache is all_tsf[0].cache for tsf in all_tsf)
+    assert all_tsf[1].infl is all_tsf[2].infl
+    assert all_tsf[0].effl is all_tsf[1].effl
+
+    for tsf in all_tsf:
+        expected = utils.compute_theilslope(tsf.effl, tsf.infl)
+        assert tuple(tsf.theil_stats) == tuple(expected)
+
+
+def test_TheilSenFit_memoized(ts):
+    assert ts.infl is ts.infl
+    assert ts.errors is ts.errors
+    assert ts.med_estimate is ts.med_estimate
+
+
+def test_TheilSenFit_large(monkeypatch, xy):
+    expected = theil.TheilSenFit(*xy, log_infl=True).theil_stats
+
+    monkeypatch.setattr(utils.numutils, "_THEIL_DENSE_MAXSIZE", 5)
+    tsf = theil.TheilSenFit(*xy, log_infl=True)
+    assert tsf.cache.slopes(True, False) is None
+    nptest.assert_allclose(tuple(tsf.theil_stats), tuple(expected))
+
+
+def test_TheilSenFit_bad_lengths(xy):
+    tsf = theil.TheilSenFit(xy[0][:-1], xy[1])
+    with pytest.raises(ValueError):
+        tsf.theil_stats
+
+
+def _brute_censored_S(x, y, censored, slope):
+    r = y - slope * x
+    S = 0
+    for i in range(len(x)):
+        for j in range(len(x)):
+            if x[i] < x[j]:
+                if not censored[j] and (r[j] > r[i] or (censored[i] and r[j] >= r[i])):
+                    S += 1
+                elif not censored[i] and (r[i] > r[j] or (censored[j] and r[i] >= r[j])):
+                    S -= 1
+    return S
+
+
+@pytest.fixture
+def censored_data():
+    rng = numpy.random.default_rng(0)
+    x = rng.integers(0, 12, size=60).astype(float)
+    y = numpy.round(0.25 * x + rng.lognormal(size=60), 1)
+    censored = y < 1.5
+    y[censored] = 1.5
+    return x, y, censored
+
+
+@pytest.mark.parametrize("slope", [-0.3, 0.0, 0.25, 0.1])
+def test__censored_kendall_S(censored_data, slope):
+    result = theil._censored_kendall_S(*censored_data, slope)
+    assert result == _brute_censored_S(*censored_data, slope)
+
+
+@pytest.mark.parametrize(
+    ("censored", "expected"),
+    [
+        ([False] * 5, 3.0),
+        ([True, True, True, False, False], numpy.nan),
+        ([False, True, False, True, False], 1.0),
+    ],
+)
+def test__censored_median(censored, expected):
+    values = numpy.array([5.0, 2.0, 3.0, 4.0, 1.0])
+    result = theil._censored_median(values, numpy.array(censored)[[4, 1, 2, 3, 0]])
+    nptest.assert_equal(result, expected)
+
+
+@pytest.mark.parametrize("ties", [False, True])
+def test_akritas_theilsen_uncensored(ties):
+    rng = numpy.random.default_rng(1)
+    x = rng.normal(size=75)
+    y = 0.5 * x + rng.normal(size=75)
+    if ties:
+        x, y = numpy.round(x), numpy.round(y)
+
+    result = theil.akritas_theilsen(y, x)
+    expected = utils.compute_theilslope(y, x)
+    nptest.assert_allclose(result.slope, expected.slope, rtol=1e-12)
+
+    # the bounds are pairwise slopes (some of which are equal but for
+    # their rounding)
+    slopes = (y[:, None] - y)[x[:, None] > x] / (x[:, None] - x)[x[:, None] > x]
+    for bound in (result.low_slope, result.high_slope):
+        assert numpy.isclose(slopes, bound, rtol=1e-12, atol=0).any()
+    assert result.low_slope <= result.slope <= result.high_slope
+
+
+def test_akritas_theilsen(censored_data):
+    x, y, censored = censored_data
+    result = theil.akritas_theilsen(y, x, censored)
+    assert result.low_slope < 0.25 < result.high_slope
+    assert result.low_slope < result.slope < result.high_slope
+
+    # Kendall's S of the residuals changes sign at the slope
+    step = 1e-9 * abs(result.slope)
+    assert theil._censored_kendall_S(x, y, censored, result.slope - step) >= 0
+    assert theil._censored_kendall_S(x, y, censored, result.slope + step) <= 0
+
+    residuals = y - result.slope * x
+    assert result.intercept == theil._censored_median(residuals, censored)
+
+
+def test_akritas_theilsen_flat():
+    # residuals of tiny slopes round to the same values as with none
+    x = numpy.arange(40.0)
+    y = numpy.round(1000 + numpy.sin(x), 0)
+    result = theil.akritas_theilsen(y, x)
+    assert result.slope == utils.compute_theilslope(y, x).slope == 0
+
+
+def test_akritas_theilsen_degenerate():
+    y = numpy.array([1.0, 2.0, 3.0])
+    assert numpy.isnan(theil.akritas_theilsen(y, [1, 1, 1])).all()
+    assert numpy.isnan(theil.akritas_theilsen(y, censored=[True] * 3)).all()
+    with pytest.raises(ValueError):
+        theil.akritas_theilsen(y, [1, 2])
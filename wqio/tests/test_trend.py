@@ -0,0 +1,149 @@
+import numpy
+import numpy.testing as nptest
+import pandas
+import pandas.testing as pdtest
+import pytest
+from scipy import stats
+
+from wqio import trend, utils
+
+
+def _brute_S(x, y):
+    dx = numpy.sign(x[:, None] - x)
+    dy = numpy.sign(y[:, None] - y)
+    return numpy.triu(dx * dy, k=1).sum()
+
+
+@pytest.fixture
+def series():
+    rng = numpy.random.default_rng(0)
+    dates = pandas.date_range("2001-01-01", periods=120, freq="MS")
+    y = numpy.round(rng.lognormal(size=dates.shape[0]) + numpy.arange(dates.shape[0]) / 60, 1)
+    return dates, y
+
+
+@pytest.mark.parametrize("ties", [False, True])
+def test_mann_kendall(ties):
+    rng = numpy.random.default_rng(1)
+    x = rng.normal(size=250)
+    y = x * 0.1 + rng.normal(size=250)
+    if ties:
+        x, y = numpy.round(x), numpy.round(y, 1)
+
+    result = trend.mann_kendall(y, x)
+    tau, pvalue = stats.kendalltau(x, y, method="asymptotic")
+    S = _brute_S(x, y)
+    assert result.n == 250
+    assert result.S == S
+    nptest.assert_allclose(result.tau, tau, rtol=1e-12)
+
+    # scipy's p-value doesn't have the continuity correction
+    z = result.S / numpy.sqrt(result.var_S)
+    nptest.assert_allclose(2 * stats.norm.sf(abs(z)), pvalue, rtol=1e-9)
+    nptest.assert_allclose(result.Z, (result.S - numpy.sign(result.S)) / numpy.sqrt(result.var_S))
+
+
+def test_mann_kendall_trend():
+    y = numpy.arange(20.0)
+    result = trend.mann_kendall(y)
+    assert result.trend == "increasing"
+    assert result.S == 190
+    assert result.tau == 1
+    assert trend.mann_kendall(y[::-1]).trend == "decreasing"
+    assert trend.mann_kendall([1, 3, 2, 1, 3, 2]).trend == "no trend"
+
+
+def test_mann_kendall_nan(series):
+    dates, y = series
+    y = y.copy()
+    y[::7] = numpy.nan
+    result = trend.mann_kendall(y, dates)
+    expected = trend.mann_kendall(y[~numpy.isnan(y)], dates[~numpy.isnan(y)])
+    assert result == expected
+
+
+def test_mann_kendall_bad_lengths():
+    with pytest.raises(ValueError):
+        trend.mann_kendall([1, 2, 3], [1, 2])
+
+
+def test__seasons_and__wateryears():
+    dates = pandas.date_range("1999-12-15", periods=800, freq="3D")
+    expected = [utils.get_season(d) for d in dates]
+    assert trend._seasons(dates).tolist() == expected
+
+    expected = [int(utils.get_wateryear(d).split("/")[0]) for d in dates]
+    assert trend._wateryears(dates).tolist() == expected
+
+
+def test_seasonal_kendall(series):
+    dates, y = series
+    result = trend.seasonal_kendall(dates, y)
+
+    seasons = trend._seasons(dates)
+    years = trend._wateryears(dates)
+    S = sum(_brute_S(years[seasons == s], y[seasons == s]) for s in numpy.unique(seasons))
+    var_S = sum(
+        trend.mann_kendall(y[seasons == s], years[seasons == s]).var_S
+        for s in numpy.unique(seasons)
+    )
+    assert result.n == 120
+    assert result.S == S
+    nptest.assert_allclose(result.var_S, var_S)
+
+
+def test_seasonal_kendall_seasons(series):
+    dates, y = series
+    months = dates.month
+    result = trend.seasonal_kendall(dates, y, seasons=months)
+    S = sum(
+        trend.mann_kendall(y[months == m], trend._wateryears(dates)[months == m]).S
+        for m in range(1, 13)
+    )
+    assert result.S == S
+
+
+@pytest.mark.parametrize("seasonal", [False, True])
+def test_kendall_trends(series, seasonal):
+    dates, y = series
+    df = pandas.concat(
+        [
+            pandas.DataFrame({"site": site, "date": dates, "res": y * scale + offset})
+            for site, scale, offset in [("A", 1, 0), ("B", -1, 0), ("C", 0.5, 3)]
+        ]
+    ).sample(frac=1, random_state=0)
+
+    result = trend.kendall_trends(df, "res", "date", groupcols=["site"], seasonal=seasonal)
+    assert result.index.tolist() == ["A", "B", "C"]
+    assert result.columns.tolist() == list(trend.KendallTrend._fields)
+
+    test = trend.seasonal_kendall if seasonal else lambda d, r: trend.mann_kendall(r, d)
+    for site, row in result.iterrows():
+        group = df[df["site"] == site]
+        expected = test(group["date"], group["res"])
+        assert row["trend"] == expected.trend
+        nptest.assert_allclose(
+            row[["n", "S", "var_S", "Z", "pvalue", "tau"]].astype(float), expected[1:]
+        )
+
+    assert result.loc["A", "S"] == -result.loc["B", "S"]
+    cols = ["n", "S", "var_S"]
+    pdtest.assert_series_equal(result.loc["A", cols], result.loc["C", cols], check_names=False)
+
+
+def test_kendall_trends_missing_groups(series):
+    dates, y = series
+    df = pandas.DataFrame({"site": "A", "date": dates, "res": y})
+    df.loc[::5, "site"] = numpy.nan
+
+    result = trend.kendall_trends(df, "res", "date", groupcols=["site"])
+    assert result.index.tolist() == ["A"]
+    group = df[df["site"].notnull()]
+    assert tuple(result.loc["A"]) == tuple(trend.mann_kendall(group["res"], group["date"]))
+
+
+def test_kendall_trends_ungrouped(series):
+    dates, y = series
+    df = pandas.DataFrame({"date": dates, "res": y})
+    result = trend.kendall_trends(df, "res", "date")
+    assert tuple(result.iloc[0]) == tuple(trend.mann_kendall(y, dates))
@@ -1,4 +1,5 @@
 import types
+from concurrent.futures import ThreadPoolExecutor
 from collections import namedtuple
 from io import StringIO
 from textwrap import dedent
@@ -302,6 +303,106 @@ def test_compute_theilslope_default(error: types.NoneType | type[ValueError]):
         assert tuple(numutils.compute_theilslope(y, x)) == stats.mstats.theilslopes(y, x)
 
 
+def _theil_data(kind, n, seed=0):
+    rng = numpy.random.default_rng(seed)
+    if kind == "continuous":
+        x = rng.normal(size=n)
+        y = 0.5 * x + rng.normal(size=n)
+    elif kind == "ties":
+        x = rng.integers(0, 10, size=n).astype(float)
+        y = rng.integers(0, 5, size=n).astype(float)
+    else:
+        x = numpy.round(rng.normal(size=n), 1)
+        y = numpy.round(2 * x + rng.normal(size=n), 1)
+    return x, y
+
+
+@pytest.mark.parametrize("maxwindow", [None, 50])
+@pytest.mark.parametrize("kind", ["continuous", "ties", "rounded"])
+def test__select_pairwise_slopes(kind, maxwindow):
+    x, y = _theil_data(kind, 150)
+    dx = x[:, numpy.newaxis] - x
+    dy = y[:, numpy.newaxis] - y
+    slopes = numpy.sort(dy[dx > 0] / dx[dx > 0])
+
+    ranks = [0, 5, slopes.shape[0] // 3, slopes.shape[0] // 2, slopes.shape[0] - 1]
+    result = numutils._select_pairwise_slopes(x, y, ranks, maxwindow=maxwindow)
+    nptest.assert_array_equal(result, slopes[ranks])
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 100])
+@pytest.mark.parametrize("percentile", [0, 12.5, 50, 73, 100])
+def test__interpolate_percentile(n, percentile):
+    values = numpy.sort(numpy.random.default_rng(n).normal(size=n))
+    lower, upper = numutils._percentile_ranks(n, percentile)
+    result = numutils._interpolate_percentile(values[lower], values[upper], n, percentile)
+    assert result == numpy.percentile(values, percentile)
+
+
+@pytest.mark.parametrize("percentile", [50, 25])
+@pytest.mark.parametrize("kind", ["continuous", "ties", "rounded"])
+def test_compute_theilslope_selected(monkeypatch, kind, percentile):
+    x, y = _theil_data(kind, 300, seed=1)
+    expected = numutils.compute_theilslope(y, x, percentile=percentile)
+
+    monkeypatch.setattr(numutils, "_THEIL_DENSE_MAXSIZE", 100)
+    result = numutils.compute_theilslope(y, x, percentile=percentile)
+    assert tuple(result) == tuple(expected)
+
+
+@pytest.fixture
+def theil_datasets():
+    rng = numpy.random.default_rng(0)
+    datasets = {}
+    for n, size in enumerate([2, 5, 12, 30, 30, 150]):
+        x = numpy.round(rng.lognormal(size=size), 1)
+        y = rng.integers(0, 10, size=size) if n % 2 else rng.lognormal(size=size)
+        datasets[f"ds{n}"] = (x, y)
+    datasets["ts"] = (None, numpy.arange(8.0) ** 2)
+    datasets["constant"] = (numpy.ones(5), numpy.arange(5.0))
+    datasets["empty"] = (numpy.array([]), numpy.array([]))
+    return datasets
+
+
+@pytest.mark.parametrize("maxsize", [None, 20])
+def test_compute_theilslope_batched(monkeypatch, theil_datasets, maxsize):
+    if maxsize:
+        monkeypatch.setattr(numutils, "_THEIL_DENSE_MAXSIZE", maxsize)
+        monkeypatch.setattr(numutils, "_THEIL_BATCH_MAXPAIRS", 100)
+
+    result = numutils.compute_theilslope_batched(theil_datasets)
+    assert result.index.tolist() == list(theil_datasets.keys())
+    assert result.columns.tolist() == list(numutils.TheilStats._fields)
+    assert result.loc[["constant", "empty"]].isnull().all().all()
+    for key, (x, y) in theil_datasets.items():
+        if key not in ["constant", "empty"]:
+            expected = numutils.compute_theilslope(y, x)
+            assert tuple(result.loc[key]) == tuple(expected)
+
+
+def test_compute_theilslope_batched_executor(theil_datasets):
+    expected = numutils.compute_theilslope_batched(list(theil_datasets.values()))
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = numutils.compute_theilslope_batched(
+            list(theil_datasets.values()), n_jobs=3, executor=executor
+        )
+    pdtest.assert_frame_equal(result, expected)
+
+
+def test_compute_theilslope_batched_undefined_ci():
+    # the ties make the variance of the slopes negative
+    x = numpy.array([0.0, 0.0, 0.0, 0.0, 1.0])
+    result = numutils.compute_theilslope_batched([(x, x), (x, 2 * x + 1)])
+    nptest.assert_array_equal(result["slope"], [1.0, 2.0])
+    nptest.assert_array_equal(result["intercept"], [0.0, 1.0])
+    assert result[["low_slope", "high_slope"]].isnull().all().all()
+
+
+def test_compute_theilslope_batched_bad_lengths():
+    with helpers.raises(ValueError):
+        numutils.compute_theilslope_batched([(numpy.arange(3), numpy.arange(4))])
+
+
 @pytest.fixture
 def fit_data():
     data = {
@@ -1,11 +1,124 @@
 import numpy
 from probscale.algo import _estimate_from_fit
+from scipy import stats
+from statsmodels.tools.decorators import cache_readonly
 
 from wqio import utils
+from wqio.utils import numutils
+
+
+class TheilSenCache:
+    def __init__(self, infl, effl):
+        """Arrays shared by the Theil-Sen fits of the same data in
+        different (log/linear) spaces.
+
+        Because ``numpy.log`` is monotonic, the pairs of points that
+        define the slopes and the order of the data (and so the groups
+        of tied values) are the same in every space. They are found
+        once, so that only the differences between the points of each
+        pair need to be computed for each fit.
+
+        Parameters
+        ----------
+        infl, effl : array-like
+            Influent and effluent result to regress.
+
+        """
+
+        self.influent_data = infl
+        self.effluent_data = effl
+        self._cache = {}
+        self._arrays = {}
+
+    def _memoize(self, key, fxn):
+        if key not in self._arrays:
+            self._arrays[key] = fxn()
+        return self._arrays[key]
+
+    def order(self, which):
+        """Indices that sort the influent (``which="infl"``) or effluent
+        data, in every space."""
+
+        def _order():
+            return numpy.argsort(self.values(which, False), kind="stable")
+
+        return self._memoize(("order", which), _order)
+
+    @cache_readonly
+    def pairs(self):
+        """Indices of the points with the lower and higher influent
+        values of every pair, or None if there are too many points to
+        compute all of the slopes (see ``utils.compute_theilslope``).
+        """
+
+        x = self.values("infl", False)
+        if len(x) > numutils._THEIL_DENSE_MAXSIZE:
+            return None
+
+        # same order as the slopes in `utils.compute_theilslope`
+        hi, lo = numpy.nonzero(x[:, numpy.newaxis] > x)
+        return lo, hi
+
+    def transformed(self, which, log):
+        """The influent (``which="infl"``) or effluent data, log-
+        transformed if ``log`` is True."""
+
+        def _transform():
+            data = self.influent_data if which == "infl" else self.effluent_data
+            return numpy.log(data) if log else data
+
+        return self._memoize(("data", which, log), _transform)
+
+    def values(self, which, log):
+        """The (transformed) data as a flat numpy array, as they're
+        regressed by ``utils.compute_theilslope``."""
+
+        def _values():
+            dtype = float if which == "infl" else None
+            return numpy.array(self.transformed(which, log), dtype=dtype).flatten()
+
+        return self._memoize(("values", which, log), _values)
+
+    def repeats(self, which, log):
+        """Sizes of the groups of tied values in the (transformed) data
+        (see ``stats.mstats.find_repeats``)."""
+
+        def _repeats():
+            data = self.values(which, log)[self.order(which)]
+            starts = numpy.flatnonzero(numpy.r_[True, data[1:] != data[:-1]])
+            counts = numpy.diff(numpy.r_[starts, len(data)])
+            return counts[counts > 1]
+
+        return self._memoize(("repeats", which, log), _repeats)
+
+    def differences(self, which, log):
+        """Differences of the (transformed) data between the points of
+        each pair (see ``pairs``)."""
+
+        def _differences():
+            lo, hi = self.pairs
+            data = self.values(which, log)
+            return data[hi] - data[lo]
+
+        return self._memoize(("differences", which, log), _differences)
+
+    def slopes(self, log_infl, log_effl):
+        """Slopes between all of the pairs of points with different
+        (transformed) influent values, or None (see ``pairs``)."""
+
+        if self.pairs is None:
+            return None
+
+        def _slopes():
+            dx = self.differences("infl", log_infl)
+            dy = self.differences("effl", log_effl)
+            return dy[dx > 0] / dx[dx > 0]
+
+        return self._memoize(("slopes", log_infl, log_effl), _slopes)
 
 
 class TheilSenFit:
-    def __init__(self, infl, effl, log_infl=False, log_effl=False, **theil_opts):
+    def __init__(self, infl, effl, log_infl=False, log_effl=False, cache=None, **theil_opts):
         """Theil-Sen Fit object
 
         Parameters
@@ -14,6 +127,9 @@ class TheilSenFit:
             Influent and effluent result to regress.
         log_infl, log_effl : bool
             When True, performs the fit on log-transformed data.
+        cache : TheilSenCache, optional
+            Arrays shared with fits of the same data in other spaces
+            (see ``all_theil``).
 
         See also
         --------
@@ -22,6 +138,10 @@ class TheilSenFit:
         """
         self.influent_data = infl
         self.effluent_data = effl
+        if cache is None:
+            cache = TheilSenCache(infl, effl)
+        self.cache = cache
+        self._cache = {}
 
         self.log_infl = log_infl
         self.log_effl = log_effl
@@ -41,24 +161,32 @@ class TheilSenFit:
             self._effl_trans_out = utils.no_op
 
         self.theil_opts = theil_opts
-        self._theil_stats = None
 
-    @property
+    @cache_readonly
     def infl(self):
-        return self._infl_trans_in(self.influent_data)
+        return self.cache.transformed("infl", self.log_infl)
 
-    @property
+    @cache_readonly
     def effl(self):
-        return self._effl_trans_in(self.effluent_data)
+        return self.cache.transformed("effl", self.log_effl)
 
-    @property
+    @cache_readonly
     def theil_stats(self):
-        if self._theil_stats is None:
-            self._theil_stats = utils.compute_theilslope(
-                y=self.effl, x=self.infl, **self.theil_opts
-            )
+        x = self.cache.values("infl", self.log_infl)
+        y = self.cache.values("effl", self.log_effl)
+        if len(x) != len(y):
+            raise ValueError(f"Incompatible lengths ({len(y)} != {len(x)})")
 
-        return self._theil_stats
+        return numutils._theilslope(
+            y=y,
+            x=x,
+            slopes=self.cache.slopes(self.log_infl, self.log_effl),
+            repeats=(
+                self.cache.repeats("infl", self.log_infl),
+                self.cache.repeats("effl", self.log_effl),
+            ),
+            **self.theil_opts,
+        )
 
     @property
     def med_slope(self):
@@ -85,7 +213,7 @@ class TheilSenFit:
         else:
             return numpy.linspace(xmin, xmax)
 
-    @property
+    @cache_readonly
     def med_estimate(self):
         return _estimate_from_fit(
             self.influent_data,
@@ -95,15 +223,15 @@ class TheilSenFit:
             ylog=self.log_effl,
         )
 
-    @property
+    @cache_readonly
     def errors(self):
-        return self._effl_trans_in(self.effluent_data) - self._effl_trans_in(self.med_estimate)
+        return self.effl - self._effl_trans_in(self.med_estimate)
 
-    @property
+    @cache_readonly
     def MAD(self):
         return numpy.median(self._effl_trans_out(numpy.abs(self.errors)))
 
-    @property
+    @cache_readonly
     def BCF(self):
         return numpy.mean(self._effl_trans_out(utils.remove_outliers(self.errors)))
 
@@ -114,6 +242,10 @@ def all_theil(infl, effl, **theil_opts):
     for a dataset in various log/linear spaces. The case with linear
     influent data, but logarithmic effluent data is omitted.
 
+    The fits share a ``TheilSenCache`` so that the pairs of points,
+    the log-transformed data, and the tied values are only computed
+    once.
+
     Parameters
     -----------
     infl, effl : array-like
@@ -128,10 +260,272 @@ def all_theil(infl, effl, **theil_opts):
 
     """
 
+    cache = TheilSenCache(infl, effl)
     all_tsf = [
-        TheilSenFit(infl, effl, log_infl=False, log_effl=False, **theil_opts),
-        TheilSenFit(infl, effl, log_infl=True, log_effl=False, **theil_opts),
-        TheilSenFit(infl, effl, log_infl=True, log_effl=True, **theil_opts),
+        TheilSenFit(infl, effl, log_infl=False, log_effl=False, cache=cache, **theil_opts),
+        TheilSenFit(infl, effl, log_infl=True, log_effl=False, cache=cache, **theil_opts),
+        TheilSenFit(infl, effl, log_infl=True, log_effl=True, cache=cache, **theil_opts),
     ]
     best_tsf = min(all_tsf, key=lambda tr: tr.MAD)
     return all_tsf, best_tsf
+
+
+def _tied_pairs(*keys):
+    """Number of pairs of tied values of the sorted ``keys``."""
+
+    new = numpy.zeros(keys[0].shape[0], dtype=bool)
+    new[:1] = True
+    for values in keys:
+        new[1:] |= values[1:] != values[:-1]
+
+    t = numpy.diff(numpy.r_[numpy.flatnonzero(new), keys[0].shape[0]])
+    return int((t * (t - 1) // 2).sum())
+
+
+def _censored_kendall_S(x, y, censored, slope):
+    """
+    Kendall's S statistic between ``x`` and the residuals of the left-
+    censored ``y`` about a line with the given slope (Akritas et al.,
+    1995), in O(n log n) time.
+
+    A pair is concordant when the residual of the point with the larger
+    x-value is definitely larger (i.e., it's detected and larger than
+    the other residual or its censoring limit), discordant when it's
+    definitely smaller, and otherwise doesn't count.
+
+    Parameters
+    ----------
+    x : numpy array
+        The (uncensored) independent variable.
+    y : numpy array
+        The results or their censoring limits.
+    censored : numpy array of bool
+        Whether each result is censored (i.e., less than ``y``).
+    slope : float
+        Slope of the line.
+
+    Returns
+    -------
+    S : int
+
+    """
+
+    _, ranks = numpy.unique(y - slope * x, return_inverse=True)
+    detected = (~censored).astype(numpy.int64)
+
+    # a censored residual is less than a detected one at the same value
+    keys = 2 * ranks.reshape(-1) + detected
+
+    # ties in x are sorted by key and ties in key by position, so that
+    # the inverted pairs are the ones with a larger key before (in x) a
+    # smaller one
+    order = numpy.lexsort((keys, x))
+    x, keys, detected = x[order], keys[order], detected[order]
+    by_key = numpy.argsort(keys, kind="stable")
+    seq = numpy.empty(keys.shape[0], dtype=numpy.int64)
+    seq[by_key] = numpy.arange(keys.shape[0])
+
+    # discordant pairs: inverted, with the first point detected
+    discordant = 0
+    inverted = 0
+    for left_ids, right_ids, start, count in numutils._inversion_levels(seq):
+        cumulative = numpy.r_[0, numpy.cumsum(detected[left_ids])]
+        discordant += int((cumulative[start + count] - cumulative[start]).sum())
+        inverted += int((count * detected[right_ids]).sum())
+
+    # concordant pairs: the remaining pairs with the second point
+    # detected, after the tied ones
+    before = numpy.searchsorted(x, x, side="left")
+    detected_keys = keys[by_key] % 2 == 1
+    tied = _tied_pairs(keys[by_key][detected_keys]) - _tied_pairs(
+        keys[by_key][detected_keys], x[by_key][detected_keys]
+    )
+    concordant = int((before * detected).sum()) - inverted - tied
+    return concordant - discordant
+
+
+def _censored_median(values, censored):
+    """Kaplan-Meier median of left-censored ``values``: the smallest
+    detected value at or below which the estimated fraction of the
+    values is at least one half, or NaN if it's below all of the
+    detected values."""
+
+    levels, ndetected = numpy.unique(values[~censored], return_counts=True)
+    levels, ndetected = levels[::-1], ndetected[::-1]
+
+    # number of values at or below each level
+    at_risk = numpy.searchsorted(numpy.sort(values), levels, side="right")
+
+    # fraction of the values below each level (the reverse Kaplan-Meier
+    # estimate, from the largest level down)
+    below = numpy.cumprod(1 - ndetected / at_risk)
+    median = levels[below < 0.5]
+    return median[0] if median.shape[0] else numpy.nan
+
+
+def _ordinal(value):
+    """Integer with the same order as the float ``value`` among all of
+    the floats, i.e., consecutive floats have consecutive integers."""
+
+    bits = int(numpy.float64(value).view(numpy.int64))
+    return bits if bits >= 0 else -(bits & 0x7FFFFFFFFFFFFFFF)
+
+
+def _from_ordinal(ordinal):
+    """The float of an integer from ``_ordinal``."""
+
+    value = numpy.int64(abs(ordinal)).view(numpy.float64)
+    return float(-value if ordinal < 0 else value)
+
+
+def _step_slope(x, y, below, above):
+    """The slope between the points of a pair whose residuals are in a
+    different order about lines with the consecutive slopes ``below``
+    and ``above`` (or ``above`` if there aren't any), i.e., the exact
+    slope where Kendall's S changes in between."""
+
+    before, after = y - below * x, y - above * x
+    order = numpy.lexsort((after, before))
+    changed = numpy.sign(numpy.diff(before[order])) != numpy.sign(numpy.diff(after[order]))
+    if not changed.any():
+        return above
+
+    # pairs that change order are next to each other in either order
+    first, second = order[changed.argmax()], order[changed.argmax() + 1]
+    return (y[second] - y[first]) / (x[second] - x[first])
+
+
+def _slope_range(x, y):
+    """The smallest and largest slopes between any two points with
+    different x-values, which are those between consecutive x-values
+    (or None if all of the x-values are the same)."""
+
+    levels, codes = numpy.unique(x, return_inverse=True)
+    if levels.shape[0] < 2:
+        return None
+
+    lowest = numpy.full(levels.shape[0], numpy.inf)
+    highest = numpy.full(levels.shape[0], -numpy.inf)
+    numpy.minimum.at(lowest, codes, y)
+    numpy.maximum.at(highest, codes, y)
+
+    dx = numpy.diff(levels)
+    return (
+        numpy.min((lowest[1:] - highest[:-1]) / dx),
+        numpy.max((highest[1:] - lowest[:-1]) / dx),
+    )
+
+
+def akritas_theilsen(y, x=None, censored=None, alpha=0.95):
+    """
+    Akritas-Theil-Sen (ATS) slope of left-censored data (Akritas et
+    al., 1995), i.e., the slope of the line about which the residuals
+    have no correlation (Kendall's S of zero) with ``x``.
+
+    Unlike fitting imputed values (see ``wqio.ros.ROS``), non-detects
+    are only compared to other results when the order of the pair is
+    known no matter their true value. Without any non-detects, the
+    slope is the usual Theil-Sen (median) slope.
+
+    Parameters
+    ----------
+    y : array-like
+        The results (or their censoring limits when censored).
+    x : array-like, optional
+        The independent (uncensored) variable. Defaults to the
+        positions of the results.
+    censored : array-like of bool, optional
+        Whether each result is a non-detect. Defaults to none of them.
+    alpha : float, optional (default = 0.95)
+        Confidence level of the interval of the slope.
+
+    Returns
+    -------
+    result : wqio.utils.TheilStats
+        The slope, the intercept (the Kaplan-Meier median of the
+        residuals), and the bounds of the confidence interval of the
+        slope, where Kendall's S is outside of the normal range of its
+        variance (Sen, 1968).
+
+    Notes
+    -----
+    S is counted by merge sort in O(n log n) time and the slopes where
+    it crosses zero and the bounds of its interval are found by
+    bisection (down to consecutive floats, then snapped to the slope of
+    the pair of points that changes order there), so that thousands of
+    results can be fit.
+
+    """
+
+    y = numpy.array(y, dtype=float).flatten()
+    if x is None:
+        x = numpy.arange(y.shape[0], dtype=float)
+    else:
+        x = numpy.array(x, dtype=float).flatten()
+
+    if censored is None:
+        censored = numpy.zeros(y.shape[0], dtype=bool)
+    else:
+        censored = numpy.array(censored, dtype=bool).flatten()
+
+    if not (x.shape[0] == y.shape[0] == censored.shape[0]):
+        raise ValueError(f"Incompatible lengths ({len(y)} != {len(x)} != {len(censored)})")
+
+    valid = ~(numpy.isnan(x) | numpy.isnan(y))
+    x, y, censored = x[valid], y[valid], censored[valid]
+    limits = _slope_range(x, y)
+    if limits is None or censored.all():
+        return utils.TheilStats(numpy.nan, numpy.nan, numpy.nan, numpy.nan)
+
+    if alpha > 0.5:
+        alpha = 1.0 - alpha
+
+    # Equation 2.6 in Sen (1968), with censored results only tied to
+    # those with the same limit
+    _, xreps = numpy.unique(x, return_counts=True)
+    _, yreps = numpy.unique(numpy.c_[y, censored], axis=0, return_counts=True)
+    n = y.shape[0]
+    sigma = numpy.sqrt(
+        (
+            n * (n - 1) * (2 * n + 5)
+            - numpy.sum(xreps * (xreps - 1) * (2 * xreps + 5))
+            - numpy.sum(yreps * (yreps - 1) * (2 * yreps + 5))
+        )
+        / 18.0
+    )
+    z = -stats.distributions.norm.ppf(alpha / 2.0)
+    lowest, highest = limits
+    evaluated = {}
+
+    def S(slope):
+        if slope not in evaluated:
+            evaluated[slope] = _censored_kendall_S(x, y, censored, slope)
+        return evaluated[slope]
+
+    def crossing(level):
+        """The slope where S (which never increases with the slope)
+        drops from above ``level`` to at or below it, clamped to the
+        range of the slopes."""
+
+        if S(lowest) <= level:
+            return lowest
+        if S(highest) > level:
+            return highest
+
+        # bisect every float in between (sharing evaluations with the
+        # other levels) down to the two around the step
+        below, above = _ordinal(lowest), _ordinal(highest)
+        while above - below > 1:
+            middle = (below + above) // 2
+            if S(_from_ordinal(middle)) > level:
+                below = middle
+            else:
+                above = middle
+
+        return _step_slope(x, y, _from_ordinal(below), _from_ordinal(above))
+
+    # Kendall's S is zero between the step where it stops being
+    # positive and the one where it becomes negative
+    slope = 0.5 * (crossing(0.5) + crossing(-0.5))
+    intercept = _censored_median(y - slope * x, censored)
+    return utils.TheilStats(slope, intercept, crossing(z * sigma), crossing(-z * sigma))
@@ -0,0 +1,327 @@
+from collections import namedtuple
+
+import numpy
+import pandas
+from scipy import stats
+
+from wqio import validate
+from wqio.utils import numutils
+
+KendallTrend = namedtuple("KendallTrend", ("trend", "n", "S", "var_S", "Z", "pvalue", "tau"))
+
+__all__ = [
+    "KendallTrend",
+    "mann_kendall",
+    "seasonal_kendall",
+    "kendall_trends",
+]
+
+
+def _seasons(dates):
+    """Vectorized ``wqio.utils.get_season``."""
+
+    dates = pandas.DatetimeIndex(dates)
+    day = numpy.asarray(dates.dayofyear) - numpy.asarray(dates.is_leap_year, dtype=int)
+    season = numpy.full(day.shape, "winter", dtype=object)
+    season[(day >= 80) & (day < 172)] = "spring"
+    season[(day >= 172) & (day < 264)] = "summer"
+    season[(day >= 264) & (day < 355)] = "autumn"
+    return season
+
+
+def _wateryears(dates):
+    """First calendar year of the water year (see
+    ``wqio.utils.get_wateryear``) of each date."""
+
+    dates = pandas.DatetimeIndex(dates)
+    return numpy.asarray(dates.year) - (numpy.asarray(dates.month) < 10)
+
+
+def _times(x):
+    """Numeric values of ``x`` (e.g., dates) that sort the same way,
+    and whether they're valid (i.e., not NaN or NaT)."""
+
+    x = numpy.asarray(x)
+    if numpy.issubdtype(x.dtype, numpy.number):
+        x = x.astype(float)
+        return x, ~numpy.isnan(x)
+
+    x = pandas.DatetimeIndex(pandas.to_datetime(x))
+    return numpy.asarray(x.asi8), ~numpy.asarray(x.isna())
+
+
+def _ties(codes, nsegments, fxn, *keys):
+    """Sum of ``fxn(t)`` over the groups of ``t`` tied ``keys`` in each
+    segment, with the values sorted by ``codes`` and then ``keys``."""
+
+    new = numpy.zeros(codes.shape[0], dtype=bool)
+    new[:1] = True
+    for values in (codes, *keys):
+        new[1:] |= values[1:] != values[:-1]
+
+    starts = numpy.flatnonzero(new)
+    t = numpy.diff(numpy.r_[starts, codes.shape[0]]).astype(float)
+    return numpy.bincount(codes[starts], weights=fxn(t), minlength=nsegments)
+
+
+def _kendall_segments(codes, x, y, nsegments):
+    """
+    Kendall's S statistic of ``y`` versus ``x`` and its variance (with
+    the corrections for ties) for every segment of the data at once.
+
+    The discordant pairs are the inversions of the ranks of ``y`` once
+    the data are sorted by ``x``, counted by merge sort in O(n log n)
+    time. Offsetting the ranks by segment means that no pairs across
+    segments are inverted, so all of the segments share one sort.
+
+    Parameters
+    ----------
+    codes : numpy array of int
+        Segment (``0 ... nsegments - 1``) of each value.
+    x, y : numpy arrays
+        The times and values, without any missing values.
+    nsegments : int
+        Number of segments.
+
+    Returns
+    -------
+    n, S, var_S, tau_denom : numpy arrays
+        The number of values, S statistic, its variance, and the
+        squared denominator of Kendall's tau-b of each segment.
+
+    """
+
+    order = numpy.lexsort((y, x, codes))
+    codes, x, y = codes[order], x[order], y[order]
+
+    # ranks by y within each segment, ties in the same order as above
+    # so that they aren't inverted
+    by_y = numpy.lexsort((y, codes))
+    seq = numpy.empty(codes.shape[0], dtype=numpy.int64)
+    seq[by_y] = numpy.arange(codes.shape[0])
+
+    discordant = numpy.zeros(nsegments)
+    for _, right_ids, _, count in numutils._inversion_levels(seq):
+        discordant += numpy.bincount(codes[right_ids], weights=count, minlength=nsegments)
+
+    n = numpy.bincount(codes, minlength=nsegments).astype(float)
+
+    def pairs(t):
+        return t * (t - 1) / 2
+
+    def ties_var(t):
+        return t * (t - 1) * (2 * t + 5)
+
+    def ties_v1(t):
+        return t * (t - 1)
+
+    def ties_v2(t):
+        return t * (t - 1) * (t - 2)
+
+    x_pairs, x_var, x_v1, x_v2 = (
+        _ties(codes, nsegments, f, x) for f in (pairs, ties_var, ties_v1, ties_v2)
+    )
+    y_codes, y_sorted = codes[by_y], y[by_y]
+    y_pairs, y_var, y_v1, y_v2 = (
+        _ties(y_codes, nsegments, f, y_sorted) for f in (pairs, ties_var, ties_v1, ties_v2)
+    )
+    xy_pairs = _ties(codes, nsegments, pairs, x, y)
+
+    n0 = pairs(n)
+    S = n0 - x_pairs - y_pairs + xy_pairs - 2 * discordant
+
+    # Kendall (1975), as in scipy.stats.kendalltau
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        var_S = (
+            (ties_var(n) - x_var - y_var) / 18
+            + numpy.where(n > 1, x_v1 * y_v1 / (2 * n * (n - 1)), 0)
+            + numpy.where(n > 2, x_v2 * y_v2 / (9 * n * (n - 1) * (n - 2)), 0)
+        )
+
+    return n, S, var_S, (n0 - x_pairs) * (n0 - y_pairs)
+
+
+def _kendall_results(n, S, var_S, tau_denom, alpha):
+    """Test statistics (one ``KendallTrend`` per row) from the totals
+    of ``_kendall_segments``."""
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        Z = numpy.where(var_S > 0, (S - numpy.sign(S)) / numpy.sqrt(var_S), numpy.nan)
+        tau = numpy.where(tau_denom > 0, S / numpy.sqrt(tau_denom), numpy.nan)
+
+    pvalue = 2 * stats.norm.sf(numpy.abs(Z))
+    trend = numpy.where(pvalue < alpha, numpy.where(S > 0, "increasing", "decreasing"), "no trend")
+    return pandas.DataFrame(
+        {
+            "trend": trend,
+            "n": n.astype(int),
+            "S": S,
+            "var_S": var_S,
+            "Z": Z,
+            "pvalue": pvalue,
+            "tau": tau,
+        },
+        columns=list(KendallTrend._fields),
+    )
+
+
+def _kendall_groups(codes, ngroups, times, y, seasons=None, alpha=0.05):
+    """``KendallTrend`` of each group of ``codes``, summing the
+    statistics of the ``seasons`` within each group when provided."""
+
+    times, valid = _times(times)
+    y = numpy.asarray(y, dtype=float)
+    valid &= ~numpy.isnan(y)
+
+    codes = numpy.asarray(codes)[valid]
+    if seasons is None:
+        segments, nsegments = codes, ngroups
+    else:
+        _, season_codes = numpy.unique(numpy.asarray(seasons)[valid], return_inverse=True)
+        nseasons = season_codes.max() + 1 if season_codes.shape[0] else 1
+        segments, nsegments = codes * nseasons + season_codes, ngroups * nseasons
+
+    n, S, var_S, tau_denom = _kendall_segments(segments, times[valid], y[valid], nsegments)
+    if seasons is not None:
+        # Hirsch et al. (1982): seasons are independent, so their
+        # statistics (and variances) add up
+        n, S, var_S, tau_denom = (
+            numpy.bincount(numpy.arange(nsegments) // nseasons, weights=values, minlength=ngroups)
+            for values in (n, S, var_S, numpy.sqrt(tau_denom))
+        )
+        tau_denom = tau_denom**2
+
+    return _kendall_results(n, S, var_S, tau_denom, alpha)
+
+
+def mann_kendall(y, x=None, alpha=0.05):
+    """
+    Mann-Kendall test for a monotonic trend.
+
+    Parameters
+    ----------
+    y : array-like
+        The values of the series.
+    x : array-like, optional
+        The times (numbers or dates) of each value. When not provided,
+        the values are assumed to be in order and equally spaced.
+        Values with the same time are tied.
+    alpha : float, optional (default = 0.05)
+        Significance level of the trend.
+
+    Returns
+    -------
+    result : KendallTrend
+        The direction of the trend ("increasing", "decreasing", or
+        "no trend"), the number of values, Kendall's S statistic and
+        its variance (corrected for ties), the normal score (with a
+        continuity correction) and its two-sided p-value, and Kendall's
+        tau-b.
+
+    Notes
+    -----
+    S is computed from the number of discordant pairs, counted by
+    merge sort, in O(n log n) time.
+
+    """
+
+    y = numpy.asarray(y, dtype=float).flatten()
+    if x is None:
+        x = numpy.arange(y.shape[0], dtype=float)
+    elif len(x) != len(y):
+        raise ValueError(f"Incompatible lengths ({len(y)} != {len(x)})")
+
+    results = _kendall_groups(numpy.zeros(y.shape[0], dtype=int), 1, x, y, alpha=alpha)
+    return KendallTrend(*results.iloc[0])
+
+
+def seasonal_kendall(dates, y, seasons=None, alpha=0.05):
+    """
+    Seasonal Kendall test for a monotonic trend (Hirsch et al., 1982).
+
+    Values are only compared to those of the same season in other
+    water years, and the Mann-Kendall statistics of the seasons are
+    added up.
+
+    Parameters
+    ----------
+    dates : array-like of datetimes
+        The date of each value.
+    y : array-like
+        The values of the series.
+    seasons : array-like, optional
+        The season of each value. When not provided, the seasons are
+        defined as in ``wqio.utils.get_season``.
+    alpha : float, optional (default = 0.05)
+        Significance level of the trend.
+
+    Returns
+    -------
+    result : KendallTrend
+        See ``mann_kendall``. ``tau`` is the overall S divided by the
+        sum of the tau-b denominators of the seasons.
+
+    """
+
+    y = numpy.asarray(y, dtype=float).flatten()
+    if len(dates) != len(y):
+        raise ValueError(f"Incompatible lengths ({len(y)} != {len(dates)})")
+
+    if seasons is None:
+        seasons = _seasons(dates)
+
+    codes = numpy.zeros(y.shape[0], dtype=int)
+    results = _kendall_groups(codes, 1, _wateryears(dates), y, seasons=seasons, alpha=alpha)
+    return KendallTrend(*results.iloc[0])
+
+
+def kendall_trends(df, rescol, datecol, groupcols=None, seasonal=False, alpha=0.05):
+    """
+    Mann-Kendall (or Seasonal Kendall) trend tests of every group of a
+    tidy dataframe, all computed together.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Tidy data with one result per row.
+    rescol, datecol : str
+        Columns of the results and their dates.
+    groupcols : list of str, optional
+        Columns that define each series (e.g., station and parameter).
+        Rows with missing values in these columns are ignored.
+    seasonal : bool, optional (default = False)
+        When True, uses the Seasonal Kendall test with the seasons of
+        ``wqio.utils.get_season`` (see ``seasonal_kendall``).
+    alpha : float, optional (default = 0.05)
+        Significance level of the trends.
+
+    Returns
+    -------
+    trends : pandas.DataFrame
+        The ``KendallTrend`` of each group.
+
+    """
+
+    groupcols = validate.at_least_empty_list(groupcols)
+    if groupcols:
+        # like the groupby, ignore the rows without a group
+        df = df.dropna(subset=groupcols)
+        groups = df.groupby(by=groupcols)
+        codes = groups.ngroup().values
+        index = groups.size().index
+    else:
+        codes = numpy.zeros(df.shape[0], dtype=int)
+        index = None
+
+    dates = df[datecol]
+    if seasonal:
+        times, seasons = _wateryears(dates), _seasons(dates)
+    else:
+        times, seasons = dates, None
+
+    results = _kendall_groups(
+        codes, len(index) if groupcols else 1, times, df[rescol], seasons=seasons, alpha=alpha
+    )
+    if index is not None:
+        results.index = index
+    return results
@@ -1,6 +1,8 @@
 import itertools
+import os
 from collections import namedtuple
 from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
 from textwrap import dedent
 
 import numpy
@@ -16,6 +18,14 @@ from wqio.utils import misc
 TheilStats = namedtuple("TheilStats", ("slope", "intercept", "low_slope", "high_slope"))
 DunnResult = namedtuple("DunnResult", ("rank_stats", "results", "scores"))
 
+# above this many values, the Theil-Sen slopes are selected without
+# computing all of the pairwise slopes (see `_select_pairwise_slopes`)
+_THEIL_DENSE_MAXSIZE = 2000
+
+# maximum number of pairwise slopes computed at once when fitting many
+# datasets together (see `compute_theilslope_batched`)
+_THEIL_BATCH_MAXPAIRS = 2**20
+
 
 def sig_figs(x, n, expthresh=5, tex=False, pval=False, forceint=False):
     """Formats a number with the correct number of sig figs.
@@ -394,6 +404,433 @@ def pH_to_concentration(pH, *args):
     return 10 ** (-1 * pH) * avogadro * proton_mass * kg2g * g2mg
 
 
+def _threshold_keys(x, y, t):
+    """Sort keys (most significant first) that order points by
+    ``y - t * x``, including the limits where ``t`` is infinite."""
+
+    if t == -numpy.inf:
+        return [x, y]
+    elif t == numpy.inf:
+        return [-x, y]
+    return [y - t * x]
+
+
+def _window_sequence(x, y, lower, upper):
+    """Order the points so that the pairs whose slopes are in
+    ``(lower, upper]`` are exactly the inversions of the sequence.
+
+    Returns
+    -------
+    perm : numpy array
+        Indices of the points ordered by ``y - lower * x``.
+    seq : numpy array
+        Rank of each point (in the order of ``perm``) by
+        ``y - upper * x``. Ties are broken so that pairs of points with
+        the same x-value are never inverted.
+
+    """
+
+    lkeys = _threshold_keys(x, y, lower)
+    ukeys = _threshold_keys(x, y, upper)
+    n = x.shape[0]
+
+    perm = numpy.lexsort((lkeys + ukeys)[::-1])
+    lpos = numpy.empty(n, dtype=numpy.int64)
+    lpos[perm] = numpy.arange(n)
+
+    order = numpy.lexsort((ukeys + [-k for k in lkeys] + [lpos])[::-1])
+    urank = numpy.empty(n, dtype=numpy.int64)
+    urank[order] = numpy.arange(n)
+    return perm, urank[perm]
+
+
+def _inversion_levels(seq):
+    """Bottom-up merge sort of a permutation of ``0 ... n - 1``.
+
+    Yields
+    ------
+    left_ids : numpy array
+        Positions (in ``seq``) of the elements of the left runs of the
+        level, sorted by run and then by value.
+    right_ids : numpy array
+        Positions of the elements of the right runs.
+    start, count : numpy arrays
+        For each element of ``right_ids``, the elements
+        ``left_ids[start:start + count]`` come before it and are larger.
+
+    """
+
+    n = seq.shape[0]
+    ids = numpy.arange(n)
+    values = seq.astype(numpy.int64)
+    pos = numpy.arange(n, dtype=numpy.int64)
+    width = 1
+    while width < n:
+        block = pos // (2 * width)
+        right = (pos % (2 * width)) >= width
+        keys = block * n + values
+        left_keys = keys[~right]
+        start = numpy.searchsorted(left_keys, keys[right])
+        stop = numpy.searchsorted(left_keys, (block[right] + 1) * n)
+        yield ids[~right], ids[right], start, stop - start
+
+        merged = numpy.argsort(keys, kind="stable")
+        ids, values = ids[merged], values[merged]
+        width *= 2
+
+
+def _count_inversions(seq):
+    """Number of inverted pairs in a permutation of ``0 ... n - 1``."""
+
+    return int(sum(count.sum() for *_, count in _inversion_levels(seq)))
+
+
+def _level_pairs(left_ids, right_ids, start, count, ends, local):
+    """Map positions among the inverted pairs of a merge level to the
+    positions (in the sequence) of the points of each pair."""
+
+    element = numpy.searchsorted(ends, local, side="right")
+    first = left_ids[start[element] + local - (ends[element] - count[element])]
+    return first, right_ids[element]
+
+
+def _window_pairs(seq, which):
+    """Positions (in ``seq``) of the inverted pairs at the sorted global
+    positions ``which``."""
+
+    first, second = [], []
+    offset = 0
+    for left_ids, right_ids, start, count in _inversion_levels(seq):
+        ends = numpy.cumsum(count)
+        total = int(ends[-1])
+        local = which[(which >= offset) & (which < offset + total)] - offset
+        i, j = _level_pairs(left_ids, right_ids, start, count, ends, local)
+        first.append(i)
+        second.append(j)
+        offset += total
+
+    return numpy.concatenate(first), numpy.concatenate(second)
+
+
+def _iter_window_pairs(seq, chunksize):
+    """Positions (in ``seq``) of all of the inverted pairs, at most
+    ``chunksize`` of them at a time."""
+
+    for left_ids, right_ids, start, count in _inversion_levels(seq):
+        ends = numpy.cumsum(count)
+        total = int(ends[-1])
+        for offset in range(0, total, chunksize):
+            local = numpy.arange(offset, min(offset + chunksize, total))
+            yield _level_pairs(left_ids, right_ids, start, count, ends, local)
+
+
+def _pairwise_slopes(x, y, i, j):
+    """Slopes between points ``i`` and ``j`` computed as in
+    ``compute_theilslope`` (i.e., from the point with the larger x)."""
+
+    hi = numpy.where(x[i] > x[j], i, j)
+    lo = numpy.where(x[i] > x[j], j, i)
+    return (y[hi] - y[lo]) / (x[hi] - x[lo])
+
+
+def _split_point(sample, index, rng, below, tolerance):
+    """A random value between two distinct values of ``sample``
+    (sorted) near ``index``, moving away from the target so that the
+    window only gets bigger, or an infinite value if there are none.
+    Values within rounding error of each other aren't distinct."""
+
+    gaps = numpy.diff(sample) > 2 * (tolerance(sample[:-1]) + tolerance(sample[1:]))
+    if below:
+        candidates = numpy.flatnonzero(gaps[:index])
+        if not candidates.shape[0]:
+            return -numpy.inf
+        k = candidates[-1]
+    else:
+        candidates = numpy.flatnonzero(gaps[index:]) + index
+        if not candidates.shape[0]:
+            return numpy.inf
+        k = candidates[0]
+    return sample[k] + rng.uniform(0.25, 0.75) * (sample[k + 1] - sample[k])
+
+
+def _window_slopes(x, y, xc, yc, lower, upper, maxwindow):
+    """The distinct slopes in ``(lower, upper]`` and how many pairs of
+    points have each one, listing at most ``maxwindow`` slopes at a
+    time."""
+
+    perm, seq = _window_sequence(xc, yc, lower, upper)
+    values, counts = [], []
+    for i, j in _iter_window_pairs(seq, maxwindow):
+        v, c = numpy.unique(_pairwise_slopes(x, y, perm[i], perm[j]), return_counts=True)
+        values.append(v)
+        counts.append(c)
+
+    values, index = numpy.unique(numpy.concatenate(values), return_inverse=True)
+    return values, numpy.bincount(index, weights=numpy.concatenate(counts)).astype(numpy.int64)
+
+
+def _ranked_slopes(values, counts, ranks, n_lower, lower, upper, verify):
+    """Look up the slopes at ``ranks`` from the distinct slopes of a
+    window (see ``_window_slopes``) with ``n_lower`` slopes below it,
+    or None if ``verify`` can't rule out that the rounding error of
+    the counts put slopes on the wrong side of its limits."""
+
+    selected = values[numpy.searchsorted(numpy.cumsum(counts) + n_lower, ranks, side="right")]
+    if verify(selected, lower, upper):
+        return selected
+    return None
+
+
+def _close_pairs(x, maxpairs):
+    """The (at most ``maxpairs``) pairs of points that are closest to
+    each other in x, ordered by x within each pair, and the smallest
+    difference in x between any other points with different x-values.
+    """
+
+    order = numpy.argsort(x, kind="stable")
+    xs = x[order]
+    gaps = numpy.diff(xs)
+    distance = numpy.median(gaps[gaps > 0])
+    first = numpy.searchsorted(xs, xs, side="right")
+    while True:
+        last = numpy.maximum(numpy.searchsorted(xs, xs + distance, side="left"), first)
+        if (last - first).sum() <= maxpairs:
+            break
+        distance /= 2
+
+    counts = last - first
+    lo = numpy.repeat(numpy.arange(xs.shape[0]), counts)
+    hi = (
+        numpy.repeat(first, counts)
+        + numpy.arange(lo.shape[0])
+        - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+    )
+    far = last < xs.shape[0]
+    dxmin = (xs[last[far]] - xs[far]).min() if far.any() else numpy.inf
+    return order[lo], order[hi], dxmin
+
+
+def _counted_below(xc, yc, t, i, j):
+    """Whether the slopes between points ``i`` and ``j`` are counted
+    below ``t`` by the inversions of ``_window_sequence``."""
+
+    perm, seq = _window_sequence(xc, yc, -numpy.inf, t)
+    position = numpy.empty_like(perm)
+    position[perm] = numpy.arange(perm.shape[0])
+    return (position[i] < position[j]) != (seq[position[i]] < seq[position[j]])
+
+
+def _select_window(x, y, xc, yc, ranks, window, rng, maxwindow, tolerance, verify, maxrounds=50):
+    """The order statistics of the pairwise slopes at ``ranks`` (all
+    close to each other and within ``window``), found by shrinking the
+    window of slopes around them until it's small enough to list, or
+    None if that doesn't converge.
+
+    ``window`` is a tuple of the lower and upper limits of the slopes
+    and the number of slopes below each of them. ``tolerance`` bounds
+    the rounding error of the counts near a slope, and ``verify``
+    checks the selected slopes against it (see ``_ranked_slopes``).
+
+    """
+
+    def count_below(t):
+        return _count_inversions(_window_sequence(xc, yc, -numpy.inf, t)[1])
+
+    n = x.shape[0]
+    lower, upper, n_lower, n_upper = window
+    nsample = 4 * n
+    margin = 2 * numpy.sqrt(nsample)
+    for _ in range(maxrounds):
+        rmin, rmax = ranks.min(), ranks.max()
+        size = n_upper - n_lower
+        if size <= maxwindow:
+            values, counts = _window_slopes(x, y, xc, yc, lower, upper, maxwindow)
+            if counts.sum() != size:
+                return None
+            return _ranked_slopes(values, counts, ranks, n_lower, lower, upper, verify)
+
+        perm, seq = _window_sequence(xc, yc, lower, upper)
+        which = numpy.sort(rng.integers(0, size, size=nsample))
+        i, j = _window_pairs(seq, which)
+        sample = numpy.sort(_pairwise_slopes(x, y, perm[i], perm[j]))
+
+        # large groups of (nearly) tied slopes can't be split by the
+        # window, so if the ranks fall within one, list its slopes
+        positions = numpy.clip(nsample * (ranks[[0, -1]] - n_lower) // size, 0, nsample - 1)
+        for value in numpy.unique(sample[positions]):
+            delta = 4 * tolerance(value)
+            if (numpy.abs(sample - value) <= delta).sum() < margin:
+                continue
+
+            tie_lower, tie_upper = value - delta, value + delta
+            n_below, n_above = count_below(tie_lower), count_below(tie_upper)
+            tied = (ranks >= n_below) & (ranks < n_above)
+            if not tied.any() or n_below < n_lower or n_above > n_upper:
+                continue
+
+            values, counts = _window_slopes(x, y, xc, yc, tie_lower, tie_upper, maxwindow)
+            if counts.sum() != n_above - n_below:
+                return None
+
+            selected = numpy.empty(ranks.shape[0])
+            selected[tied] = _ranked_slopes(
+                values, counts, ranks[tied], n_below, tie_lower, tie_upper, verify
+            )
+            for part, limits in [
+                (ranks < n_below, (lower, tie_lower, n_lower, n_below)),
+                (ranks >= n_above, (tie_upper, upper, n_above, n_upper)),
+            ]:
+                if part.any():
+                    values = _select_window(
+                        x, y, xc, yc, ranks[part], limits, rng, maxwindow, tolerance, verify
+                    )
+                    if values is None:
+                        return None
+                    selected[part] = values
+            return selected
+
+        # new limits are checked by counting the slopes below them, so
+        # move in closer to the ranks if the sampling margin doesn't
+        # shrink the window (e.g., because of tied slopes)
+        for factor in [1, 0.25, 0]:
+            lo = int(numpy.floor(nsample * (rmin - n_lower) / size - factor * margin))
+            if lo <= 0:
+                continue
+            new_lower = _split_point(
+                sample, min(lo, nsample - 1), rng, below=True, tolerance=tolerance
+            )
+            if new_lower > lower:
+                n_new = count_below(new_lower)
+                if n_lower <= n_new <= rmin:
+                    lower, n_lower = new_lower, n_new
+                    break
+
+        for factor in [1, 0.25, 0]:
+            hi = int(numpy.ceil(nsample * (rmax + 1 - n_lower) / size + factor * margin))
+            if hi >= nsample - 1:
+                continue
+            new_upper = _split_point(sample, max(hi, 0), rng, below=False, tolerance=tolerance)
+            if new_upper < upper:
+                n_new = count_below(new_upper)
+                if rmax < n_new <= n_upper:
+                    upper, n_upper = new_upper, n_new
+                    break
+
+    return None
+
+
+def _select_pairwise_slopes(x, y, ranks, maxwindow=None, random_state=0):
+    """
+    Order statistics of the slopes between all pairs of points with
+    different x-values, without computing all of the slopes.
+
+    Windows around the requested ranks are shrunk with random samples
+    of the slopes within them. The number of slopes within a window
+    (or below a value) is counted as the number of inversions between
+    two orderings of the points in O(n log n) time. Once a window is
+    small enough, its slopes are listed and sorted.
+
+    Parameters
+    ----------
+    x, y : numpy arrays
+        Finite coordinates of the points.
+    ranks : array-like of int
+        The 0-based ranks of the sorted slopes to select.
+    maxwindow : int, optional
+        Maximum number of slopes that are listed at once. Defaults to
+        ``8 * len(x)``.
+    random_state : int, optional (default = 0)
+        Seed of the random samples. The results don't depend on it.
+
+    Returns
+    -------
+    values : numpy array or None
+        The slopes at ``ranks``, exactly as if all of the slopes were
+        computed and sorted. None if the slopes are too close to the
+        limits of the windows to be distinguished from the rounding
+        error of the counts, in which case the slopes should be
+        computed directly.
+
+    """
+
+    x = numpy.asarray(x, dtype=float)
+    y = numpy.asarray(y, dtype=float)
+    ranks = numpy.asarray(ranks, dtype=numpy.int64)
+    n = x.shape[0]
+    rng = numpy.random.default_rng(random_state)
+    if maxwindow is None:
+        maxwindow = 8 * n
+
+    _, xcounts = numpy.unique(x, return_counts=True)
+    n_pairs = n * (n - 1) // 2 - int((xcounts * (xcounts - 1) // 2).sum())
+
+    # center the data so that `y - t * x` has as little rounding error
+    # as possible
+    xc = x - numpy.median(x)
+    yc = y - numpy.median(y)
+    xmax, ymax = numpy.abs(xc).max(), numpy.abs(yc).max()
+    eps = numpy.finfo(float).eps
+
+    # the rounding error of the counts grows as the difference in x
+    # shrinks, so the pairs that are closest in x are checked directly
+    # and the tolerance only needs to cover the rest of them
+    close_i, close_j, dxmin = _close_pairs(x, n)
+    close_slopes = _pairwise_slopes(x, y, close_i, close_j)
+
+    def tolerance(t):
+        t = numpy.abs(t)
+        with numpy.errstate(invalid="ignore"):
+            return numpy.where(numpy.isinf(t), 0.0, 16 * eps * ((ymax + t * xmax) / dxmin + t))
+
+    def verify(selected, lower, upper):
+        low, high = selected.min(), selected.max()
+        if low <= lower + tolerance(lower) or high >= upper - tolerance(upper):
+            return False
+        below = _counted_below(xc, yc, lower, close_i, close_j)
+        above = ~_counted_below(xc, yc, upper, close_i, close_j)
+        return (close_slopes[below] <= low).all() and (close_slopes[above] >= high).all()
+
+    # ranks that are close together share a window
+    order = numpy.argsort(ranks)
+    values = numpy.empty(ranks.shape[0])
+    groups = numpy.split(order, numpy.flatnonzero(numpy.diff(ranks[order]) > maxwindow // 4) + 1)
+    for group in groups:
+        window = (-numpy.inf, numpy.inf, 0, n_pairs)
+        selected = _select_window(
+            x, y, xc, yc, ranks[group], window, rng, maxwindow, tolerance, verify
+        )
+        if selected is None:
+            return None
+        values[group] = selected
+
+    return values
+
+
+def _interpolate_percentile(lower, upper, n, percentile):
+    """The ``percentile`` of ``n`` sorted values whose order statistics
+    that bracket it are ``lower`` and ``upper`` (see
+    ``_percentile_ranks``), interpolated as ``numpy.percentile`` does.
+    Works element-wise on arrays of ``lower``, ``upper``, and ``n``."""
+
+    q = numpy.true_divide(percentile, 100)
+    virtual = (numpy.asarray(n) - 1) * q
+    gamma = virtual - numpy.floor(virtual)
+    diff = upper - lower
+    interpolated = numpy.where(gamma >= 0.5, upper - diff * (1 - gamma), lower + diff * gamma)
+    interpolated = numpy.where(virtual < 0, lower, interpolated)
+    return numpy.where(virtual >= n - 1, upper, interpolated)[()]
+
+
+def _percentile_ranks(n, percentile):
+    """The ranks of the sorted values bracketing their ``percentile``
+    (see ``numpy.percentile``). Works element-wise on arrays of ``n``."""
+
+    q = numpy.true_divide(percentile, 100)
+    virtual = (numpy.asarray(n) - 1) * q
+    lower = numpy.minimum(numpy.maximum(numpy.floor(virtual), 0), n - 1).astype(numpy.int64)
+    return lower[()], numpy.minimum(lower + 1, n - 1)[()]
+
+
 def compute_theilslope(y, x=None, alpha=0.95, percentile=50):
     f""" Adapted from stats.mstats.theilslopes so that we can tweak the
     `percentile` parameter.
@@ -410,25 +847,39 @@ def compute_theilslope(y, x=None, alpha=0.95, percentile=50):
         if len(x) != len(y):
             raise ValueError(f"Incompatible lengths ({len(y)} != {len(x)})")
 
-    # Compute sorted slopes only when deltax > 0
-    deltax = x[:, numpy.newaxis] - x
-    deltay = y[:, numpy.newaxis] - y
-    slopes = deltay[deltax > 0] / deltax[deltax > 0]
-    slopes.sort()
-    outslope = numpy.percentile(slopes, percentile)
-    outinter = numpy.percentile(y, percentile) - outslope * numpy.median(x)
-    # Now compute confidence intervals
+    return _theilslope(y, x, alpha=alpha, percentile=percentile)
+
+
+def _theilslope(y, x, alpha=0.95, percentile=50, slopes=None, repeats=None):
+    """Theil-Sen statistics of the flat arrays ``y`` and ``x`` (see
+    ``compute_theilslope``).
+
+    ``slopes`` are the slopes between all of the pairs of points with
+    different x-values and ``repeats`` are the sizes of the groups of
+    tied values in ``x`` and ``y`` (see ``stats.mstats.find_repeats``),
+    if they've already been computed (e.g., for fits in other spaces).
+
+    """
+
+    if repeats is None:
+        _, nxreps = stats.mstats.find_repeats(x)
+        _, nyreps = stats.mstats.find_repeats(y)
+    else:
+        nxreps, nyreps = repeats
+    ny = len(y)  # n in Sen (1968)
+
+    # Number of pairs with deltax > 0, i.e., N in Sen (1968)
+    if slopes is not None:
+        nt = len(slopes)
+    else:
+        _, xcounts = numpy.unique(x[~numpy.isnan(x)], return_counts=True)
+        nt = int(xcounts.sum() * (xcounts.sum() - 1) - (xcounts * (xcounts - 1)).sum()) // 2
+
     if alpha > 0.5:
         alpha = 1.0 - alpha
 
     z = stats.distributions.norm.ppf(alpha / 2.0)
 
-    # This implements (2.6) from Sen (1968)
-    _, nxreps = stats.mstats.find_repeats(x)
-    _, nyreps = stats.mstats.find_repeats(y)
-    nt = len(slopes)  # N in Sen (1968)
-    ny = len(y)  # n in Sen (1968)
-
     # Equation 2.6 in Sen (1968):
     sigsq = (
         1
@@ -440,15 +891,233 @@ def compute_theilslope(y, x=None, alpha=0.95, percentile=50):
         )
     )
 
-    # Find the confidence interval indices in `slopes`
+    # Find the confidence interval indices in the sorted slopes
     sigma = numpy.sqrt(sigsq)
-    Ru = min(int(numpy.round((nt - z * sigma) / 2.0)), len(slopes) - 1)
+    Ru = min(int(numpy.round((nt - z * sigma) / 2.0)), nt - 1)
     Rl = max(int(numpy.round((nt + z * sigma) / 2.0)) - 1, 0)
-    delta = slopes[[Rl, Ru]]
 
+    # Select the few slopes that are needed from large datasets instead
+    # of computing and sorting all of them
+    selected = None
+    finite = numpy.isfinite(x).all() and numpy.isfinite(y).all()
+    if slopes is None and ny > _THEIL_DENSE_MAXSIZE and nt > 0 and finite:
+        lower, upper = _percentile_ranks(nt, percentile)
+        selected = _select_pairwise_slopes(x, y, [lower, upper, Rl, Ru])
+
+    if selected is not None:
+        outslope = _interpolate_percentile(selected[0], selected[1], nt, percentile)
+        delta = selected[2:]
+    else:
+        # Compute sorted slopes only when deltax > 0
+        if slopes is None:
+            deltax = x[:, numpy.newaxis] - x
+            deltay = y[:, numpy.newaxis] - y
+            slopes = deltay[deltax > 0] / deltax[deltax > 0]
+        slopes = numpy.sort(slopes)
+        outslope = numpy.percentile(slopes, percentile)
+        delta = slopes[[Rl, Ru]]
+
+    outinter = numpy.percentile(y, percentile) - outslope * numpy.median(x)
     return TheilStats(outslope, outinter, delta[0], delta[1])
 
 
+def _segment_ties(values, codes, nsegments):
+    """Sum of ``k * (k - 1) * (2 * k + 5)`` over the groups of ``k``
+    tied values (see Sen, 1968) of each segment of ``values``, which
+    are sorted within the segments ``codes``."""
+
+    new = numpy.r_[True, (values[1:] != values[:-1]) | (codes[1:] != codes[:-1])]
+    starts = numpy.flatnonzero(new)
+    k = numpy.diff(numpy.r_[starts, values.shape[0]])
+    return numpy.bincount(codes[starts], weights=k * (k - 1) * (2 * k + 5), minlength=nsegments)
+
+
+def _theilslope_block(xs, ys, alpha=0.95, percentile=50):
+    """Theil-Sen statistics (one ``TheilStats`` per row) of several
+    small, finite datasets with at least two values each, computed at
+    once from their concatenated (segmented) arrays. Datasets without
+    any slopes get a row of NaN. Datasets with so many ties that the
+    variance of Sen (1968) is negative keep their slope and intercept,
+    but the bounds of their confidence interval are NaN."""
+
+    sizes = numpy.array([len(x) for x in xs], dtype=numpy.int64)
+    nsegments = sizes.shape[0]
+    x = numpy.concatenate(xs).astype(float)
+    y = numpy.concatenate(ys).astype(float)
+    codes = numpy.repeat(numpy.arange(nsegments), sizes)
+    starts = numpy.cumsum(sizes) - sizes
+
+    # every pair of points within each dataset
+    points = numpy.arange(x.shape[0])
+    after = (starts + sizes)[codes] - points - 1
+    lo = numpy.repeat(points, after)
+    hi = lo + 1 + numpy.arange(lo.shape[0]) - numpy.repeat(numpy.cumsum(after) - after, after)
+    keep = x[lo] != x[hi]
+    slopes = _pairwise_slopes(x, y, lo[keep], hi[keep])
+    slope_codes = codes[lo[keep]]
+    slopes = slopes[numpy.lexsort((slopes, slope_codes))]
+
+    nt = numpy.bincount(slope_codes, minlength=nsegments)
+    valid = nt > 0
+    if not valid.any():
+        return numpy.full((nsegments, 4), numpy.nan)
+    first = numpy.where(valid, numpy.cumsum(nt) - nt, 0)
+    ntc = numpy.maximum(nt, 1)
+
+    lower, upper = _percentile_ranks(ntc, percentile)
+    outslope = _interpolate_percentile(
+        slopes[first + lower], slopes[first + upper], ntc, percentile
+    )
+
+    # Equation 2.6 in Sen (1968)
+    xsorted = x[numpy.lexsort((x, codes))]
+    ysorted = y[numpy.lexsort((y, codes))]
+    sigsq = (
+        1
+        / 18.0
+        * (
+            sizes * (sizes - 1) * (2 * sizes + 5)
+            - _segment_ties(xsorted, codes, nsegments)
+            - _segment_ties(ysorted, codes, nsegments)
+        )
+    )
+
+    if alpha > 0.5:
+        alpha = 1.0 - alpha
+
+    z = stats.distributions.norm.ppf(alpha / 2.0)
+    with numpy.errstate(invalid="ignore"):
+        sigma = numpy.sqrt(sigsq)
+    has_ci = valid & numpy.isfinite(sigma)
+    sigma = numpy.where(has_ci, sigma, 0)
+    Ru = numpy.minimum(numpy.round((ntc - z * sigma) / 2.0).astype(numpy.int64), ntc - 1)
+    Rl = numpy.maximum(numpy.round((ntc + z * sigma) / 2.0).astype(numpy.int64) - 1, 0)
+
+    ylower, yupper = _percentile_ranks(sizes, percentile)
+    ypct = _interpolate_percentile(
+        ysorted[starts + ylower], ysorted[starts + yupper], sizes, percentile
+    )
+    middle = starts + (sizes - 1) // 2
+    xmed = numpy.where(
+        sizes % 2 == 1, xsorted[middle], (xsorted[middle] + xsorted[middle + 1 - sizes % 2]) / 2
+    )
+
+    rows = numpy.column_stack(
+        [outslope, ypct - outslope * xmed, slopes[first + Rl], slopes[first + Ru]]
+    )
+    rows[~has_ci, 2:] = numpy.nan
+    rows[~valid] = numpy.nan
+    return rows
+
+
+def _theilslope_rows(xs, ys, alpha=0.95, percentile=50):
+    """Theil-Sen statistics (one ``TheilStats`` per row) of any
+    datasets, fitting the small, finite ones together. Datasets
+    without any pairs of points with different x-values get a row of
+    NaN."""
+
+    def _batchable(x, y):
+        finite = numpy.isfinite(x).all() and numpy.isfinite(y).all()
+        return 2 <= len(x) <= _THEIL_DENSE_MAXSIZE and finite
+
+    rows = numpy.full((len(xs), 4), numpy.nan)
+    batched = [n for n, (x, y) in enumerate(zip(xs, ys)) if _batchable(x, y)]
+    if batched:
+        rows[batched] = _theilslope_block(
+            [xs[n] for n in batched], [ys[n] for n in batched], alpha=alpha, percentile=percentile
+        )
+
+    for n in sorted(set(range(len(xs))) - set(batched)):
+        if numpy.unique(xs[n][~numpy.isnan(xs[n])]).shape[0] > 1:
+            rows[n] = _theilslope(ys[n], xs[n], alpha=alpha, percentile=percentile)
+
+    return rows
+
+
+def compute_theilslope_batched(datasets, alpha=0.95, percentile=50, n_jobs=None, executor=None):
+    """
+    Theil-Sen slopes of many datasets of different sizes at once (e.g.,
+    all of the paired influent and effluent data of a
+    ``DataCollection``, or the resampled datasets of a bootstrap).
+
+    Small datasets are concatenated into segmented arrays so that their
+    pairwise slopes are computed, sorted, and selected together instead
+    of one dataset at a time.
+
+    Parameters
+    ----------
+    datasets : dict or sequence of (x, y) tuples
+        The datasets to fit. ``x`` may be None, in which case the
+        values of ``y`` are assumed to be equally spaced. When a dict,
+        its keys are used to label the results.
+    alpha, percentile : float, optional
+        See ``compute_theilslope``.
+    n_jobs : int, optional
+        Number of parts into which the datasets are split to be fit by
+        separate worker processes. Use -1 for the number of CPUs. The
+        results don't depend on it.
+    executor : concurrent.futures.Executor, optional
+        Executor used to run the parts. When not provided (and
+        ``n_jobs`` is), a ``ProcessPoolExecutor`` with ``n_jobs``
+        workers is used.
+
+    Returns
+    -------
+    theil : pandas.DataFrame
+        One row per dataset with the ``TheilStats`` fields as columns,
+        identical to the results of ``compute_theilslope``. Datasets
+        without any pairs of points with different x-values get a row
+        of NaN.
+
+    """
+
+    if isinstance(datasets, dict):
+        index = list(datasets.keys())
+        datasets = list(datasets.values())
+    else:
+        datasets = list(datasets)
+        index = None
+
+    xs, ys = [], []
+    for x, y in datasets:
+        y = numpy.array(y).flatten()
+        if x is None:
+            x = numpy.arange(len(y), dtype=float)
+        else:
+            x = numpy.array(x, dtype=float).flatten()
+            if len(x) != len(y):
+                raise ValueError(f"Incompatible lengths ({len(y)} != {len(x)})")
+        xs.append(x)
+        ys.append(y)
+
+    # split the datasets into parts with a similar number of slopes
+    npairs = numpy.array([len(x) * (len(x) - 1) // 2 for x in xs], dtype=numpy.int64)
+    maxpairs = _THEIL_BATCH_MAXPAIRS
+    if n_jobs is not None or executor is not None:
+        if n_jobs is None or n_jobs < 1:
+            n_jobs = os.cpu_count() or 1
+        maxpairs = max(min(maxpairs, -(-int(npairs.sum()) // n_jobs)), 1)
+    parts = numpy.cumsum(npairs) // maxpairs
+    jobs = [numpy.flatnonzero(parts == part) for part in numpy.unique(parts)]
+    args = [([xs[n] for n in job], [ys[n] for n in job], alpha, percentile) for job in jobs]
+
+    if n_jobs is None and executor is None:
+        results = [_theilslope_rows(*arg) for arg in args]
+    elif executor is None:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(_theilslope_rows, *arg) for arg in args]
+            results = [f.result() for f in futures]
+    else:
+        futures = [executor.submit(_theilslope_rows, *arg) for arg in args]
+        results = [f.result() for f in futures]
+
+    rows = numpy.full((len(xs), 4), numpy.nan)
+    for job, result in zip(jobs, results):
+        rows[job] = result
+
+    return pandas.DataFrame(rows, index=index, columns=list(TheilStats._fields))
+
+
 def fit_line(x, y, xhat=None, fitprobs=None, fitlogs=None, dist=None, through_origin=False):
     """Fits a line to x-y data in various forms (raw, log, prob scales)
 